@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the optional JSON and event-loop fast paths.
+
+Measures, for every backend that is installed:
+- parse and serialize time of a large council output (multi-MB responses)
+- fan-out overhead of run_council with many providers, using an in-process
+  provider that answers instantly so only star-chamber's own cost is timed
+
+Usage:
+    uv run --project <dir> --extra fast benchmark.py [--size-mb 8] [--jobs 2000]
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+import types
+from collections.abc import Callable
+from typing import Any
+
+import codec
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Return the fastest of repeat runs of fn, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2)
+
+
+def _council_output(size_mb: float) -> dict[str, Any]:
+    """Build council output of roughly size_mb megabytes."""
+    issue = {
+        "severity": "medium",
+        "location": "src/app/handlers.py:120",
+        "category": "correctness",
+        "description": "Error from the cache lookup is discarded, so a stale entry is served. " * 3,
+        "suggestion": "Return the error to the caller and add a test for the miss path.",
+    }
+    review = {
+        "provider": "openai",
+        "model": "gpt-5.2",
+        "success": True,
+        "content": json.dumps({"issues": [issue] * 40, "summary": "ok"}),
+        "parsed_json": {"issues": [issue] * 40, "summary": "ok"},
+        "usage": {"prompt_tokens": 20000, "completion_tokens": 4000, "total_tokens": 24000},
+        "elapsed_seconds": 12.5,
+    }
+    per_review = len(json.dumps(review))
+    count = max(1, int(size_mb * 1024 * 1024 / per_review))
+    return {"reviews": [review] * count, "files_reviewed": ["src/app/handlers.py"]}
+
+
+def _json_backends() -> dict[str, tuple[Callable[[bytes], Any], Callable[[Any], bytes]]]:
+    """Return (loads, indented dumps) for each installed JSON backend."""
+    backends = {
+        "json": (json.loads, lambda obj: json.dumps(obj, indent=2).encode()),
+    }
+    try:
+        orjson = importlib.import_module("orjson")
+        backends["orjson"] = (orjson.loads, lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    except ImportError:
+        pass
+    return backends
+
+
+def bench_json(size_mb: float, repeat: int) -> dict[str, Any]:
+    """Time parse and indented serialize of a large council output."""
+    output = _council_output(size_mb)
+    encoded = json.dumps(output).encode()
+    results: dict[str, Any] = {"document_mb": round(len(encoded) / 1024 / 1024, 2)}
+    for name, (loads, dumps) in _json_backends().items():
+        results[name] = {
+            "parse_ms": _best_of(repeat, lambda: loads(encoded)),
+            "serialize_ms": _best_of(repeat, lambda: dumps(output)),
+        }
+    return results
+
+
+def _install_instant_provider() -> None:
+    """Register an in-process any_llm whose acompletion answers immediately."""
+    message = types.SimpleNamespace(content='{"issues": [], "summary": "ok"}')
+    response = types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=None)
+
+    async def acompletion(**kwargs: Any) -> Any:
+        await asyncio.sleep(0)
+        return response
+
+    sys.modules["any_llm"] = types.SimpleNamespace(acompletion=acompletion)  # type: ignore[assignment]
+
+
+def bench_fanout(jobs: int, repeat: int) -> dict[str, Any]:
+    """Time run_council over jobs instant providers on each installed loop."""
+    _install_instant_provider()
+    import llm_council
+
+    providers = [{"provider": "openai", "model": f"m{i}", "api_key": "k"} for i in range(jobs)]
+    loops: dict[str, Callable[[], asyncio.AbstractEventLoop]] = {"asyncio": asyncio.new_event_loop}
+    try:
+        loops["uvloop"] = importlib.import_module("uvloop").new_event_loop
+    except ImportError:
+        pass
+
+    results: dict[str, Any] = {"jobs": jobs}
+    for name, factory in loops.items():
+        def once() -> None:
+            with asyncio.Runner(loop_factory=factory) as runner:
+                runner.run(llm_council.run_council("prompt", providers))
+
+        total_ms = _best_of(repeat, once)
+        results[name] = {"total_ms": total_ms, "per_job_us": round(total_ms * 1000 / jobs, 1)}
+    return results
+
+
+def main() -> None:
+    """Run the benchmarks and print the results as JSON."""
+    parser = argparse.ArgumentParser(description="Benchmark star-chamber JSON and event-loop backends")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="Size of the council output to parse (MB)")
+    parser.add_argument("--jobs", type=int, default=2000, help="Providers to fan out to")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (fastest is kept)")
+    args = parser.parse_args()
+
+    results = {
+        "active": {"json": codec.json_backend(), "loop": codec.loop_backend()},
+        "json": bench_json(args.size_mb, args.repeat),
+        "fanout": bench_fanout(args.jobs, args.repeat),
+    }
+    print(codec.dumps(results, indent=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Per provider/model circuit breaker for star-chamber.
+
+A provider that keeps failing (including timeouts) is skipped instantly
+instead of holding up every council run until its timeout. The breaker
+state lives in a locked JSON file, so every session on the machine shares
+it: one session's failures open the circuit for all of them.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, TypedDict
+
+from state import locked_json_state
+
+
+# Defaults, overridable via "circuit_breaker" in providers.json.
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN_SECONDS = 300.0
+
+
+class BreakerSettings(TypedDict):
+    """When the circuit opens and how long it stays open."""
+
+    # Consecutive failures that open the circuit.
+    failure_threshold: int
+    # Seconds an open circuit waits before letting a probe through.
+    cooldown_seconds: float
+
+
+class CircuitBreaker:
+    """Per provider/model circuit breaker persisted in a shared state file.
+
+    After failure_threshold consecutive failures (including timeouts) the
+    circuit opens and the provider is skipped instantly. Once cooldown_seconds
+    have passed a single half-open probe is let through: success closes the
+    circuit, failure re-opens it for another cool-down. State lives in a
+    locked JSON file so every session on the machine shares it.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        failure_threshold: int = DEFAULT_BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds: float = DEFAULT_BREAKER_COOLDOWN_SECONDS,
+        clock: Any = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+
+    @staticmethod
+    def key(config: dict[str, Any]) -> str:
+        """Return the breaker key for a provider config."""
+        return f"{config['provider'].lower()}/{config['model']}"
+
+    def acquire(self, config: dict[str, Any]) -> str | None:
+        """Check whether a request may be sent.
+
+        Returns None when the request may proceed (closed circuit, or the
+        half-open probe), otherwise the reason the provider is skipped.
+        """
+        key = self.key(config)
+        now = self._clock()
+        with locked_json_state(self.path) as state:
+            entry = state.get(key)
+            if not entry or entry.get("opened_at") is None:
+                return None
+            retry_at = entry["opened_at"] + self.cooldown_seconds
+            if now < retry_at:
+                return (
+                    f"Circuit open for {key} after {entry.get('consecutive_failures', 0)} "
+                    f"consecutive failures (last: {entry.get('last_error', 'unknown')}); "
+                    f"retry in {retry_at - now:.0f}s"
+                )
+            probe_started = entry.get("probe_started_at")
+            if probe_started is not None and now < probe_started + self.cooldown_seconds:
+                return f"Circuit half-open for {key}; another session is probing"
+            entry["probe_started_at"] = now
+            return None
+
+    def record(self, config: dict[str, Any], result: dict[str, Any]) -> None:
+        """Update the breaker with the outcome of a request."""
+        key = self.key(config)
+        now = self._clock()
+        with locked_json_state(self.path) as state:
+            if result.get("success"):
+                state.pop(key, None)
+                return
+            entry = state.setdefault(key, {"consecutive_failures": 0})
+            was_probe = entry.pop("probe_started_at", None) is not None
+            entry["consecutive_failures"] = entry.get("consecutive_failures", 0) + 1
+            entry["last_error"] = result.get("error", "unknown error")[:200]
+            if was_probe or entry["consecutive_failures"] >= self.failure_threshold:
+                entry["opened_at"] = now
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return the current state of every tracked provider/model."""
+        now = self._clock()
+        with locked_json_state(self.path) as state:
+            entries = {k: dict(v) for k, v in state.items()}
+        report = {}
+        for key, entry in entries.items():
+            opened_at = entry.get("opened_at")
+            if opened_at is None:
+                status = {"state": "closed"}
+            elif now < opened_at + self.cooldown_seconds:
+                status = {
+                    "state": "open",
+                    "retry_after_seconds": round(opened_at + self.cooldown_seconds - now, 1),
+                }
+            else:
+                status = {"state": "half-open"}
+            status["consecutive_failures"] = entry.get("consecutive_failures", 0)
+            report[key] = status
+        return report
+
+
+def breaker_settings_from_config(config: dict[str, Any]) -> BreakerSettings | None:
+    """Return circuit breaker settings from providers.json (None when disabled).
+
+    "circuit_breaker": false disables it; an object may set failure_threshold
+    and cooldown_seconds. Raises ValueError for invalid settings.
+    """
+    raw = config.get("circuit_breaker", {})
+    if raw is False:
+        return None
+    if not isinstance(raw, dict):
+        raise ValueError("circuit_breaker must be an object or false")
+    threshold = raw.get("failure_threshold", DEFAULT_BREAKER_FAILURE_THRESHOLD)
+    cooldown = raw.get("cooldown_seconds", DEFAULT_BREAKER_COOLDOWN_SECONDS)
+    if isinstance(threshold, bool) or not isinstance(threshold, int) or threshold < 1:
+        raise ValueError("failure_threshold must be a positive integer")
+    if isinstance(cooldown, bool) or not isinstance(cooldown, (int, float)) or cooldown < 0:
+        raise ValueError("cooldown_seconds must be a non-negative number")
+    return BreakerSettings(failure_threshold=threshold, cooldown_seconds=float(cooldown))
@@ -0,0 +1,119 @@
+"""
+Record/replay cassettes for star-chamber provider calls.
+
+A cassette is a directory holding one JSON file per provider request,
+named after the request's fingerprint. Recording saves every result as it
+comes back; replaying serves those results again without importing any SDK
+or touching the network, so council runs can be reproduced and evaluated
+offline.
+"""
+
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import codec
+
+
+class Cassette:
+    """Directory of recorded provider responses for record/replay runs.
+
+    In record mode every provider call is saved as one JSON file named after
+    the request fingerprint. In replay mode responses are served back from
+    those files without importing any SDK or touching the network, sleeping
+    for the recorded latency multiplied by latency_scale.
+    """
+
+    RECORD = "record"
+    REPLAY = "replay"
+
+    def __init__(self, directory: str | Path, mode: str, latency_scale: float = 1.0) -> None:
+        if mode not in (self.RECORD, self.REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if latency_scale < 0:
+            raise ValueError("latency_scale must not be negative")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.latency_scale = latency_scale
+
+    @property
+    def replaying(self) -> bool:
+        """Whether responses are served from disk instead of providers."""
+        return self.mode == self.REPLAY
+
+    def path_for(self, fingerprint: str) -> Path:
+        """Return the cassette file path for a request fingerprint."""
+        return self.directory / f"{fingerprint}.json"
+
+    def record(self, config: dict[str, Any], fingerprint: str, result: dict[str, Any]) -> None:
+        """Persist a provider result under its request fingerprint."""
+        entry = {
+            "fingerprint": fingerprint,
+            "provider": config["provider"],
+            "model": config["model"],
+            "success": result.get("success", False),
+            "content": result.get("content"),
+            "error": result.get("error"),
+            "usage": result.get("usage", {}),
+            "elapsed_seconds": result.get("elapsed_seconds", 0.0),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(fingerprint)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(codec.dumps(entry, indent=True))
+        os.replace(tmp_path, path)
+
+    async def replay(self, config: dict[str, Any], fingerprint: str) -> dict[str, Any]:
+        """Serve a recorded result, sleeping for the scaled original latency.
+
+        The result carries the recorded content; parsing it is left to the
+        caller, as for a live response.
+        """
+        provider = config["provider"]
+        model = config["model"]
+        path = self.path_for(fingerprint)
+        try:
+            entry = codec.loads(path.read_bytes())
+        except FileNotFoundError:
+            return {
+                "provider": provider,
+                "model": model,
+                "success": False,
+                "error": f"No recorded response for {provider}/{model} in {self.directory}",
+                "replayed": True,
+            }
+        except json.JSONDecodeError as e:
+            return {
+                "provider": provider,
+                "model": model,
+                "success": False,
+                "error": f"Invalid cassette file {path.name}: {e}",
+                "replayed": True,
+            }
+
+        elapsed = float(entry.get("elapsed_seconds") or 0.0)
+        if self.latency_scale and elapsed:
+            await asyncio.sleep(elapsed * self.latency_scale)
+
+        if not entry.get("success"):
+            return {
+                "provider": provider,
+                "model": model,
+                "success": False,
+                "error": entry.get("error") or "Recorded request failed",
+                "elapsed_seconds": elapsed,
+                "replayed": True,
+            }
+        result = {
+            "provider": provider,
+            "model": model,
+            "success": True,
+            "content": entry.get("content") or "",
+            "elapsed_seconds": elapsed,
+            "replayed": True,
+        }
+        if entry.get("usage"):
+            result["usage"] = entry["usage"]
+        return result
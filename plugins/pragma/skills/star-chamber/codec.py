@@ -0,0 +1,85 @@
+"""
+Optional fast paths for JSON and the event loop.
+
+Uses orjson for JSON and uvloop for the asyncio loop when they are
+installed, and the standard library otherwise. Output parses back to the
+same values either way, but the text differs: orjson writes non-ASCII as
+UTF-8, uses no spaces in compact output, writes NaN as null and may format
+floats differently. Set STAR_CHAMBER_ACCEL=0 to force the
+standard library.
+
+Install the extras with: uv run --project <dir> --extra fast ...
+"""
+
+import asyncio
+import json
+import os
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+
+T = TypeVar("T")
+
+ACCEL_ENV = "STAR_CHAMBER_ACCEL"
+
+_enabled = os.environ.get(ACCEL_ENV, "1").lower() not in ("0", "false", "no")
+
+orjson: Any = None
+uvloop: Any = None
+if _enabled:
+    try:
+        import orjson
+    except ImportError:
+        pass
+    try:
+        import uvloop
+    except ImportError:
+        pass
+
+
+
+def json_backend() -> str:
+    """Name of the JSON implementation in use."""
+    return "orjson" if orjson is not None else "json"
+
+
+def loop_backend() -> str:
+    """Name of the event loop implementation in use."""
+    return "uvloop" if uvloop is not None else "asyncio"
+
+
+def loads(data: str | bytes) -> Any:
+    """Parse JSON text.
+
+    Input orjson rejects is re-parsed by the standard library, so the same
+    documents are accepted (e.g. NaN) and failures always raise
+    json.JSONDecodeError.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to JSON text, two-space indented if indent is set.
+
+    Falls back to the standard library for values orjson rejects (e.g.
+    non-string dict keys or integers beyond 64 bits).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, indent=2 if indent else None)
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion, on uvloop when available."""
+    if uvloop is None:
+        return asyncio.run(coro)
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(coro)
@@ -0,0 +1,334 @@
+"""
+Prompt compaction for star-chamber reviews.
+
+Removes redundant tokens from an assembled review prompt before it is sent
+to every provider:
+- Drop files matching low-value patterns (lockfiles, minified bundles, maps)
+- Collapse license/copyright headers
+- Dedupe paragraphs repeated in the surrounding text (e.g. rule files)
+- Optionally strip Python comments and docstrings
+
+File contents keep their line count, so `file:line` locations reported by
+providers still match the original files.
+"""
+
+import ast
+import fnmatch
+import io
+import re
+import tokenize
+from typing import Any, TypedDict
+
+
+# Files whose contents rarely help a code review.
+DEFAULT_DROP_PATTERNS = [
+    "*.lock",
+    "*-lock.json",
+    "*-lock.yaml",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.generated.*",
+    "*_pb2.py",
+    "*.pb.go",
+]
+
+# Paragraphs shorter than this are too small to be worth deduplicating.
+MIN_DEDUPE_CHARS = 80
+
+# A leading comment block is treated as a license header if it mentions one of these.
+LICENSE_MARKERS = re.compile(r"copyright|licen[cs]e|spdx-license-identifier|all rights reserved", re.IGNORECASE)
+
+# Line comment prefixes by file extension.
+LINE_COMMENT_PREFIXES = {
+    ".py": "#",
+    ".sh": "#",
+    ".rb": "#",
+    ".yaml": "#",
+    ".yml": "#",
+    ".toml": "#",
+    ".go": "//",
+    ".ts": "//",
+    ".tsx": "//",
+    ".js": "//",
+    ".jsx": "//",
+    ".java": "//",
+    ".kt": "//",
+    ".rs": "//",
+    ".c": "//",
+    ".h": "//",
+    ".cpp": "//",
+    ".cs": "//",
+    ".swift": "//",
+}
+
+# Heading that starts a file section in PROTOCOL.md-style prompts. Under "## Code to Review"
+# any single-word heading names a file (Makefile, Dockerfile); elsewhere it must look like a path.
+FILE_HEADING = re.compile(r"^### (\S+)\s*$")
+PATH_LIKE = re.compile(r"\.|/")
+
+# Top-level prompt headings from PROTOCOL.md. Only these end a file section, so "## " lines
+# inside a file (markdown, "## Section" comments) stay part of it.
+PROMPT_HEADINGS = frozenset(
+    {"Project Context", "Code to Review", "Review Focus", "Output Format", "Design Question", "Advisory Focus"}
+)
+CODE_HEADING = "Code to Review"
+
+
+class CompactionSettings(TypedDict):
+    """Which compaction passes run."""
+
+    strip_comments: bool
+    drop_patterns: list[str]
+
+
+class CompactionReport(TypedDict):
+    """What compaction removed and the estimated token savings."""
+
+    tokens_before: int
+    tokens_after: int
+    tokens_saved: int
+    dropped_files: list[str]
+    duplicate_paragraphs: int
+    license_headers: int
+    comment_lines: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _comment_prefix(path: str) -> str | None:
+    """Return the line comment prefix for a file path, if known."""
+    for ext, prefix in LINE_COMMENT_PREFIXES.items():
+        if path.endswith(ext):
+            return prefix
+    return None
+
+
+def _is_comment_line(line: str, prefix: str) -> bool:
+    """Whether a line is a full-line comment (excluding shebangs)."""
+    stripped = line.lstrip()
+    return stripped.startswith(prefix) and not stripped.startswith("#!")
+
+
+def _collapse_license_header(lines: list[str], prefix: str | None) -> bool:
+    """Blank out a leading license comment block in place.
+
+    The first line becomes a marker so reviewers know something was there.
+    Returns whether a header was collapsed.
+    """
+    if prefix is None:
+        return False
+    start = 0
+    while start < len(lines) and (not lines[start].strip() or lines[start].startswith("#!")):
+        start += 1
+    end = start
+    while end < len(lines) and _is_comment_line(lines[end], prefix):
+        end += 1
+    if end - start < 3 or not LICENSE_MARKERS.search("".join(lines[start:end])):
+        return False
+    lines[start] = f"{prefix} [license header omitted]\n"
+    for i in range(start + 1, end):
+        lines[i] = "\n"
+    return True
+
+
+def _python_docstring_ranges(source: str) -> list[tuple[int, int]]:
+    """Return (first, last) 0-based line ranges of docstrings in Python source."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    ranges = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        body = node.body
+        if (
+            body
+            and isinstance(body[0], ast.Expr)
+            and isinstance(body[0].value, ast.Constant)
+            and isinstance(body[0].value.value, str)
+            and body[0].end_lineno is not None
+        ):
+            ranges.append((body[0].lineno - 1, body[0].end_lineno - 1))
+    return ranges
+
+
+def _python_comment_lines(source: str) -> list[int]:
+    """Return 0-based indexes of lines holding only a comment, per the tokenizer.
+
+    Unlike a prefix check this skips "#" lines inside multi-line strings.
+    Source that stops tokenizing (e.g. an unterminated string in a partial
+    file) keeps the comments found before that point.
+    """
+    found = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            if tok.type == tokenize.COMMENT and not tok.line[: tok.start[1]].strip():
+                found.append(tok.start[0] - 1)
+    except (tokenize.TokenError, SyntaxError):
+        pass
+    return found
+
+
+def _strip_comments(lines: list[str], path: str) -> int:
+    """Blank out full-line comments and docstrings of a Python file in place.
+
+    Other languages are left alone: without a tokenizer a comment cannot be
+    told apart from string contents. Returns the number of lines blanked.
+    """
+    if not path.endswith(".py"):
+        return 0
+    stripped = 0
+    source = "".join(lines)
+    for i in _python_comment_lines(source):
+        if i < len(lines) and "[license header omitted]" not in lines[i]:
+            lines[i] = "\n"
+            stripped += 1
+    for first, last in _python_docstring_ranges(source):
+        if last >= len(lines):
+            continue
+        indent = lines[first][: len(lines[first]) - len(lines[first].lstrip())]
+        lines[first] = f'{indent}"""[docstring omitted]"""\n'
+        for i in range(first + 1, last + 1):
+            lines[i] = "\n"
+        stripped += last - first + 1
+    return stripped
+
+
+def _split_sections(prompt: str) -> list[tuple[str | None, list[str]]]:
+    """Split a prompt into (file path or None, lines) sections.
+
+    A file section starts at a "### <path>" heading and runs until the next
+    file heading or prompt heading (PROMPT_HEADINGS); everything else is prose
+    with path None. Other headings are file content, since markdown files and
+    "#" comments look like them.
+    """
+    sections: list[tuple[str | None, list[str]]] = [(None, [])]
+    in_code = False
+    for line in prompt.splitlines(keepends=True):
+        text = line.rstrip()
+        if text.startswith("## ") and text[3:].strip() in PROMPT_HEADINGS:
+            in_code = text[3:].strip() == CODE_HEADING
+            if sections[-1][0] is not None:
+                sections.append((None, [line]))
+                continue
+        match = FILE_HEADING.match(text)
+        if match and (in_code or PATH_LIKE.search(match.group(1))):
+            sections.append((match.group(1), [line]))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _is_low_value(path: str, patterns: list[str]) -> bool:
+    """Whether a file path or its basename matches a drop pattern."""
+    name = path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+def _dedupe_paragraphs(text: str, seen: set[str]) -> tuple[str, int]:
+    """Replace paragraphs already in seen with a short marker.
+
+    Paragraphs are separated by blank lines; markdown headings count as
+    paragraphs of their own so a repeated rule body is caught even when it
+    sits under a different heading.
+    """
+    out: list[str] = []
+    block: list[str] = []
+    removed = 0
+
+    def flush() -> None:
+        nonlocal removed
+        if not block:
+            return
+        key = " ".join("".join(block).split())
+        if len(key) >= MIN_DEDUPE_CHARS and key in seen:
+            out.append("[duplicate paragraph omitted]\n")
+            removed += 1
+        else:
+            if len(key) >= MIN_DEDUPE_CHARS:
+                seen.add(key)
+            out.extend(block)
+        block.clear()
+
+    for line in text.splitlines(keepends=True):
+        if not line.strip():
+            flush()
+            out.append(line)
+        elif line.startswith("#"):
+            flush()
+            block.append(line)
+            flush()
+        else:
+            block.append(line)
+    flush()
+    return "".join(out), removed
+
+
+def compact_prompt(prompt: str, settings: CompactionSettings) -> tuple[str, CompactionReport]:
+    """Compact a review prompt, returning the new prompt and a report."""
+    report = CompactionReport(
+        tokens_before=estimate_tokens(prompt),
+        tokens_after=0,
+        tokens_saved=0,
+        dropped_files=[],
+        duplicate_paragraphs=0,
+        license_headers=0,
+        comment_lines=0,
+    )
+    seen: set[str] = set()
+    parts = []
+    for path, lines in _split_sections(prompt):
+        if path is None:
+            text, removed = _dedupe_paragraphs("".join(lines), seen)
+            report["duplicate_paragraphs"] += removed
+            parts.append(re.sub(r"\n{3,}", "\n\n", text))
+            continue
+
+        if _is_low_value(path, settings["drop_patterns"]):
+            report["dropped_files"].append(path)
+            parts.append(f"{lines[0]}[omitted: low-value file]\n\n")
+            continue
+
+        heading, body = lines[0], lines[1:]
+        if _collapse_license_header(body, _comment_prefix(path)):
+            report["license_headers"] += 1
+        if settings["strip_comments"]:
+            report["comment_lines"] += _strip_comments(body, path)
+        parts.append(heading + "".join(body))
+
+    compacted = "".join(parts)
+    if not prompt.endswith("\n"):
+        compacted = compacted.rstrip("\n")
+    report["tokens_after"] = estimate_tokens(compacted)
+    report["tokens_saved"] = report["tokens_before"] - report["tokens_after"]
+    return compacted, report
+
+
+def compaction_from_config(config: dict[str, Any]) -> CompactionSettings | None:
+    """Return compaction settings from providers.json, or None when disabled.
+
+    "compaction": true enables the defaults; an object may set enabled,
+    strip_comments and drop_patterns. Raises ValueError for invalid settings.
+    """
+    raw = config.get("compaction")
+    if raw is None or raw is False:
+        return None
+    if raw is True:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("compaction must be an object or boolean")
+    if raw.get("enabled", True) is False:
+        return None
+    patterns = raw.get("drop_patterns", DEFAULT_DROP_PATTERNS)
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        raise ValueError("compaction.drop_patterns must be a list of glob strings")
+    strip = raw.get("strip_comments", False)
+    if not isinstance(strip, bool):
+        raise ValueError("compaction.strip_comments must be a boolean")
+    return CompactionSettings(strip_comments=strip, drop_patterns=list(patterns))
@@ -0,0 +1,25 @@
+"""Shared fixtures for the star-chamber tests."""
+
+import pytest
+
+
+class _FakeClock:
+    """Manually advanced clock for time-dependent state."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def isolated_state_dir(tmp_path, monkeypatch):
+    """Keep shared session state (circuit breaker etc.) out of the real cache."""
+    monkeypatch.setenv("STAR_CHAMBER_STATE_DIR", str(tmp_path / "state"))
+
+
+@pytest.fixture
+def fake_clock():
+    """A clock that only moves when the test advances its now attribute."""
+    return _FakeClock()
@@ -0,0 +1,584 @@
+"""
+Symbol-level context slicing for star-chamber review prompts.
+
+Instead of whole files, a slice holds the functions and classes touched by
+a change plus the context a reviewer needs to judge them:
+- Types (classes, structs, interfaces) the changed code references
+- Direct callees defined in the repository
+- Direct callers of the changed symbols
+
+Python is parsed with `ast`; Go and TypeScript/JavaScript with lightweight
+declaration patterns and brace matching. Symbols of every source file in
+the repository are kept in a cached index that is updated incrementally
+from file modification times. Snippets are added in priority order until
+the token budget is spent.
+"""
+
+import ast
+import bisect
+import json
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, TypedDict
+
+from compaction import estimate_tokens
+
+
+INDEX_VERSION = 1
+
+# Source files larger than this are not indexed.
+MAX_INDEXED_FILE_BYTES = 1024 * 1024
+
+# Definitions considered per referenced name (common names like "get" would
+# otherwise pull in half the repository).
+MAX_DEFINITIONS_PER_NAME = 3
+
+# Callers included per changed symbol.
+MAX_CALLERS_PER_SYMBOL = 5
+
+# Lines of surrounding context kept around changed module-level code.
+MODULE_CONTEXT_LINES = 2
+
+LANGUAGES = {
+    ".py": "python",
+    ".go": "go",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".js": "typescript",
+    ".jsx": "typescript",
+    ".mjs": "typescript",
+}
+COMMENT_PREFIX = {"python": "#", "go": "//", "typescript": "//"}
+
+# Snippet roles in the order they are added to a slice.
+ROLES = ("changed", "type", "callee", "caller")
+
+CALLABLE_KINDS = ("function", "method")
+TYPE_KINDS = ("class", "type")
+
+GO_DECLARATIONS = [
+    (re.compile(r"^func\s+\(\s*(?:\w+\s+)?\*?\s*(?P<recv>\w+)[^)]*\)\s*(?P<name>\w+)", re.M), "method"),
+    (re.compile(r"^func\s+(?P<name>\w+)", re.M), "function"),
+    (re.compile(r"^type\s+(?P<name>\w+)", re.M), "type"),
+]
+
+TS_PREFIX = r"^[ \t]*(?:export[ \t]+)?(?:default[ \t]+)?(?:declare[ \t]+)?"
+TS_DECLARATIONS = [
+    (re.compile(TS_PREFIX + r"(?:async[ \t]+)?function\b\s*\*?\s*(?P<name>\w+)", re.M), "function"),
+    (re.compile(TS_PREFIX + r"(?:abstract[ \t]+)?class[ \t]+(?P<name>\w+)", re.M), "class"),
+    (re.compile(TS_PREFIX + r"(?:interface|enum)[ \t]+(?P<name>\w+)", re.M), "type"),
+    (re.compile(TS_PREFIX + r"type[ \t]+(?P<name>\w+)[^=\n]*=", re.M), "type"),
+    (
+        re.compile(
+            TS_PREFIX + r"(?:const|let|var)[ \t]+(?P<name>\w+)[^=\n]*=[ \t]*(?:async[ \t]+)?"
+            r"(?:function\b|\([^)]*\)[^=\n]*=>|\w+[ \t]*=>)",
+            re.M,
+        ),
+        "function",
+    ),
+]
+TS_METHOD = re.compile(
+    r"^[ \t]+(?:(?:public|private|protected|static|async|readonly|override|get|set)[ \t]+)*"
+    r"(?P<name>\w+)[ \t]*(?:<[^>\n]*>)?\([^;{]*\)[^;{=]*\{",
+    re.M,
+)
+
+CALL = re.compile(r"\b([A-Za-z_]\w*)\s*(?:<[^<>()]*>)?\s*\(")
+IDENTIFIER = re.compile(r"\b[A-Za-z_]\w*\b")
+KEYWORDS = {
+    "if", "for", "while", "switch", "catch", "return", "function", "func", "new", "typeof", "await",
+    "super", "constructor", "else", "do", "try", "throw", "delete", "void", "in", "of", "go", "defer",
+    "make", "len", "cap", "append", "panic", "range", "select", "case", "import", "require", "async",
+}
+
+
+class Symbol(TypedDict):
+    """A function, method, class or type definition."""
+
+    # Qualified name ("Class.method"); lookups use the part after the last dot.
+    name: str
+    kind: str
+    # 1-based, inclusive line range including decorators.
+    start: int
+    end: int
+    # Names this symbol calls and identifiers it references.
+    calls: list[str]
+    refs: list[str]
+
+
+class Snippet(TypedDict):
+    """A line range included in (or omitted from) a slice."""
+
+    path: str
+    start: int
+    end: int
+    role: str
+    symbols: list[str]
+    tokens: int
+
+
+class SliceResult(TypedDict):
+    """A rendered slice and what went into it."""
+
+    text: str
+    tokens: int
+    budget: int
+    included: list[Snippet]
+    omitted: list[Snippet]
+    index: dict[str, int]
+
+
+def short_name(name: str) -> str:
+    """Return the unqualified part of a symbol name."""
+    return name.rsplit(".", 1)[-1]
+
+
+def _python_names(node: ast.AST) -> tuple[set[str], set[str]]:
+    """Return the names called and referenced inside a Python definition."""
+    calls: set[str] = set()
+    refs: set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            if isinstance(child.func, ast.Name):
+                calls.add(child.func.id)
+            elif isinstance(child.func, ast.Attribute):
+                calls.add(child.func.attr)
+        elif isinstance(child, ast.Name):
+            refs.add(child.id)
+        elif isinstance(child, ast.Constant) and isinstance(child.value, str) and child.value.isidentifier():
+            refs.add(child.value)  # String annotations ("Config").
+    return calls, refs
+
+
+def parse_python(source: str) -> list[Symbol]:
+    """Return the functions, methods and classes defined in Python source."""
+    tree = ast.parse(source)
+    symbols: list[Symbol] = []
+
+    def visit(node: ast.AST, prefix: str, in_class: bool) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                is_class = isinstance(child, ast.ClassDef)
+                kind = "class" if is_class else ("method" if in_class else "function")
+                calls, refs = _python_names(child)
+                start = min([d.lineno for d in child.decorator_list] + [child.lineno])
+                symbols.append(Symbol(
+                    name=prefix + child.name,
+                    kind=kind,
+                    start=start,
+                    end=child.end_lineno or child.lineno,
+                    calls=sorted(calls),
+                    refs=sorted(refs),
+                ))
+                visit(child, f"{prefix}{child.name}.", is_class)
+
+    visit(tree, "", False)
+    return symbols
+
+
+def _mask(source: str) -> str:
+    """Blank out comments and string contents, keeping offsets and newlines."""
+    out = list(source)
+    i = 0
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            end = n if end == -1 else end
+            start = i
+            i = end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            start = i
+            i = end
+        elif c in "\"'`":
+            end = i + 1
+            while end < n and source[end] != c:
+                if source[end] == "\\":
+                    end += 1
+                elif source[end] == "\n" and c != "`":
+                    break
+                end += 1
+            # Keep the quotes so string-typed aliases still end where expected.
+            start = i + 1
+            i = end + 1
+        else:
+            i += 1
+            continue
+        for j in range(start, min(end, n)):
+            if out[j] != "\n":
+                out[j] = " "
+    return "".join(out)
+
+
+def _block_end(masked: str, offset: int, kind: str) -> int:
+    """Return the offset where the declaration starting at offset ends."""
+    line_end = masked.find("\n", offset)
+    line_end = len(masked) if line_end == -1 else line_end
+    brace = masked.find("{", offset)
+    semicolon = masked.find(";", offset)
+    if kind == "type" and (brace == -1 or brace > line_end):
+        # Aliases such as `type ID int` or `type Mode = "a" | "b";`.
+        if masked[offset:line_end].rstrip().endswith(("=", "|", "&")) and semicolon != -1:
+            return semicolon
+        return line_end
+    if brace == -1 or (semicolon != -1 and semicolon < brace):
+        return semicolon if semicolon != -1 else line_end
+    depth = 0
+    for i in range(brace, len(masked)):
+        if masked[i] == "{":
+            depth += 1
+        elif masked[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(masked) - 1
+
+
+def _brace_symbols(source: str, declarations: list[tuple[re.Pattern[str], str]], methods: bool) -> list[Symbol]:
+    """Return declarations found by pattern in a brace-delimited language."""
+    masked = _mask(source)
+    found: dict[int, tuple[str, str, int]] = {}
+    for pattern, kind in declarations:
+        for m in pattern.finditer(masked):
+            if m.start() in found:
+                continue
+            name = m.group("name")
+            if "recv" in pattern.groupindex:
+                name = f"{m.group('recv')}.{name}"
+            found[m.start()] = (name, kind, _block_end(masked, m.end(), kind))
+    if methods:
+        classes = [(start, end, name) for start, (name, kind, end) in found.items() if kind == "class"]
+        for m in TS_METHOD.finditer(masked):
+            if m.group("name") in KEYWORDS:
+                continue
+            owner = next((name for start, end, name in classes if start < m.start() < end), None)
+            if owner is not None and m.start() not in found:
+                found[m.start()] = (f"{owner}.{m.group('name')}", "method", _block_end(masked, m.end() - 1, "method"))
+
+    line_starts = [0] + [m.end() for m in re.finditer("\n", masked)]
+    symbols = []
+    for start, (name, kind, end) in sorted(found.items()):
+        body = masked[start:end + 1]
+        # Declarations of nested members look like calls; they are not.
+        nested = {short_name(n) for s, (n, _, _) in found.items() if start < s <= end}
+        calls = set(CALL.findall(body)) - KEYWORDS - nested - {short_name(name)}
+        symbols.append(Symbol(
+            name=name,
+            kind=kind,
+            start=bisect.bisect_right(line_starts, start),
+            end=bisect.bisect_right(line_starts, end),
+            calls=sorted(calls),
+            refs=sorted(set(IDENTIFIER.findall(body)) - KEYWORDS),
+        ))
+    return symbols
+
+
+def parse_source(source: str, language: str) -> list[Symbol]:
+    """Return the symbols defined in source ([] if it cannot be parsed)."""
+    try:
+        if language == "python":
+            return parse_python(source)
+        if language == "go":
+            return _brace_symbols(source, GO_DECLARATIONS, methods=False)
+        return _brace_symbols(source, TS_DECLARATIONS, methods=True)
+    except (SyntaxError, ValueError, RecursionError):
+        return []
+
+
+def _git_lines(root: Path, *args: str) -> list[str] | None:
+    try:
+        output = subprocess.check_output(["git", *args], cwd=root, text=True, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.splitlines()
+
+
+def _source_files(root: Path) -> list[str]:
+    """Return the repository's source files (tracked and untracked, not ignored)."""
+    names = _git_lines(root, "ls-files", "--cached", "--others", "--exclude-standard")
+    if names is None:
+        names = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "node_modules"]
+            rel = os.path.relpath(dirpath, root)
+            names.extend(os.path.normpath(os.path.join(rel, f)) for f in filenames)
+    return sorted(n for n in names if os.path.splitext(n)[1] in LANGUAGES)
+
+
+class SymbolIndex:
+    """Per-repository symbol index cached in a JSON file.
+
+    refresh() re-parses only files whose modification time or size changed
+    since the cached entry and drops deleted files.
+    """
+
+    def __init__(self, root: str | Path, cache_path: str | Path | None = None) -> None:
+        self.root = Path(root).resolve()
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.files: dict[str, dict[str, Any]] = {}
+        self.stats = {"files": 0, "parsed": 0, "reused": 0, "removed": 0}
+        self._by_name: dict[str, list[tuple[str, Symbol]]] = {}
+        self._callers: dict[str, list[tuple[str, Symbol]]] = {}
+
+    def _load_cache(self) -> dict[str, dict[str, Any]]:
+        if self.cache_path is None:
+            return {}
+        try:
+            cached = json.loads(self.cache_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(cached, dict) or cached.get("version") != INDEX_VERSION:
+            return {}
+        if cached.get("root") != str(self.root):
+            return {}
+        files = cached.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def refresh(self) -> "SymbolIndex":
+        """Bring the index up to date with the work tree, saving it if anything changed."""
+        cached = self._load_cache()
+        files: dict[str, dict[str, Any]] = {}
+        stats = {"files": 0, "parsed": 0, "reused": 0, "removed": 0}
+        for rel in _source_files(self.root):
+            try:
+                st = (self.root / rel).stat()
+            except OSError:
+                continue
+            if st.st_size > MAX_INDEXED_FILE_BYTES:
+                continue
+            entry = cached.get(rel)
+            if entry and entry.get("mtime_ns") == st.st_mtime_ns and entry.get("size") == st.st_size:
+                files[rel] = entry
+                stats["reused"] += 1
+                continue
+            try:
+                source = (self.root / rel).read_text()
+            except (OSError, UnicodeDecodeError):
+                continue
+            language = LANGUAGES[os.path.splitext(rel)[1]]
+            files[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "symbols": parse_source(source, language)}
+            stats["parsed"] += 1
+        stats["files"] = len(files)
+        stats["removed"] = len(set(cached) - set(files))
+        self.files = files
+        self.stats = stats
+        if self.cache_path is not None and (stats["parsed"] or stats["removed"]):
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps({"version": INDEX_VERSION, "root": str(self.root), "files": files}))
+            os.replace(tmp_path, self.cache_path)
+        self._build_lookups()
+        return self
+
+    def _build_lookups(self) -> None:
+        self._by_name = {}
+        self._callers = {}
+        for rel, entry in self.files.items():
+            for symbol in entry["symbols"]:
+                self._by_name.setdefault(short_name(symbol["name"]), []).append((rel, symbol))
+                for called in symbol["calls"]:
+                    self._callers.setdefault(called, []).append((rel, symbol))
+
+    def symbols(self, path: str) -> list[Symbol]:
+        """Return the symbols indexed for a file."""
+        return self.files.get(path, {}).get("symbols", [])
+
+    def definitions(self, name: str, kinds: tuple[str, ...], near: str) -> list[tuple[str, Symbol]]:
+        """Return definitions of name of the given kinds, those in file near first."""
+        matches = [(rel, s) for rel, s in self._by_name.get(name, []) if s["kind"] in kinds]
+        matches.sort(key=lambda m: m[0] != near)
+        return matches[:MAX_DEFINITIONS_PER_NAME]
+
+    def callers(self, name: str) -> list[tuple[str, Symbol]]:
+        """Return symbols that call name."""
+        return [(rel, s) for rel, s in self._callers.get(name, []) if short_name(s["name"]) != name]
+
+
+def changed_files(root: Path, base: str = "HEAD") -> list[str]:
+    """Return the root-relative paths changed since base, plus untracked files."""
+    names = _git_lines(root, "diff", "--name-only", "--diff-filter=ACMRT", base, "--") or []
+    names += _git_lines(root, "ls-files", "--others", "--exclude-standard") or []
+    return sorted({n for n in names if n})
+
+
+def changed_lines(root: Path, path: str, base: str = "HEAD") -> set[int] | None:
+    """Return the lines of path changed since base, or None for the whole file.
+
+    The whole file counts as changed when it is untracked or has no diff
+    against base (e.g. it was just committed).
+    """
+    output = _git_lines(root, "diff", "-U0", base, "--", path)
+    if not output:
+        return None
+    lines: set[int] = set()
+    for line in output:
+        m = re.match(r"@@ -\S+ \+(\d+)(?:,(\d+))? @@", line)
+        if m:
+            start, count = int(m.group(1)), int(m.group(2) or 1)
+            # A pure deletion is attributed to the line after it.
+            lines.update(range(start, start + count) if count else [max(start, 1)])
+    return lines or None
+
+
+def _enclosing(symbols: list[Symbol], line: int) -> Symbol | None:
+    """Return the symbol a changed line belongs to.
+
+    That is the innermost definition containing it, widened to the outermost
+    enclosing function so that nested helpers are shown with their parent.
+    """
+    containing = sorted((s for s in symbols if s["start"] <= line <= s["end"]), key=lambda s: s["end"] - s["start"])
+    if not containing:
+        return None
+    chosen = containing[0]
+    for outer in containing[1:]:
+        if outer["kind"] not in CALLABLE_KINDS:
+            break
+        chosen = outer
+    return chosen
+
+
+def _changed_snippets(
+    index: SymbolIndex, path: str, lines: set[int] | None, total_lines: int,
+) -> list[tuple[str, Symbol | None, int, int]]:
+    """Return (path, symbol, start, end) for the code changed in one file."""
+    symbols = index.symbols(path)
+    if lines is None:
+        top_level = [s for s in symbols if not any(o is not s and o["start"] <= s["start"] and s["end"] <= o["end"]
+                                                   for o in symbols)]
+        if top_level:
+            return [(path, s, s["start"], s["end"]) for s in top_level]
+        return [(path, None, 1, total_lines)]
+
+    snippets: dict[Any, tuple[str, Symbol | None, int, int]] = {}
+    for line in sorted(lines):
+        symbol = _enclosing(symbols, line)
+        if symbol is not None and not (symbol["kind"] in TYPE_KINDS and any(
+            o is not symbol and symbol["start"] <= o["start"] and o["end"] <= symbol["end"] for o in symbols
+        )):
+            snippets[symbol["name"], symbol["start"]] = (path, symbol, symbol["start"], symbol["end"])
+            continue
+        # Module-level code, or a class body outside its methods: the line with a
+        # little context, since the whole class would pull in every method.
+        low, high = (symbol["start"], symbol["end"]) if symbol is not None else (1, total_lines)
+        start = max(low, line - MODULE_CONTEXT_LINES)
+        end = min(high, line + MODULE_CONTEXT_LINES)
+        snippets[None, line] = (path, symbol, start, end)
+    return list(snippets.values())
+
+
+def _render(root: Path, snippets: list[Snippet], sources: dict[str, list[str]]) -> str:
+    """Render snippets as "### <path>" sections with a line-range marker per range."""
+    by_file: dict[str, list[Snippet]] = {}
+    for snippet in snippets:
+        by_file.setdefault(snippet["path"], []).append(snippet)
+    parts = []
+    for path, file_snippets in by_file.items():
+        prefix = COMMENT_PREFIX[LANGUAGES[os.path.splitext(path)[1]]]
+        # Merge overlapping and adjacent ranges.
+        merged: list[list[Any]] = []
+        for s in sorted(file_snippets, key=lambda s: (s["start"], -s["end"])):
+            if not merged or s["start"] > merged[-1][1] + 1:
+                merged.append([s["start"], s["end"], {}])
+            merged[-1][1] = max(merged[-1][1], s["end"])
+            names = merged[-1][2].setdefault(s["role"], [])
+            names.extend(n for n in s["symbols"] if n not in names)
+        lines = sources[path]
+        section = [f"\n### {path}\n"]
+        for start, end, roles in merged:
+            labels = "; ".join(f"{role}: {', '.join(names)}" if names else role for role, names in roles.items())
+            section.append(f"{prefix} [lines {start}-{end}] {labels}\n")
+            section.append("".join(lines[start - 1:end]))
+            if not section[-1].endswith("\n"):
+                section.append("\n")
+        parts.append("".join(section))
+    return "".join(parts)
+
+
+def slice_context(
+    index: SymbolIndex,
+    targets: dict[str, set[int] | None],
+    budget: int,
+) -> SliceResult:
+    """Build a slice of the changed code and its context within budget tokens.
+
+    targets maps each changed file to its changed lines (None for the whole
+    file). Snippets are taken in ROLES order, each only if it fits what is
+    left of the budget, and context only once all changed code fits; the
+    rest are reported as omitted.
+    """
+    root = index.root
+    sources: dict[str, list[str]] = {}
+
+    def lines_of(path: str) -> list[str]:
+        if path not in sources:
+            try:
+                sources[path] = (root / path).read_text().splitlines(keepends=True)
+            except (OSError, UnicodeDecodeError):
+                sources[path] = []
+        return sources[path]
+
+    candidates: list[tuple[str, str, Symbol | None, int, int]] = []
+    changed: list[tuple[str, Symbol]] = []
+    for path, lines in targets.items():
+        if os.path.splitext(path)[1] not in LANGUAGES or not lines_of(path):
+            continue
+        for rel, symbol, start, end in _changed_snippets(index, path, lines, len(lines_of(path))):
+            candidates.append(("changed", rel, symbol, start, end))
+            if symbol is not None:
+                changed.append((rel, symbol))
+
+    seen = {(rel, s["name"], s["start"]) for rel, s in changed}
+
+    def add(role: str, rel: str, symbol: Symbol) -> None:
+        key = (rel, symbol["name"], symbol["start"])
+        if key not in seen:
+            seen.add(key)
+            candidates.append((role, rel, symbol, symbol["start"], symbol["end"]))
+
+    for rel, symbol in changed:
+        for name in symbol["refs"]:
+            for d_rel, d_symbol in index.definitions(name, TYPE_KINDS, rel):
+                add("type", d_rel, d_symbol)
+    for rel, symbol in changed:
+        for name in symbol["calls"]:
+            for d_rel, d_symbol in index.definitions(name, CALLABLE_KINDS, rel):
+                add("callee", d_rel, d_symbol)
+    for rel, symbol in changed:
+        for c_rel, c_symbol in index.callers(short_name(symbol["name"]))[:MAX_CALLERS_PER_SYMBOL]:
+            add("caller", c_rel, c_symbol)
+
+    included: list[Snippet] = []
+    omitted: list[Snippet] = []
+    used = 0
+    for role, rel, symbol, start, end in candidates:
+        text = "".join(lines_of(rel)[start - 1:end])
+        snippet = Snippet(
+            path=rel,
+            start=start,
+            end=end,
+            role=role,
+            symbols=[symbol["name"]] if symbol is not None else [],
+            tokens=estimate_tokens(text),
+        )
+        # Context is only worth sending alongside all of the changed code.
+        subject_missing = role != "changed" and any(o["role"] == "changed" for o in omitted)
+        if used + snippet["tokens"] <= budget and not subject_missing:
+            included.append(snippet)
+            used += snippet["tokens"]
+        else:
+            omitted.append(snippet)
+
+    text = _render(root, included, sources)
+    return SliceResult(
+        text=text,
+        tokens=estimate_tokens(text),
+        budget=budget,
+        included=included,
+        omitted=omitted,
+        index=dict(index.stats),
+    )
@@ -0,0 +1,14 @@
+"""Token checks and user lookup for the admin API."""
+
+import sqlite3
+
+
+def check_token(supplied: str, expected: str) -> bool:
+    """Return whether the supplied API token is valid."""
+    return supplied == expected
+
+
+def find_user(conn: sqlite3.Connection, name: str):
+    """Return the user row with the given name, or None."""
+    cur = conn.execute(f"SELECT id, name, role FROM users WHERE name = '{name}'")
+    return cur.fetchone()
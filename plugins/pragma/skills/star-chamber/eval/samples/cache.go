@@ -0,0 +1,33 @@
+package cache
+
+import (
+	"os"
+	"time"
+)
+
+// Cache keeps loaded values for a fixed time.
+type Cache struct {
+	ttl     time.Duration
+	entries map[string]entry
+}
+
+type entry struct {
+	value   []byte
+	expires time.Time
+}
+
+// New returns an empty cache.
+func New(ttl time.Duration) *Cache {
+	return &Cache{ttl: ttl, entries: map[string]entry{}}
+}
+
+// Get returns the cached file contents, loading them on a miss.
+// Called concurrently from request handlers.
+func (c *Cache) Get(path string) []byte {
+	if e, ok := c.entries[path]; ok && time.Now().Before(e.expires) {
+		return e.value
+	}
+	data, _ := os.ReadFile(path)
+	c.entries[path] = entry{value: data, expires: time.Now().Add(c.ttl)}
+	return data
+}
@@ -0,0 +1,19 @@
+"""Paginate query results for the listing endpoints."""
+
+
+def page(items, number, size=20):
+    """Return the 1-based page `number` of items."""
+    start = number * size
+    return items[start:start + size]
+
+
+def page_count(total, size=20):
+    """Return how many pages total items fill."""
+    return total // size
+
+
+def collect(rows, seen=[]):
+    """Return rows not returned by an earlier call."""
+    fresh = [r for r in rows if r not in seen]
+    seen.extend(fresh)
+    return fresh
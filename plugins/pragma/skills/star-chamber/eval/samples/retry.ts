@@ -0,0 +1,28 @@
+export interface RetryOptions {
+  attempts: number;
+  delayMs: number;
+}
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export async function withRetry<T>(fn: () => Promise<T>, opts: RetryOptions): Promise<T> {
+  let lastError: unknown;
+  for (let i = 0; i < opts.attempts; i++) {
+    try {
+      return await fn();
+    } catch (err) {
+      lastError = err;
+      sleep(opts.delayMs * 2 ** i);
+    }
+  }
+  throw lastError;
+}
+
+export async function fetchJson(url: string): Promise<unknown> {
+  try {
+    const res = await withRetry(() => fetch(url), { attempts: 3, delayMs: 100 });
+    return await res.json();
+  } catch {
+    return null;
+  }
+}
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation harness for choosing a star-chamber council.
+
+Runs every provider/model over a corpus of code samples with seeded,
+labelled defects and scores each possible council (combinations of models)
+on defect recall, precision, latency and cost, then reports the Pareto front
+and the cheapest, fastest council that meets a recall bar.
+
+Responses come from one of:
+- the corpus's simulated responses (default; no network, no SDKs)
+- a cassette recorded earlier with --live --record (--replay <dir>)
+- the providers in providers.json, only with --live
+
+Usage:
+    uv run --project <dir> --isolated evaluate.py [--min-recall 0.8]
+    uv run --project <dir> --isolated [--with <sdk>...] evaluate.py --live --record <dir>
+    uv run --project <dir> --isolated evaluate.py --replay <dir>
+"""
+
+import argparse
+import itertools
+import re
+import sys
+from pathlib import Path
+from typing import Any, TypedDict
+
+import codec
+from llm_council import (
+    SCHEMA_CODE_REVIEW,
+    Cassette,
+    CircuitBreaker,
+    ConfigError,
+    Council,
+    ReviewResult,
+    StarChamberError,
+    extract_json,
+    get_config_path,
+    load_config,
+)
+
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "eval"
+
+# Lines either side of a labelled defect that still count as finding it.
+DEFAULT_LINE_TOLERANCE = 3
+
+# Largest council (number of models) scored.
+DEFAULT_MAX_COUNCIL = 3
+
+REVIEW_INTRO = (
+    "You are a senior software craftsman reviewing code for quality, idioms, "
+    "and architectural soundness.\n"
+)
+
+LOCATION = re.compile(r"^`?(?P<file>[^`:\s]+):(?P<line>\d+)")
+
+
+class Defect(TypedDict):
+    """A seeded defect: where it is and how serious."""
+
+    id: str
+    file: str
+    lines: list[int]
+    severity: str
+
+
+class EvalCase(TypedDict):
+    """One corpus sample: the files reviewed together and their defects."""
+
+    id: str
+    files: list[str]
+    defects: list[Defect]
+
+
+class CaseScore(TypedDict):
+    """How one model did on one case."""
+
+    found: list[str]
+    true_positives: int
+    issues: int
+    elapsed_seconds: float
+    cost_usd: float | None
+    success: bool
+
+
+def load_corpus(directory: Path) -> dict[str, Any]:
+    """Load and check corpus.json, raising ConfigError if it is invalid."""
+    path = directory / "corpus.json"
+    try:
+        corpus = codec.loads(path.read_bytes())
+    except FileNotFoundError as e:
+        raise ConfigError(f"Corpus not found: {path}") from e
+    except ValueError as e:
+        raise ConfigError(f"Invalid JSON in corpus: {path}", details=str(e)) from e
+    cases = corpus.get("cases") if isinstance(corpus, dict) else None
+    if not isinstance(cases, list) or not cases:
+        raise ConfigError("Corpus must list cases", path=str(path))
+    for case in cases:
+        for name in case.get("files", []):
+            if not (directory / name).is_file():
+                raise ConfigError("Corpus file missing", case=case.get("id"), file=name)
+        for defect in case.get("defects", []):
+            lines = defect.get("lines")
+            if not (isinstance(lines, list) and len(lines) == 2 and lines[0] <= lines[1]):
+                raise ConfigError(
+                    "Defect lines must be [first, last]", case=case.get("id"), defect=defect.get("id"),
+                )
+    return corpus
+
+
+def case_prompt(corpus: dict[str, Any], case: EvalCase, directory: Path) -> str:
+    """Assemble the review prompt for a case as PROTOCOL.md Step 3 does."""
+    parts = [REVIEW_INTRO, "\n## Code to Review\n"]
+    for name in case["files"]:
+        parts.append(f"\n### {name}\n{(directory / name).read_text()}")
+    parts.append("\n" + corpus.get("instructions", ""))
+    return "".join(parts)
+
+
+def parse_location(location: Any) -> tuple[str, int] | None:
+    """Split an issue location ("file:line") into its file and line."""
+    if not isinstance(location, str):
+        return None
+    match = LOCATION.match(location.strip())
+    if match is None:
+        return None
+    return match.group("file"), int(match.group("line"))
+
+
+def _same_file(reported: str, labelled: str) -> bool:
+    """Whether a reported path refers to a labelled file (allowing prefixes)."""
+    return reported == labelled or reported.endswith("/" + labelled) or labelled.endswith("/" + reported)
+
+
+def match_issues(
+    issues: list[Any], defects: list[Defect], tolerance: int = DEFAULT_LINE_TOLERANCE,
+) -> tuple[list[str], int]:
+    """Match reported issues to labelled defects.
+
+    Each issue counts for at most one defect, the nearest one within the
+    line tolerance. An issue on an already found defect still counts as a
+    true positive (a duplicate, not a false alarm).
+    Returns the found defect ids and the number of true positive issues.
+    """
+    found: list[str] = []
+    true_positives = 0
+    for issue in issues:
+        where = parse_location(issue.get("location") if isinstance(issue, dict) else None)
+        if where is None:
+            continue
+        path, line = where
+        hits = [
+            d for d in defects
+            if _same_file(path, d["file"]) and d["lines"][0] - tolerance <= line <= d["lines"][1] + tolerance
+        ]
+        if not hits:
+            continue
+        true_positives += 1
+        # Credit the nearest defect; among equally near ones prefer one not yet
+        # found (two defects on one line), then the tightest.
+        nearest = min(
+            hits,
+            key=lambda d: (
+                max(d["lines"][0] - line, 0, line - d["lines"][1]),
+                d["id"] in found,
+                d["lines"][1] - d["lines"][0],
+            ),
+        )
+        if nearest["id"] not in found:
+            found.append(nearest["id"])
+    return found, true_positives
+
+
+def review_cost(result: ReviewResult, pricing: dict[str, Any]) -> float | None:
+    """Return the USD cost of a review from its usage, or None if unpriced."""
+    price = pricing.get(CircuitBreaker.key(result))
+    usage = result.get("usage") or {}
+    if not price or "prompt_tokens" not in usage:
+        return None
+    return (
+        usage["prompt_tokens"] * price.get("input_per_mtok", 0.0)
+        + usage.get("completion_tokens", 0) * price.get("output_per_mtok", 0.0)
+    ) / 1_000_000
+
+
+def score_case(
+    result: ReviewResult, case: EvalCase, pricing: dict[str, Any], tolerance: int,
+) -> CaseScore:
+    """Score one model's review of one case."""
+    parsed = result.get("parsed_json") if result.get("success") else None
+    issues = parsed.get("issues", []) if isinstance(parsed, dict) else []
+    if not isinstance(issues, list):
+        issues = []
+    found, true_positives = match_issues(issues, case["defects"], tolerance)
+    return CaseScore(
+        found=found,
+        true_positives=true_positives,
+        issues=len(issues),
+        elapsed_seconds=float(result.get("elapsed_seconds") or 0.0),
+        cost_usd=review_cost(result, pricing),
+        success=bool(result.get("success")),
+    )
+
+
+def simulated_results(directory: Path, case: EvalCase) -> dict[str, ReviewResult]:
+    """Return the corpus's simulated responses for a case, keyed by provider/model."""
+    path = directory / "responses" / f"{case['id']}.json"
+    try:
+        entries = codec.loads(path.read_bytes())
+    except FileNotFoundError:
+        return {}
+    results = {}
+    for key, entry in entries.items():
+        if key.startswith("_"):
+            continue
+        provider, _, model = key.partition("/")
+        content = entry.get("content") or ""
+        results[key] = ReviewResult(
+            provider=provider,
+            model=model,
+            success=True,
+            content=content,
+            parsed_json=extract_json(content),
+            usage=entry.get("usage", {}),
+            elapsed_seconds=entry.get("elapsed_seconds", 0.0),
+            replayed=True,
+        )
+    return results
+
+
+async def council_results(
+    council: Council, corpus: dict[str, Any], directory: Path,
+) -> dict[str, dict[str, ReviewResult]]:
+    """Review every case with a council, returning results by case and provider/model."""
+    results: dict[str, dict[str, ReviewResult]] = {}
+    for case in corpus["cases"]:
+        output = await council.review(case_prompt(corpus, case, directory), case["files"])
+        reviews = output["reviews"] + output.get("failed_reviews", [])
+        results[case["id"]] = {CircuitBreaker.key(r): r for r in reviews}
+    return results
+
+
+def score_models(
+    results: dict[str, dict[str, ReviewResult]],
+    corpus: dict[str, Any],
+    tolerance: int,
+) -> dict[str, dict[str, CaseScore]]:
+    """Score every model on every case it answered."""
+    pricing = {k: v for k, v in corpus.get("pricing", {}).items() if not k.startswith("_")}
+    scores: dict[str, dict[str, CaseScore]] = {}
+    for case in corpus["cases"]:
+        for key, result in results.get(case["id"], {}).items():
+            scores.setdefault(key, {})[case["id"]] = score_case(result, case, pricing, tolerance)
+    return scores
+
+
+def score_council(
+    members: tuple[str, ...],
+    scores: dict[str, dict[str, CaseScore]],
+    cases: list[EvalCase],
+) -> dict[str, Any]:
+    """Combine member scores into council metrics.
+
+    Providers run in parallel, so a case takes as long as its slowest member;
+    a defect counts as found when any member found it.
+    """
+    total_defects = sum(len(c["defects"]) for c in cases)
+    found = true_positives = issues = failures = 0
+    latency = cost = 0.0
+    cost_known = True
+    missed = []
+    for case in cases:
+        member_scores = [scores[m].get(case["id"]) for m in members]
+        answered = [s for s in member_scores if s is not None]
+        case_found = {d for s in answered if s["success"] for d in s["found"]}
+        found += len(case_found)
+        missed += [d["id"] for d in case["defects"] if d["id"] not in case_found]
+        true_positives += sum(s["true_positives"] for s in answered)
+        issues += sum(s["issues"] for s in answered)
+        failures += sum(1 for s in member_scores if s is None or not s["success"])
+        latency = latency + max((s["elapsed_seconds"] for s in answered), default=0.0)
+        for s in answered:
+            if s["cost_usd"] is None:
+                cost_known = False
+            else:
+                cost += s["cost_usd"]
+    return {
+        "providers": list(members),
+        "recall": round(found / total_defects, 3) if total_defects else 1.0,
+        "precision": round(true_positives / issues, 3) if issues else 1.0,
+        "mean_latency_seconds": round(latency / len(cases), 2),
+        "cost_usd": round(cost, 4) if cost_known else None,
+        "failures": failures,
+        "missed": missed,
+    }
+
+
+def _cost_key(council: dict[str, Any]) -> float:
+    """Cost for ranking; unpriced councils rank last."""
+    return council["cost_usd"] if council["cost_usd"] is not None else float("inf")
+
+
+def _dominates(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    """Whether council a is at least as good as b on every axis and better on one."""
+    cost_a = _cost_key(a)
+    cost_b = _cost_key(b)
+    better_or_equal = (
+        a["recall"] >= b["recall"]
+        and a["precision"] >= b["precision"]
+        and a["mean_latency_seconds"] <= b["mean_latency_seconds"]
+        and cost_a <= cost_b
+    )
+    strictly_better = (
+        a["recall"] > b["recall"]
+        or a["precision"] > b["precision"]
+        or a["mean_latency_seconds"] < b["mean_latency_seconds"]
+        or cost_a < cost_b
+    )
+    return better_or_equal and strictly_better
+
+
+def pareto_front(councils: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Return the councils no other council dominates."""
+    return [c for c in councils if not any(_dominates(other, c) for other in councils)]
+
+
+def recommend(councils: list[dict[str, Any]], min_recall: float) -> dict[str, Any] | None:
+    """Return the cheapest, then fastest, council meeting the recall bar."""
+    eligible = [c for c in councils if c["recall"] >= min_recall]
+    if not eligible:
+        return None
+    return min(
+        eligible,
+        key=lambda c: (_cost_key(c), c["mean_latency_seconds"], -c["precision"]),
+    )
+
+
+def evaluate(
+    results: dict[str, dict[str, ReviewResult]],
+    corpus: dict[str, Any],
+    min_recall: float,
+    max_council: int = DEFAULT_MAX_COUNCIL,
+    tolerance: int = DEFAULT_LINE_TOLERANCE,
+) -> dict[str, Any]:
+    """Score models and councils and build the report."""
+    cases = corpus["cases"]
+    scores = score_models(results, corpus, tolerance)
+    models = sorted(scores)
+    councils = [
+        score_council(members, scores, cases)
+        for size in range(1, min(max_council, len(models)) + 1)
+        for members in itertools.combinations(models, size)
+    ]
+    councils.sort(key=lambda c: (_cost_key(c), c["providers"]))
+    front = pareto_front(councils)
+    for council in councils:
+        council["pareto"] = council in front
+    return {
+        "cases": len(cases),
+        "defects": sum(len(c["defects"]) for c in cases),
+        "models": {m: score_council((m,), scores, cases) for m in models},
+        "councils": councils,
+        "pareto_front": [c["providers"] for c in front],
+        "min_recall": min_recall,
+        "recommendation": recommend(councils, min_recall),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the evaluation and print the report as JSON."""
+    parser = argparse.ArgumentParser(
+        prog="evaluate.py",
+        description="Score provider/model councils on a corpus of seeded defects",
+    )
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="Corpus directory (default: bundled)")
+    parser.add_argument("--min-recall", type=float, default=0.8, help="Recall bar for the recommendation")
+    parser.add_argument("--max-council", type=int, default=DEFAULT_MAX_COUNCIL, help="Largest council scored")
+    parser.add_argument(
+        "--line-tolerance", type=int, default=DEFAULT_LINE_TOLERANCE,
+        help="Lines either side of a defect that still count as finding it",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--replay", metavar="DIR", help="Score a cassette recorded with --live --record")
+    source.add_argument("--live", action="store_true", help="Call the providers in providers.json (costs money)")
+    parser.add_argument("--record", metavar="DIR", help="With --live, save responses for later --replay")
+    parser.add_argument("--provider", "-p", action="append", help="With --live/--replay, limit to these providers")
+    args = parser.parse_args(argv)
+
+    if args.record and not args.live:
+        parser.error("--record requires --live")
+    if args.max_council < 1:
+        parser.error("--max-council must be at least 1")
+
+    try:
+        corpus = load_corpus(args.corpus)
+        if args.live or args.replay:
+            cassette = None
+            if args.replay:
+                cassette = Cassette(args.replay, Cassette.REPLAY, latency_scale=0)
+            elif args.record:
+                cassette = Cassette(args.record, Cassette.RECORD)
+            council = Council(
+                load_config(get_config_path()),
+                providers=args.provider,
+                cassette=cassette,
+                schema=SCHEMA_CODE_REVIEW,
+                cascade=False,
+            )
+            results = codec.run(council_results(council, corpus, args.corpus))
+            source_name = "replay" if args.replay else "live"
+        else:
+            results = {c["id"]: simulated_results(args.corpus, c) for c in corpus["cases"]}
+            source_name = "simulated"
+    except StarChamberError as e:
+        print(codec.dumps(e.to_dict(), indent=True))
+        sys.exit(1)
+
+    report = evaluate(results, corpus, args.min_recall, args.max_council, args.line_tolerance)
+    print(codec.dumps({"source": source_name, **report}, indent=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+SQLite-backed job queue for star-chamber review farms.
+
+Review jobs are rows in one SQLite table that any number of worker
+processes share. A worker claims a job by taking a lease on it, renews the
+lease while the review runs and writes the result back. A job whose lease
+expires (its worker died or hung) is claimed again by another worker;
+failed jobs are retried with exponential backoff up to max_attempts.
+
+The database uses WAL journaling, so submitters and status readers never
+block workers. WAL needs shared memory, so every process must run on the
+machine that holds the file; for workers on several machines sharing it
+over a network filesystem, disable WAL (rollback journal) instead.
+"""
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypedDict
+
+
+# Job states.
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STATES = (QUEUED, RUNNING, DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    state TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires_at REAL,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, available_at);
+"""
+
+
+class QueueSettings(TypedDict):
+    """Queue tuning from providers.json."""
+
+    # Database file; None means the default under the state directory.
+    path: str | None
+    # Seconds a claim lasts without renewal before other workers may take the job over.
+    lease_seconds: float
+    # Attempts (including lease takeovers) before a job is marked failed.
+    max_attempts: int
+    # Delay before the first retry; doubled for each further attempt.
+    retry_delay_seconds: float
+    # WAL journaling; disable only for a database on a network filesystem.
+    wal: bool
+
+
+DEFAULT_QUEUE_SETTINGS = QueueSettings(
+    path=None, lease_seconds=300.0, max_attempts=3, retry_delay_seconds=30.0, wal=True,
+)
+
+
+class Job(TypedDict):
+    """A claimed job."""
+
+    id: int
+    payload: dict[str, Any]
+    # Attempt number of this claim; completing or failing requires the same attempt.
+    attempts: int
+    max_attempts: int
+
+
+class JobQueue:
+    """Review job table shared by submitters and workers.
+
+    Every method opens its own connection, so one JobQueue may be used from
+    several threads (workers call it through asyncio.to_thread).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        settings: QueueSettings = DEFAULT_QUEUE_SETTINGS,
+        clock: Any = time.time,
+    ) -> None:
+        self.path = Path(path)
+        self.settings = settings
+        self._clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(f"PRAGMA journal_mode={'WAL' if settings['wal'] else 'DELETE'}")
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("PRAGMA synchronous=NORMAL")
+            yield db
+        finally:
+            db.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in a write transaction taken up front (no upgrade deadlocks)."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+
+    def submit(self, payloads: list[dict[str, Any]]) -> list[int]:
+        """Queue jobs and return their ids."""
+        now = self._clock()
+        ids = []
+        with self._transaction() as db:
+            for payload in payloads:
+                cursor = db.execute(
+                    "INSERT INTO jobs (state, payload, max_attempts, available_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (QUEUED, json.dumps(payload), self.settings["max_attempts"], now, now, now),
+                )
+                ids.append(int(cursor.lastrowid))
+        return ids
+
+    def claim(self, worker: str) -> Job | None:
+        """Lease the oldest runnable job to worker, or return None if there is none.
+
+        Runnable means queued and past its retry delay, or running with an
+        expired lease. A takeover counts as an attempt; a job out of
+        attempts is marked failed instead of being handed out.
+        """
+        while True:
+            now = self._clock()
+            with self._transaction() as db:
+                row = db.execute(
+                    "SELECT id, payload, attempts, max_attempts, state, error FROM jobs"
+                    " WHERE (state = ? AND available_at <= ?) OR (state = ? AND lease_expires_at < ?)"
+                    " ORDER BY id LIMIT 1",
+                    (QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["attempts"] >= row["max_attempts"]:
+                    error = row["error"] if row["state"] == QUEUED else "lease expired (worker lost)"
+                    db.execute(
+                        "UPDATE jobs SET state = ?, error = ?, worker = NULL, lease_expires_at = NULL,"
+                        " updated_at = ? WHERE id = ?",
+                        (FAILED, error, now, row["id"]),
+                    )
+                    continue
+                attempts = row["attempts"] + 1
+                db.execute(
+                    "UPDATE jobs SET state = ?, attempts = ?, worker = ?, lease_expires_at = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (RUNNING, attempts, worker, now + self.settings["lease_seconds"], now, row["id"]),
+                )
+                return Job(
+                    id=row["id"],
+                    payload=json.loads(row["payload"]),
+                    attempts=attempts,
+                    max_attempts=row["max_attempts"],
+                )
+
+    def _update_owned(self, db: sqlite3.Connection, job: Job, worker: str, sql: str, args: tuple[Any, ...]) -> bool:
+        """Apply an update only while worker still holds this attempt's lease."""
+        cursor = db.execute(
+            f"UPDATE jobs SET {sql} WHERE id = ? AND state = ? AND worker = ? AND attempts = ?",
+            (*args, job["id"], RUNNING, worker, job["attempts"]),
+        )
+        return cursor.rowcount == 1
+
+    def renew(self, job: Job, worker: str) -> bool:
+        """Extend worker's lease on job; False if the lease was lost."""
+        now = self._clock()
+        with self._transaction() as db:
+            return self._update_owned(
+                db, job, worker, "lease_expires_at = ?, updated_at = ?", (now + self.settings["lease_seconds"], now),
+            )
+
+    def complete(self, job: Job, worker: str, result: dict[str, Any]) -> bool:
+        """Store job's result; False if the lease was lost (the result is discarded)."""
+        now = self._clock()
+        with self._transaction() as db:
+            return self._update_owned(
+                db, job, worker,
+                "state = ?, result = ?, error = NULL, worker = NULL, lease_expires_at = NULL, updated_at = ?",
+                (DONE, json.dumps(result), now),
+            )
+
+    def fail(self, job: Job, worker: str, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt, queueing a retry while attempts remain.
+
+        Returns False if the lease was lost.
+        """
+        now = self._clock()
+        if retry and job["attempts"] < job["max_attempts"]:
+            delay = self.settings["retry_delay_seconds"] * 2 ** (job["attempts"] - 1)
+            sql = "state = ?, error = ?, worker = NULL, lease_expires_at = NULL, available_at = ?, updated_at = ?"
+            args: tuple[Any, ...] = (QUEUED, error, now + delay, now)
+        else:
+            sql = "state = ?, error = ?, worker = NULL, lease_expires_at = NULL, updated_at = ?"
+            args = (FAILED, error, now)
+        with self._transaction() as db:
+            return self._update_owned(db, job, worker, sql, args)
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._connect() as db:
+            rows = db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return {state: 0 for state in STATES} | {row[0]: row[1] for row in rows}
+
+    def jobs(self, ids: list[int], include_result: bool = False) -> list[dict[str, Any]]:
+        """Return the state of each job in ids (unknown ids are left out)."""
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT id, state, attempts, max_attempts, worker, error, result, created_at, updated_at"
+                f" FROM jobs WHERE id IN ({placeholders}) ORDER BY id",
+                ids,
+            ).fetchall()
+        jobs = []
+        for row in rows:
+            job = {k: row[k] for k in ("id", "state", "attempts", "max_attempts", "created_at", "updated_at")}
+            if row["worker"]:
+                job["worker"] = row["worker"]
+            if row["error"]:
+                job["error"] = row["error"]
+            if include_result and row["result"] is not None:
+                job["output"] = json.loads(row["result"])
+            jobs.append(job)
+        return jobs
+
+
+def queue_settings_from_config(config: dict[str, Any]) -> QueueSettings:
+    """Return queue settings from providers.json, with defaults for missing fields.
+
+    Raises ValueError for invalid settings.
+    """
+    raw = config.get("queue", {})
+    if not isinstance(raw, dict):
+        raise ValueError("queue must be an object")
+    settings = QueueSettings(**DEFAULT_QUEUE_SETTINGS)
+    path = raw.get("path")
+    if path is not None and not isinstance(path, str):
+        raise ValueError("queue.path must be a string")
+    settings["path"] = path
+    for name in ("lease_seconds", "retry_delay_seconds"):
+        value = raw.get(name, settings[name])
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"queue.{name} must be a positive number")
+        settings[name] = float(value)
+    attempts = raw.get("max_attempts", settings["max_attempts"])
+    if isinstance(attempts, bool) or not isinstance(attempts, int) or attempts < 1:
+        raise ValueError("queue.max_attempts must be a positive integer")
+    settings["max_attempts"] = attempts
+    wal = raw.get("wal", True)
+    if not isinstance(wal, bool):
+        raise ValueError("queue.wal must be a boolean")
+    settings["wal"] = wal
+    return settings
@@ -7,6 +7,11 @@ Features:
 - Fan in responses for aggregation
 - Target specific files or recent changes
 - Select providers or use default config
+- Embed in an asyncio application via the Council class
+- Precompute reviews of changed files in the background (watch subcommand)
+- Spread review jobs over worker processes through a shared SQLite queue
+- Slice changed files down to the changed symbols and their context
+- Render the council's reviews as the Step 6 markdown report
 
 Note: Debate mode (multi-round deliberation) is orchestrated by Claude Code
 in SKILL.md, not by this script. This script handles single-round parallel calls.
@@ -14,13 +19,42 @@ in SKILL.md, not by this script. This script handles single-round parallel calls
 
 import argparse
 import asyncio
+import fnmatch
+import hashlib
+import importlib
 import json
 import os
 import re
+import socket
 import subprocess
 import sys
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, nullcontext
 from pathlib import Path
-from typing import Any, TypedDict
+from typing import Any, AsyncContextManager, TypedDict
+
+import codec
+from breaker import CircuitBreaker, breaker_settings_from_config
+from cassette import Cassette
+from compaction import (
+    CompactionReport,
+    CompactionSettings,
+    DEFAULT_DROP_PATTERNS,
+    compact_prompt,
+    compaction_from_config,
+    estimate_tokens,
+)
+from context_slicer import SymbolIndex, changed_files, changed_lines, slice_context
+from job_queue import DONE, FAILED, Job, JobQueue, queue_settings_from_config
+from rate_limit import RateLimiter, has_rate_limits
+from report import design_question, render_markdown
+from review_store import ReviewStore, content_hash
+from state import state_dir
+from stream_guard import GuardSettings, RunawayGuard, guard_settings_from_config, salvage_json
+from timeouts import AdaptiveTimeouts, adaptive_timeout_settings_from_config
+from watcher import ChangeWatcher, repo_root
+from watcher import changed_files as watch_changed_files
 
 
 # API key patterns to redact from error messages.
@@ -36,6 +70,179 @@ API_KEY_PATTERNS = [
 # Fallback when provider config omits max_tokens.
 DEFAULT_MAX_TOKENS = 16384
 
+# Sampling temperature sent with every review request.
+REVIEW_TEMPERATURE = 0.3
+
+# Usage fields copied from provider responses (OpenAI-style usage object).
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+# Import names for SDK packages whose module differs from the package name
+# (after "-" becomes "_"). Used by warmup to import each SDK once.
+SDK_IMPORT_NAMES = {
+    "any-llm-sdk": "any_llm",
+    "azure-ai-inference": "azure.ai.inference",
+    "cerebras_cloud_sdk": "cerebras.cloud.sdk",
+    "google-genai": "google.genai",
+}
+
+# Local scheduler sizing: host resources assumed per concurrent local request.
+DEFAULT_LOCAL_CORES_PER_REQUEST = 4
+DEFAULT_LOCAL_MEMORY_PER_REQUEST_GB = 8.0
+
+# Follow-up repair requests per provider when a review fails schema validation.
+DEFAULT_REPAIR_ATTEMPTS = 1
+
+# Pre-flight: smallest output budget worth sending a request for, and the
+# safety factor applied to the (rough) prompt token estimate.
+MIN_OUTPUT_TOKENS = 1024
+PROMPT_TOKEN_MARGIN = 1.15
+
+# Watch mode: the largest file reviewed speculatively, and the default
+# hourly token budget.
+DEFAULT_WATCH_MAX_FILE_BYTES = 256 * 1024
+DEFAULT_WATCH_TOKENS_PER_HOUR = 200_000
+
+# Default token budget for symbol-level context slices.
+DEFAULT_SLICE_BUDGET_TOKENS = 8000
+
+# Files read into the project context of speculative reviews (PROTOCOL.md Step 2).
+WATCH_CONTEXT_FILES = (".claude/rules/universal.md", "ARCHITECTURE.md")
+
+# Fields of a model capability entry and their types (None allowed for limits).
+CAPABILITY_FIELDS: dict[str, type] = {
+    "context_window": int,
+    "max_output_tokens": int,
+    "max_tokens_param": str,
+    "temperature": bool,
+    "streaming": bool,
+    "prompt_caching": bool,
+}
+
+# Review output schemas from PROTOCOL.md Step 3 and the design question mode.
+SCHEMA_CODE_REVIEW = "code-review"
+SCHEMA_DESIGN_QUESTION = "design-question"
+SCHEMA_AUTO = "auto"
+SCHEMA_NONE = "none"
+
+# JSON skeletons quoted back to providers in repair requests.
+SCHEMA_TEMPLATES = {
+    SCHEMA_CODE_REVIEW: """{
+  "provider": "your-name",
+  "quality_rating": "excellent|good|fair|needs-work",
+  "issues": [
+    {
+      "severity": "high|medium|low",
+      "location": "file:line",
+      "category": "craftsmanship|architecture|correctness|invariants|maintainability",
+      "description": "What is wrong",
+      "suggestion": "How to fix it"
+    }
+  ],
+  "praise": ["What is done well"],
+  "summary": "One paragraph overall assessment"
+}""",
+    SCHEMA_DESIGN_QUESTION: """{
+  "provider": "your-name",
+  "recommendation": "Your recommended approach",
+  "approaches": [
+    {
+      "name": "Approach name",
+      "pros": ["..."],
+      "cons": ["..."],
+      "risk_level": "low|medium|high",
+      "fit_rating": "excellent|good|fair|poor"
+    }
+  ],
+  "summary": "One paragraph overall recommendation with reasoning"
+}""",
+}
+
+# Ordered severity and confidence levels (lowest first) used by cascade mode.
+SEVERITY_LEVELS = ("low", "medium", "high")
+CONFIDENCE_LEVELS = ("low", "medium", "high")
+
+# Provider tier that reviews first in cascade mode.
+TRIAGE_TIER = "triage"
+
+TRIAGE_INSTRUCTIONS = """
+
+## Triage
+You are the first-pass triage reviewer. Your findings decide which files are \
+escalated to a slower, more thorough council. In addition to the fields above, \
+include "confidence": "high|medium|low" in your JSON: how confident you are \
+that you found every significant issue."""
+
+# Single-file code review sent by watch mode (PROTOCOL.md Step 3).
+WATCH_PROMPT_TEMPLATE = """You are a senior software craftsman reviewing code for quality, idioms, \
+and architectural soundness.
+
+## Project Context
+{context}
+
+## Code to Review
+
+### {path}
+{content}
+
+## Review Focus
+1. Craftsmanship: Is this idiomatic, clean, well-structured?
+2. Architecture: Does this fit the project's patterns? Any design concerns?
+3. Correctness: Any logical issues, edge cases, or bugs?
+4. Invariants: Do classifications (terminal, final, immutable) match runtime reality? Are there states \
+where cleanup or cancellation is assumed but not enforced? Does the code's model of the system match \
+what actually happens?
+5. Maintainability: Will this be easy to understand and modify later?
+
+## Output Format
+Provide your review as structured JSON:
+""" + SCHEMA_TEMPLATES[SCHEMA_CODE_REVIEW].replace("{", "{{").replace("}", "}}")
+
+# Code review quality ratings, worst first.
+QUALITY_RATINGS = ("needs-work", "fair", "good", "excellent")
+
+REPAIR_PROMPT_TEMPLATE = """Your previous response could not be used because it is not valid JSON \
+matching the required schema.
+
+Problems found:
+{errors}
+
+Required schema:
+{schema}
+
+Your previous response:
+{content}
+
+Return ONLY the corrected JSON object, with no prose or markdown fences. \
+Keep your original findings; only fix the structure."""
+
+
+class StarChamberError(Exception):
+    """Base class for errors raised to callers instead of exiting the process.
+
+    details holds extra JSON fields (hints, offending values) that the CLI
+    prints alongside the message.
+    """
+
+    def __init__(self, message: str, **details: Any) -> None:
+        super().__init__(message)
+        self.details = details
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the error as the JSON object printed by the CLI."""
+        return {"error": str(self), **self.details}
+
+
+class ConfigError(StarChamberError):
+    """Provider config or SDK map is missing or invalid."""
+
+
+class PlatformKeyError(StarChamberError):
+    """Platform mode is enabled but no ANY_LLM_KEY is available."""
+
+
+class ProviderSelectionError(StarChamberError):
+    """None of the requested providers are configured."""
+
 
 class ProviderConfig(TypedDict, total=False):
     """Configuration for a single LLM provider."""
@@ -46,6 +253,16 @@ class ProviderConfig(TypedDict, total=False):
     max_tokens: int
     api_base: str
     local: bool
+    tier: str
+    rate_limit: dict[str, int]
+    capabilities: dict[str, Any]
+
+
+class CascadeConfig(TypedDict):
+    """Cascade mode settings: when triage findings escalate to the full council."""
+
+    escalate_severity: str
+    min_confidence: str
 
 
 class ReviewResult(TypedDict, total=False):
@@ -57,6 +274,94 @@ class ReviewResult(TypedDict, total=False):
     content: str
     parsed_json: dict[str, Any] | list[Any] | None
     error: str
+    usage: dict[str, int]
+    elapsed_seconds: float
+    replayed: bool
+    skipped: bool
+    schema_valid: bool
+    schema_errors: list[str]
+    repair_attempts: int
+    stage: str
+    queued_seconds: float
+    rate_limit_wait_seconds: float
+    truncated: bool
+    truncation_reason: str
+    max_tokens_adjusted: int
+    from_watch: list[str]
+    timeout_seconds: float
+    timed_out: bool
+
+
+def request_fingerprint(config: ProviderConfig, prompt: str) -> str:
+    """Return a stable hash identifying a provider request.
+
+    Covers everything that shapes the response (provider, model, endpoint,
+    token limit and prompt) but never the API key.
+    """
+    # Always the stdlib encoder, so cassettes match whichever codec is installed.
+    payload = json.dumps(
+        {
+            "provider": config["provider"].lower(),
+            "model": config["model"],
+            "api_base": config.get("api_base", ""),
+            "max_tokens": config.get("max_tokens", DEFAULT_MAX_TOKENS),
+            "temperature": REVIEW_TEMPERATURE,
+            "prompt": prompt,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def merge_stored_reviews(
+    config: ProviderConfig, fresh: ReviewResult | None, entries: list[dict[str, Any]],
+) -> ReviewResult:
+    """Combine stored single-file reviews with a fresh review of the other files.
+
+    Issues and praise are concatenated, summaries joined, and the worst
+    quality rating wins. A failed or non-code-review fresh result is
+    returned unchanged.
+    """
+    if fresh is not None:
+        usable = fresh.get("success") and isinstance(fresh.get("parsed_json"), dict)
+        if not entries or not usable:
+            return fresh
+
+    parts = [e["parsed_json"] for e in entries]
+    if fresh is not None:
+        parts.insert(0, fresh["parsed_json"])
+    ratings = [p.get("quality_rating") for p in parts if p.get("quality_rating") in QUALITY_RATINGS]
+    merged: dict[str, Any] = {
+        "provider": parts[0].get("provider", config["provider"]),
+        "quality_rating": min(ratings, key=QUALITY_RATINGS.index) if ratings else "good",
+        "issues": [i for p in parts if isinstance(p.get("issues"), list) for i in p["issues"]],
+        "praise": [i for p in parts if isinstance(p.get("praise"), list) for i in p["praise"]],
+        "summary": " ".join(p["summary"] for p in parts if isinstance(p.get("summary"), str)),
+    }
+
+    result = ReviewResult(**fresh) if fresh is not None else ReviewResult(
+        provider=config["provider"],
+        model=config["model"],
+        success=True,
+        elapsed_seconds=0.0,
+    )
+    result["content"] = codec.dumps(merged)
+    result["parsed_json"] = merged
+    result["from_watch"] = [e["path"] for e in entries]
+    return result
+
+
+def _usage_from_response(response: Any) -> dict[str, int]:
+    """Copy integer token counts from a provider response, if reported."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    counts = {}
+    for field in USAGE_FIELDS:
+        value = getattr(usage, field, None)
+        if isinstance(value, int):
+            counts[field] = value
+    return counts
 
 
 def extract_json(content: str) -> dict[str, Any] | list[Any] | None:
@@ -75,7 +380,7 @@ def extract_json(content: str) -> dict[str, Any] | list[Any] | None:
 
     # Try direct parse first.
     try:
-        return json.loads(content)
+        return codec.loads(content)
     except json.JSONDecodeError:
         pass
 
@@ -89,7 +394,7 @@ def extract_json(content: str) -> dict[str, Any] | list[Any] | None:
         match = re.search(pattern, content, re.DOTALL)
         if match:
             try:
-                return json.loads(match.group(1))
+                return codec.loads(match.group(1))
             except json.JSONDecodeError:
                 continue
 
@@ -105,45 +410,286 @@ def sanitize_error(message: str) -> str:
     return result
 
 
+def detect_schema(prompt: str) -> str | None:
+    """Infer which review schema a prompt asks for from its Output Format."""
+    if '"approaches"' in prompt and '"recommendation"' in prompt:
+        return SCHEMA_DESIGN_QUESTION
+    if '"quality_rating"' in prompt and '"issues"' in prompt:
+        return SCHEMA_CODE_REVIEW
+    return None
+
+
+def _check_enum(value: Any, allowed: tuple[str, ...], where: str, errors: list[str]) -> None:
+    """Append an error unless value is one of the allowed strings."""
+    if value not in allowed:
+        errors.append(f"{where} must be one of {'|'.join(allowed)}, got {value!r}")
+
+
+def _check_string(value: Any, where: str, errors: list[str]) -> None:
+    """Append an error unless value is a non-empty string."""
+    if not isinstance(value, str) or not value.strip():
+        errors.append(f"{where} must be a non-empty string")
+
+
+def _check_string_list(value: Any, where: str, errors: list[str]) -> None:
+    """Append an error unless value is a list of strings."""
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        errors.append(f"{where} must be a list of strings")
+
+
+def validate_review(parsed: Any, schema: str) -> list[str]:
+    """Validate a parsed review against a PROTOCOL.md schema.
+
+    Returns a list of human-readable problems; an empty list means valid.
+    """
+    if parsed is None:
+        return ["response is not parseable JSON"]
+    if not isinstance(parsed, dict):
+        return [f"top level must be a JSON object, got {type(parsed).__name__}"]
+
+    errors: list[str] = []
+    _check_string(parsed.get("provider"), "provider", errors)
+    if "summary" in parsed:
+        _check_string(parsed["summary"], "summary", errors)
+
+    if schema == SCHEMA_CODE_REVIEW:
+        _check_enum(
+            parsed.get("quality_rating"), ("excellent", "good", "fair", "needs-work"),
+            "quality_rating", errors,
+        )
+        issues = parsed.get("issues")
+        if not isinstance(issues, list):
+            errors.append("issues must be a list")
+            issues = []
+        for i, issue in enumerate(issues):
+            where = f"issues[{i}]"
+            if not isinstance(issue, dict):
+                errors.append(f"{where} must be an object")
+                continue
+            _check_enum(issue.get("severity"), ("high", "medium", "low"), f"{where}.severity", errors)
+            _check_string(issue.get("location"), f"{where}.location", errors)
+            _check_string(issue.get("category"), f"{where}.category", errors)
+            _check_string(issue.get("description"), f"{where}.description", errors)
+        if "praise" in parsed:
+            _check_string_list(parsed["praise"], "praise", errors)
+    elif schema == SCHEMA_DESIGN_QUESTION:
+        _check_string(parsed.get("recommendation"), "recommendation", errors)
+        approaches = parsed.get("approaches")
+        if not isinstance(approaches, list):
+            errors.append("approaches must be a list")
+            approaches = []
+        for i, approach in enumerate(approaches):
+            where = f"approaches[{i}]"
+            if not isinstance(approach, dict):
+                errors.append(f"{where} must be an object")
+                continue
+            _check_string(approach.get("name"), f"{where}.name", errors)
+            _check_string_list(approach.get("pros"), f"{where}.pros", errors)
+            _check_string_list(approach.get("cons"), f"{where}.cons", errors)
+            _check_enum(approach.get("risk_level"), ("low", "medium", "high"), f"{where}.risk_level", errors)
+            _check_enum(
+                approach.get("fit_rating"), ("excellent", "good", "fair", "poor"),
+                f"{where}.fit_rating", errors,
+            )
+    else:
+        raise ValueError(f"Unknown review schema: {schema}")
+    return errors
+
+
+def build_repair_prompt(content: str, errors: list[str], schema: str) -> str:
+    """Build the follow-up request asking a provider to fix its JSON."""
+    return REPAIR_PROMPT_TEMPLATE.format(
+        errors="\n".join(f"- {e}" for e in errors[:20]),
+        schema=SCHEMA_TEMPLATES[schema],
+        content=content,
+    )
+
+
 def load_sdk_map() -> dict[str, str | None]:
-    """Load provider-to-SDK mapping."""
+    """Load provider-to-SDK mapping.
+
+    Raises ConfigError if sdk_map.json is missing or malformed.
+    """
     sdk_map_path = Path(__file__).resolve().parent / "sdk_map.json"
     if not sdk_map_path.exists():
-        print(
-            json.dumps({
-                "error": f"SDK map not found: {sdk_map_path}",
-                "hint": "Ensure star-chamber skill is set up correctly.",
-            }),
+        raise ConfigError(
+            f"SDK map not found: {sdk_map_path}",
+            hint="Ensure star-chamber skill is set up correctly.",
         )
-        sys.exit(1)
 
     try:
-        with open(sdk_map_path) as f:
-            data = json.load(f)
+        data = codec.loads(sdk_map_path.read_bytes())
     except json.JSONDecodeError as e:
-        print(
-            json.dumps({
-                "error": f"Invalid JSON in SDK map: {sdk_map_path}",
-                "details": str(e),
-                "hint": "Check the file for syntax errors.",
-            }),
-        )
-        sys.exit(1)
+        raise ConfigError(
+            f"Invalid JSON in SDK map: {sdk_map_path}",
+            details=str(e),
+            hint="Check the file for syntax errors.",
+        ) from e
 
     # Validate structure: should be dict with string keys and string/None values.
     if not isinstance(data, dict):
-        print(
-            json.dumps({
-                "error": "SDK map must be a JSON object",
-                "got": type(data).__name__,
-            }),
-        )
-        sys.exit(1)
+        raise ConfigError("SDK map must be a JSON object", got=type(data).__name__)
 
     data.pop("_comment", None)
     return data
 
 
+class ModelCapabilities(TypedDict):
+    """What a provider/model accepts, from model_capabilities.json."""
+
+    context_window: int | None
+    max_output_tokens: int | None
+    max_tokens_param: str
+    temperature: bool
+    streaming: bool
+    prompt_caching: bool
+
+
+_capability_registry: dict[str, Any] | None = None
+
+
+def load_capability_registry() -> dict[str, Any]:
+    """Load the model capability registry (cached after the first call).
+
+    Raises ConfigError if model_capabilities.json is missing or malformed.
+    """
+    global _capability_registry
+    if _capability_registry is not None:
+        return _capability_registry
+
+    registry_path = Path(__file__).resolve().parent / "model_capabilities.json"
+    try:
+        data = codec.loads(registry_path.read_bytes())
+    except FileNotFoundError as e:
+        raise ConfigError(
+            f"Model capability registry not found: {registry_path}",
+            hint="Ensure star-chamber skill is set up correctly.",
+        ) from e
+    except json.JSONDecodeError as e:
+        raise ConfigError(
+            f"Invalid JSON in model capability registry: {registry_path}",
+            details=str(e),
+        ) from e
+    if not isinstance(data, dict) or not isinstance(data.get("providers"), dict):
+        raise ConfigError("Model capability registry must be an object with providers")
+    _capability_registry = data
+    return data
+
+
+def validate_capabilities(raw: Any, where: str) -> dict[str, Any]:
+    """Check a capability override object, raising ConfigError if invalid."""
+    if not isinstance(raw, dict):
+        raise ConfigError(f"Invalid {where} in config", details="must be an object")
+    for name, value in raw.items():
+        if name.startswith("_"):
+            continue
+        expected = CAPABILITY_FIELDS.get(name)
+        if expected is None:
+            raise ConfigError(
+                f"Invalid {where} in config",
+                details=f"unknown field {name}",
+                choices=list(CAPABILITY_FIELDS),
+            )
+        if value is None and expected is int:
+            continue
+        if not isinstance(value, expected) or (expected is int and (isinstance(value, bool) or value < 1)):
+            raise ConfigError(f"Invalid {where} in config", details=f"{name} must be a {expected.__name__}")
+    return raw
+
+
+def _matching_entries(models: dict[str, Any], model: str) -> list[dict[str, Any]]:
+    """Return model entries matching model, least specific first."""
+    matches = [
+        (pattern == model, len(pattern), entry)
+        for pattern, entry in models.items()
+        if not pattern.startswith("_") and fnmatch.fnmatchcase(model, pattern)
+    ]
+    return [entry for _, _, entry in sorted(matches, key=lambda m: (m[0], m[1]))]
+
+
+def capabilities_for(
+    config: ProviderConfig, overrides: dict[str, Any] | None = None,
+) -> ModelCapabilities:
+    """Return the capabilities of a provider/model.
+
+    Layers, later winning: registry defaults, registry provider defaults,
+    matching registry model entries, matching entries from overrides (the
+    top-level model_capabilities in providers.json, same shape as the
+    registry's providers), then the provider's own capabilities.
+    """
+    registry = load_capability_registry()
+    provider = config["provider"].lower()
+    merged: dict[str, Any] = {**registry.get("defaults", {})}
+    for source in (registry["providers"], overrides or {}):
+        section = source.get(provider, {})
+        merged.update(section.get("defaults", {}))
+        for entry in _matching_entries(section.get("models", {}), config["model"]):
+            merged.update(entry)
+    merged.update(config.get("capabilities") or {})
+    return ModelCapabilities(**{k: merged.get(k) for k in CAPABILITY_FIELDS})
+
+
+def apply_capability_overrides(
+    providers: list[ProviderConfig], overrides: dict[str, Any] | None,
+) -> list[ProviderConfig]:
+    """Return provider copies whose capabilities include the top-level overrides."""
+    if not overrides:
+        return providers
+    return [{**p, "capabilities": dict(capabilities_for(p, overrides))} for p in providers]
+
+
+def capability_overrides_from_config(config: dict[str, Any]) -> dict[str, Any] | None:
+    """Validate model_capabilities and per-provider capabilities in providers.json."""
+    for p in config.get("providers", []):
+        if "capabilities" in p:
+            validate_capabilities(p["capabilities"], f"capabilities for {p.get('provider')}")
+    raw = config.get("model_capabilities")
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise ConfigError("Invalid model_capabilities in config", details="must be an object keyed by provider")
+    for provider, section in raw.items():
+        if not isinstance(section, dict):
+            raise ConfigError("Invalid model_capabilities in config", provider=provider, details="must be an object")
+        validate_capabilities(section.get("defaults", {}), f"model_capabilities.{provider}.defaults")
+        models = section.get("models", {})
+        if not isinstance(models, dict):
+            raise ConfigError(
+                "Invalid model_capabilities in config",
+                provider=provider,
+                details="models must be an object",
+            )
+        for pattern, entry in models.items():
+            validate_capabilities(entry, f"model_capabilities.{provider}.models.{pattern}")
+    return {provider.lower(): section for provider, section in raw.items()}
+
+
+def preflight(config: ProviderConfig, prompt: str) -> tuple[ProviderConfig, str | None]:
+    """Shape a request to fit the model before sending it.
+
+    Caps max_tokens at the model's output limit and at what is left of the
+    context window after the prompt. Returns the (possibly adjusted) config
+    and, when the prompt cannot fit at all, the reason to reject it.
+    """
+    caps = capabilities_for(config)
+    requested = config.get("max_tokens", DEFAULT_MAX_TOKENS)
+    max_tokens = requested
+    if caps["max_output_tokens"]:
+        max_tokens = min(max_tokens, caps["max_output_tokens"])
+    if caps["context_window"]:
+        prompt_tokens = int(estimate_tokens(prompt) * PROMPT_TOKEN_MARGIN)
+        room = caps["context_window"] - prompt_tokens
+        if room < MIN_OUTPUT_TOKENS:
+            return config, (
+                f"Prompt (~{prompt_tokens} tokens) does not fit the "
+                f"{caps['context_window']}-token context window of {CircuitBreaker.key(config)}"
+            )
+        max_tokens = min(max_tokens, room)
+    if max_tokens == requested:
+        return config, None
+    return ProviderConfig(**{**config, "max_tokens": max_tokens}), None
+
+
 def get_required_sdks(provider_names: list[str]) -> list[str]:
     """Return list of SDK packages needed for the given providers."""
     sdk_map = load_sdk_map()
@@ -160,9 +706,80 @@ def get_required_sdks(provider_names: list[str]) -> list[str]:
     return sorted(set(sdks))
 
 
+def get_required_sdks_for_config(
+    providers: list[ProviderConfig], platform: str | None,
+) -> list[str]:
+    """Return SDK packages needed for providers, including the platform client."""
+    sdks = get_required_sdks([p["provider"] for p in providers])
+    # In platform mode, add platform SDK.
+    if platform == "any-llm":
+        platform_sdk = load_sdk_map().get("platform")
+        if platform_sdk:
+            sdks = sorted(set(sdks + [platform_sdk]))
+    return sdks
+
+
+def sdk_import_name(sdk: str) -> str:
+    """Return the module to import for an SDK package name from sdk_map.json."""
+    package = sdk.split("[", 1)[0].lower()
+    return SDK_IMPORT_NAMES.get(package, package.replace("-", "_"))
+
+
 async def _get_review_internal(
-    config: ProviderConfig, prompt: str,
+    config: ProviderConfig,
+    prompt: str,
+    cassette: Cassette | None = None,
+    guard: GuardSettings | None = None,
 ) -> ReviewResult:
+    """Send prompt to a single provider, timing the call.
+
+    With a replay cassette the recorded response is returned instead of
+    calling the provider. With a record cassette the result is saved.
+    With guard settings the response is streamed through a RunawayGuard,
+    unless the model does not support streaming.
+    """
+    if cassette is not None and cassette.replaying:
+        result = ReviewResult(**await cassette.replay(config, request_fingerprint(config, prompt)))
+        if result["success"]:
+            result["parsed_json"] = extract_json(result["content"])
+        return result
+
+    started = time.perf_counter()
+    if guard is not None and capabilities_for(config)["streaming"]:
+        result = await _call_provider_guarded(config, prompt, guard)
+    else:
+        result = await _call_provider(config, prompt)
+    result["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+
+    if cassette is not None:
+        cassette.record(config, request_fingerprint(config, prompt), result)
+    return result
+
+
+def _completion_kwargs(config: ProviderConfig, prompt: str) -> dict[str, Any]:
+    """Build the acompletion arguments for one provider request."""
+    caps = capabilities_for(config)
+    max_tokens = config.get("max_tokens", DEFAULT_MAX_TOKENS)
+    if caps["max_output_tokens"]:
+        max_tokens = min(max_tokens, caps["max_output_tokens"])
+    kwargs: dict[str, Any] = {
+        "model": config["model"],
+        "provider": config["provider"],
+        "messages": [{"role": "user", "content": prompt}],
+        # Parameter name differs by model, e.g. max_completion_tokens for OpenAI.
+        caps["max_tokens_param"]: max_tokens,
+    }
+    if caps["temperature"]:
+        kwargs["temperature"] = REVIEW_TEMPERATURE
+    if config.get("api_key"):
+        kwargs["api_key"] = config["api_key"]
+    # If no api_key, SDK checks ANY_LLM_KEY and auto-routes through platform.
+    if config.get("api_base"):
+        kwargs["api_base"] = config["api_base"]
+    return kwargs
+
+
+async def _call_provider(config: ProviderConfig, prompt: str) -> ReviewResult:
     """Send prompt to a single provider and return structured response.
 
     If api_key is empty and ANY_LLM_KEY is set, the SDK auto-detects platform mode.
@@ -170,35 +787,12 @@ async def _get_review_internal(
     """
     provider = config["provider"]
     model = config["model"]
-    api_key = config.get("api_key", "")
-    max_tokens = config.get("max_tokens", DEFAULT_MAX_TOKENS)
-    api_base = config.get("api_base", "")
-    local = config.get("local", False)
 
     try:
         # Import here to allow uv run --with to install the dependency.
         from any_llm import acompletion
 
-        kwargs: dict[str, Any] = {
-            "model": model,
-            "provider": provider,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-        }
-        # OpenAI gpt-5.x and o-series models require max_completion_tokens
-        # instead of max_tokens. any-llm-sdk doesn't map this automatically
-        # (see https://github.com/mozilla-ai/any-llm/issues/862).
-        if provider.lower() == "openai":
-            kwargs["max_completion_tokens"] = max_tokens
-        else:
-            kwargs["max_tokens"] = max_tokens
-        if api_key:
-            kwargs["api_key"] = api_key
-        # If no api_key, SDK checks ANY_LLM_KEY and auto-routes through platform.
-        if api_base:
-            kwargs["api_base"] = api_base
-
-        response = await acompletion(**kwargs)
+        response = await acompletion(**_completion_kwargs(config, prompt))
         if not response.choices:
             return ReviewResult(
                 provider=provider,
@@ -207,14 +801,95 @@ async def _get_review_internal(
                 error="No response choices returned from provider",
             )
         content = response.choices[0].message.content
-        return ReviewResult(
+        result = ReviewResult(
             provider=provider,
             model=model,
             success=True,
             content=content,
             parsed_json=extract_json(content),
         )
-    except ImportError:
+        usage = _usage_from_response(response)
+        if usage:
+            result["usage"] = usage
+        return result
+    except Exception as e:
+        return _provider_error(config, e)
+
+
+async def _call_provider_guarded(
+    config: ProviderConfig, prompt: str, settings: GuardSettings,
+) -> ReviewResult:
+    """Stream a provider's response, aborting it if the output runs away.
+
+    An aborted review keeps whatever JSON was complete before the degenerate
+    output and is marked truncated; it only fails if nothing was salvageable.
+    """
+    provider = config["provider"]
+    model = config["model"]
+    guard = RunawayGuard(prompt, settings)
+    usage: dict[str, int] = {}
+
+    try:
+        from any_llm import acompletion
+
+        stream = await acompletion(**_completion_kwargs(config, prompt), stream=True)
+        try:
+            async for chunk in stream:
+                usage = _usage_from_response(chunk) or usage
+                if not chunk.choices:
+                    continue
+                if guard.feed(chunk.choices[0].delta.content or "") is not None:
+                    break
+        finally:
+            # Closing the stream stops the provider generating the rest.
+            if guard.reason is not None and hasattr(stream, "aclose"):
+                await stream.aclose()
+    except Exception as e:
+        return _provider_error(config, e)
+
+    if guard.reason is None:
+        result = ReviewResult(
+            provider=provider,
+            model=model,
+            success=True,
+            content=guard.text,
+            parsed_json=extract_json(guard.text),
+        )
+    else:
+        print(
+            f"[star-chamber] Aborted {provider}/{model} after {len(guard.text)} characters: {guard.reason}",
+            file=sys.stderr,
+        )
+        salvaged = salvage_json(guard.text[:guard.cut_at])
+        if salvaged is None:
+            result = ReviewResult(
+                provider=provider,
+                model=model,
+                success=False,
+                error=f"Aborted runaway response ({guard.reason}) with no salvageable JSON",
+            )
+        else:
+            result = ReviewResult(
+                provider=provider,
+                model=model,
+                success=True,
+                content=salvaged[0],
+                parsed_json=salvaged[1],
+            )
+        result["truncated"] = True
+        result["truncation_reason"] = guard.reason
+    if usage:
+        result["usage"] = usage
+    return result
+
+
+def _provider_error(config: ProviderConfig, error: Exception) -> ReviewResult:
+    """Turn an exception from a provider call into a failed review."""
+    provider = config["provider"]
+    model = config["model"]
+    local = config.get("local", False)
+
+    if isinstance(error, ImportError):
         sdk_map = load_sdk_map()
         sdk = sdk_map.get(provider.lower())
         if sdk:
@@ -227,67 +902,70 @@ async def _get_review_internal(
             success=False,
             error=f"Missing SDK for {provider}. {hint}",
         )
-    except Exception as e:
-        error_msg = str(e).lower()
-        # Map providers to their env var names for helpful errors.
-        env_var_map = {
-            "openai": "OPENAI_API_KEY",
-            "anthropic": "ANTHROPIC_API_KEY",
-            "gemini": "GEMINI_API_KEY",
-            "google": "GEMINI_API_KEY",
-            "cohere": "COHERE_API_KEY",
-            "mistral": "MISTRAL_API_KEY",
-            "groq": "GROQ_API_KEY",
-        }
-        env_var = env_var_map.get(provider.lower(), f"{provider.upper()}_API_KEY")
-
-        # Detect common API key issues (error_msg is already lowercased above).
-        is_auth_error = (
-            "api_key" in error_msg
-            or "unauthorized" in error_msg
-            or "401" in error_msg
-            or "api key" in error_msg
-            or "apikey" in error_msg
-        )
-        if is_auth_error:
-            if local:
-                return ReviewResult(
-                    provider=provider,
-                    model=model,
-                    success=False,
-                    error=(
-                        f"Local provider {provider} returned auth error. "
-                        "If authentication is required, add the key to your any-llm platform "
-                        "project or set api_key in providers.json."
-                    ),
-                )
+    error_msg = str(error).lower()
+    # Map providers to their env var names for helpful errors.
+    env_var_map = {
+        "openai": "OPENAI_API_KEY",
+        "anthropic": "ANTHROPIC_API_KEY",
+        "gemini": "GEMINI_API_KEY",
+        "google": "GEMINI_API_KEY",
+        "cohere": "COHERE_API_KEY",
+        "mistral": "MISTRAL_API_KEY",
+        "groq": "GROQ_API_KEY",
+    }
+    env_var = env_var_map.get(provider.lower(), f"{provider.upper()}_API_KEY")
+
+    # Detect common API key issues (error_msg is already lowercased above).
+    is_auth_error = (
+        "api_key" in error_msg
+        or "unauthorized" in error_msg
+        or "401" in error_msg
+        or "api key" in error_msg
+        or "apikey" in error_msg
+    )
+    if is_auth_error:
+        if local:
             return ReviewResult(
                 provider=provider,
                 model=model,
                 success=False,
-                error=f"Authentication failed for {provider}. Check {env_var} is set and valid.",
+                error=(
+                    f"Local provider {provider} returned auth error. "
+                    "If authentication is required, add the key to your any-llm platform "
+                    "project or set api_key in providers.json."
+                ),
             )
         return ReviewResult(
             provider=provider,
             model=model,
             success=False,
-            error=sanitize_error(str(e)),
+            error=f"Authentication failed for {provider}. Check {env_var} is set and valid.",
         )
+    return ReviewResult(
+        provider=provider,
+        model=model,
+        success=False,
+        error=sanitize_error(str(error)),
+    )
 
 
 async def get_review(
-    config: ProviderConfig, prompt: str, timeout: float | None = None,
+    config: ProviderConfig,
+    prompt: str,
+    timeout: float | None = None,
+    cassette: Cassette | None = None,
+    guard: GuardSettings | None = None,
 ) -> ReviewResult:
     """Get review with optional timeout.
 
     Wraps _get_review_internal with asyncio.wait_for for timeout handling.
     """
     if timeout is None:
-        return await _get_review_internal(config, prompt)
+        return await _get_review_internal(config, prompt, cassette=cassette, guard=guard)
 
     try:
         return await asyncio.wait_for(
-            _get_review_internal(config, prompt),
+            _get_review_internal(config, prompt, cassette=cassette, guard=guard),
             timeout=timeout,
         )
     except asyncio.TimeoutError:
@@ -296,6 +974,7 @@ async def get_review(
             model=config["model"],
             success=False,
             error=f"Request timed out after {timeout}s",
+            timed_out=True,
         )
 
 
@@ -399,211 +1078,1673 @@ def get_changed_files() -> list[str]:
             return []
 
 
-async def run_council(
-    prompt: str,
-    providers: list[ProviderConfig],
-    timeout: float | None = None,
-) -> dict[str, Any]:
-    """Run multi-LLM council review.
+def _host_cores() -> int:
+    """Return the number of CPU cores this process may use."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
 
-    Fans out the prompt to all providers in parallel and returns their responses.
-    Debate mode (multi-round deliberation) is handled by Claude Code in SKILL.md.
-    """
-    tasks = [get_review(p, prompt, timeout=timeout) for p in providers]
-    results = list(await asyncio.gather(*tasks))
-    return {"reviews": results}
 
+def _host_memory_gb() -> float | None:
+    """Return total physical memory in GB, or None if it cannot be determined."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3
+    except (AttributeError, ValueError, OSError):
+        return None
 
-def main() -> None:
-    """Entry point for the LLM council script."""
-    parser = argparse.ArgumentParser(description="Star-Chamber Multi-LLM Review")
-    parser.add_argument(
-        "--file", "-f", action="append", help="Target file(s) to review"
-    )
-    parser.add_argument(
-        "--provider", "-p", action="append", help="LLM providers to use"
-    )
-    parser.add_argument(
-        "--timeout",
-        type=float,
-        help="Timeout in seconds for each provider request (overrides config)",
-    )
-    parser.add_argument(
-        "--list-sdks",
-        action="store_true",
-        help="Output required SDK packages for configured/specified providers and exit",
-    )
-    args = parser.parse_args()
 
-    # Load provider config.
-    config_path = os.environ.get(
-        "STAR_CHAMBER_CONFIG",
-        os.path.expanduser("~/.config/star-chamber/providers.json"),
-    )
+class LocalScheduler:
+    """Queue requests to local providers so they do not overload the host.
 
-    if not os.path.exists(config_path):
-        print(
-            json.dumps(
-                {
-                    "error": f"Config file not found: {config_path}",
-                    "hint": "Run /star-chamber to set up configuration, or create manually.",
-                },
-                indent=2,
+    Each local endpoint (api_base, or provider name when unset) gets its own
+    slot pool sized by max_concurrency, or, when that is not configured, by
+    this machine's cores and memory divided by the per-request budgets.
+    Requests beyond the limit wait in FIFO order instead of all hitting the
+    model server at once.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        cores_per_request: int = DEFAULT_LOCAL_CORES_PER_REQUEST,
+        memory_per_request_gb: float = DEFAULT_LOCAL_MEMORY_PER_REQUEST_GB,
+    ) -> None:
+        if max_concurrency is None:
+            limit = _host_cores() // cores_per_request
+            memory_gb = _host_memory_gb()
+            if memory_gb is not None:
+                limit = min(limit, int(memory_gb // memory_per_request_gb))
+            max_concurrency = max(1, limit)
+        self.max_concurrency = max_concurrency
+        self._slots: dict[tuple[int, str], asyncio.Semaphore] = {}
+
+    @staticmethod
+    def endpoint(config: ProviderConfig) -> str:
+        """Return the endpoint a local provider's requests are queued on."""
+        return config.get("api_base") or config["provider"].lower()
+
+    @asynccontextmanager
+    async def slot(self, config: ProviderConfig) -> AsyncIterator[None]:
+        """Hold one of the endpoint's request slots, waiting if all are busy."""
+        # Semaphores are bound to an event loop; keep one set per loop.
+        key = (id(asyncio.get_running_loop()), self.endpoint(config))
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(self.max_concurrency)
+        async with self._slots[key]:
+            yield
+
+
+def local_scheduler_from_config(config: dict[str, Any]) -> LocalScheduler | None:
+    """Build the local scheduler when any configured provider is local.
+
+    Optional "local_scheduler" settings: max_concurrency, cores_per_request
+    and memory_per_request_gb. Raises ConfigError for invalid settings.
+    """
+    if not any(p.get("local") for p in config.get("providers", [])):
+        return None
+    raw = config.get("local_scheduler", {})
+    if not isinstance(raw, dict):
+        raise ConfigError("Invalid local_scheduler in config", details="local_scheduler must be an object")
+    max_concurrency = raw.get("max_concurrency")
+    cores = raw.get("cores_per_request", DEFAULT_LOCAL_CORES_PER_REQUEST)
+    memory = raw.get("memory_per_request_gb", DEFAULT_LOCAL_MEMORY_PER_REQUEST_GB)
+    for name, value in (("max_concurrency", max_concurrency), ("cores_per_request", cores)):
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 1):
+            raise ConfigError(
+                "Invalid local_scheduler in config",
+                details=f"{name} must be a positive integer",
             )
+    if isinstance(memory, bool) or not isinstance(memory, (int, float)) or memory <= 0:
+        raise ConfigError(
+            "Invalid local_scheduler in config",
+            details="memory_per_request_gb must be a positive number",
         )
-        sys.exit(1)
+    return LocalScheduler(max_concurrency, cores_per_request=cores, memory_per_request_gb=float(memory))
 
-    with open(config_path) as f:
-        config = json.load(f)
 
-    platform = config.get("platform")
-    any_llm_key = ""
+def circuit_breaker_from_config(config: dict[str, Any]) -> CircuitBreaker | None:
+    """Build the circuit breaker described by providers.json.
 
-    # Validate platform mode prerequisites.
-    if platform == "any-llm":
-        any_llm_key = os.environ.get("ANY_LLM_KEY", "")
-        if not any_llm_key:
-            print(
-                json.dumps(
-                    {
-                        "error": "Platform mode enabled but ANY_LLM_KEY not set",
-                        "setup": {
-                            "step1": "Create project at https://any-llm.ai",
-                            "step2": "Add your provider API keys to the project",
-                            "step3": "Copy your project key and set: export ANY_LLM_KEY='...'",
-                        },
-                        "docs": "https://any-llm.ai/docs",
-                    },
-                    indent=2,
-                )
-            )
-            sys.exit(1)
+    Raises ConfigError for invalid settings.
+    """
+    try:
+        settings = breaker_settings_from_config(config)
+    except ValueError as e:
+        raise ConfigError("Invalid circuit_breaker in config", details=str(e)) from e
+    if settings is None:
+        return None
+    return CircuitBreaker(state_dir() / "circuit_breaker.json", **settings)
 
-    providers = config.get("providers", [])
 
-    # Filter to requested providers if specified.
-    if args.provider:
-        requested = [x.lower() for x in args.provider]
-        providers = [p for p in providers if p["provider"].lower() in requested]
-        if not providers:
-            print(
-                json.dumps(
-                    {
-                        "error": "No matching providers found.",
-                        "requested": args.provider,
-                        "available": [p["provider"] for p in config.get("providers", [])],
-                    },
-                    indent=2,
-                )
-            )
-            sys.exit(1)
+def rate_limiter_from_config(config: dict[str, Any]) -> RateLimiter | None:
+    """Build the shared rate limiter when any provider sets rate_limit.
 
-    # Handle --list-sdks: output diagnostic info and exit.
-    if args.list_sdks:
-        provider_names = [p["provider"] for p in providers]
-        sdks = get_required_sdks(provider_names)
-
-        # In platform mode, add platform SDK.
-        if platform == "any-llm":
-            sdk_map = load_sdk_map()
-            platform_sdk = sdk_map.get("platform")
-            if platform_sdk:
-                sdks = sorted(set(sdks + [platform_sdk]))
-
-        # Check which providers have API keys set.
-        # For direct mode, resolve env vars to check readiness.
-        ready = []
-        missing_key = []
-        platform_provided = []
-        local_providers = []
-        for p in providers:
-            if p.get("local"):
-                local_providers.append(p["provider"])
-            elif platform == "any-llm":
-                platform_provided.append(p["provider"])
-            else:
-                # Direct mode: resolve env var to check if key is available.
-                api_key = p.get("api_key", "")
-                if api_key.startswith("${") and api_key.endswith("}"):
-                    api_key = os.environ.get(api_key[2:-1], "")
-                if api_key:
-                    ready.append(p["provider"])
-                else:
-                    missing_key.append(p["provider"])
-
-        output = {
-            "providers_configured": provider_names,
-            "providers_ready": ready,
-            "providers_missing_key": missing_key,
-            "providers_local": local_providers,
-            "required_sdks": sdks,
-            "uv_with_flags": " ".join(f"--with {sdk}" for sdk in sdks),
-            "platform": platform,
-        }
-        if platform == "any-llm":
-            output["providers_platform_provided"] = platform_provided
-            output["platform_key_set"] = bool(os.environ.get("ANY_LLM_KEY"))
-
-        print(json.dumps(output, indent=2))
-        sys.exit(0)
+    Raises ConfigError for invalid limits.
+    """
+    try:
+        limited = has_rate_limits(config)
+    except ValueError as e:
+        raise ConfigError("Invalid rate_limit in config", details=str(e)) from e
+    return RateLimiter(state_dir() / "rate_limits.json") if limited else None
 
-    # Read prompt from stdin.
-    prompt = sys.stdin.read()
 
-    # Determine files to review.
-    files_to_review = args.file if args.file else get_changed_files()
+def adaptive_timeouts_from_config(config: dict[str, Any]) -> AdaptiveTimeouts | None:
+    """Build adaptive timeouts from the "adaptive_timeout" config (None when disabled).
 
-    # Build combined prompt with file list.
-    combined_prompt = prompt
-    if files_to_review:
-        combined_prompt += "\n\nFiles to review:\n" + "\n".join(
-            f"- {f}" for f in files_to_review
-        )
+    Raises ConfigError for invalid settings.
+    """
+    try:
+        settings = adaptive_timeout_settings_from_config(config)
+    except ValueError as e:
+        raise ConfigError("Invalid adaptive_timeout in config", details=str(e)) from e
+    if settings is None:
+        return None
+    return AdaptiveTimeouts(state_dir() / "latency.json", settings)
 
-    # Determine timeout: CLI flag > config > None.
-    timeout: float | None = args.timeout
-    if timeout is None:
-        raw_timeout = config.get("timeout_seconds")
-        if raw_timeout is not None:
-            try:
-                timeout = float(raw_timeout)
-                if timeout <= 0:
-                    raise ValueError("must be positive")
-            except (TypeError, ValueError):
-                print(
-                    json.dumps({
-                        "error": "Invalid timeout_seconds in config",
-                        "value": raw_timeout,
-                        "hint": "timeout_seconds must be a positive number",
-                    }),
-                )
-                sys.exit(1)
 
-    # Resolve API keys and run the council.
-    async def _run() -> dict[str, Any]:
-        resolved = await resolve_api_keys(
-            providers, platform == "any-llm", any_llm_key=any_llm_key,
-        )
-        return await run_council(combined_prompt, resolved, timeout=timeout)
+class ReviewOptions(TypedDict, total=False):
+    """Per-run settings shared by every provider review in a council run."""
 
-    result = asyncio.run(_run())
+    timeout: float | None
+    cassette: Cassette | None
+    breaker: CircuitBreaker | None
+    schema: str | None
+    repair_attempts: int
+    local_scheduler: LocalScheduler | None
+    rate_limiter: RateLimiter | None
+    stream_guard: GuardSettings | None
+    adaptive_timeouts: AdaptiveTimeouts | None
 
-    # Separate successful and failed reviews.
-    all_reviews = result.get("reviews", [])
-    successful = [r for r in all_reviews if r.get("success")]
-    failed = [r for r in all_reviews if not r.get("success")]
 
-    # Build final output.
-    output: dict[str, Any] = {
-        "reviews": successful,
-        "files_reviewed": files_to_review,
-        "providers_used": [p["provider"] for p in providers],
+async def _send(config: ProviderConfig, prompt: str, options: ReviewOptions) -> ReviewResult:
+    """Send one request, first waiting for rate-limit capacity if configured.
+
+    Time spent waiting is reported as rate_limit_wait_seconds and does not
+    count against the timeout. With adaptive timeouts a configured timeout
+    is tightened to the provider's recorded latency; the timeout applied is
+    reported as timeout_seconds.
+    """
+    limiter = options.get("rate_limiter")
+    adaptive = options.get("adaptive_timeouts")
+    timeout = options.get("timeout")
+    if adaptive is not None:
+        timeout = adaptive.timeout_for(config, prompt, timeout)
+    kwargs: dict[str, Any] = {
+        "timeout": timeout,
+        "cassette": options.get("cassette"),
+        "guard": options.get("stream_guard"),
     }
+    if limiter is None or not config.get("rate_limit"):
+        result = await get_review(config, prompt, **kwargs)
+    else:
+        estimated = estimate_tokens(prompt)
+        waited = await limiter.acquire(config, estimated)
+        result = await get_review(config, prompt, **kwargs)
+        actual = result.get("usage", {}).get("total_tokens")
+        if actual is not None:
+            limiter.settle(config, estimated, actual)
+        result["rate_limit_wait_seconds"] = round(waited, 3)
+    if adaptive is not None:
+        adaptive.record(config, prompt, result)
+    if timeout is not None:
+        result["timeout_seconds"] = timeout
+    return result
 
-    if failed:
-        output["failed_reviews"] = failed
 
-    print(json.dumps(output, indent=2))
+async def _repair_review(
+    config: ProviderConfig,
+    result: ReviewResult,
+    schema: str,
+    options: ReviewOptions,
+) -> ReviewResult:
+    """Validate a successful review, re-asking only this provider to fix its JSON.
+
+    Each repair request carries just the previous answer, the problems found
+    and the schema skeleton, not the original prompt. The repaired answer
+    replaces the original when it validates; otherwise the last errors are kept.
+    """
+    errors = validate_review(result.get("parsed_json"), schema)
+    attempts = 0
+    while errors and attempts < options.get("repair_attempts", 0):
+        attempts += 1
+        repair_prompt = build_repair_prompt(result.get("content") or "", errors, schema)
+        repaired = await _send(config, repair_prompt, options)
+        if "rate_limit_wait_seconds" in repaired:
+            result["rate_limit_wait_seconds"] = round(
+                result.get("rate_limit_wait_seconds", 0.0) + repaired["rate_limit_wait_seconds"], 3,
+            )
+        if not repaired.get("success"):
+            break
+        repaired_errors = validate_review(repaired.get("parsed_json"), schema)
+        if len(repaired_errors) <= len(errors):
+            result = ReviewResult(**result)
+            result["content"] = repaired["content"]
+            result["parsed_json"] = repaired.get("parsed_json")
+            errors = repaired_errors
+
+    result["schema_valid"] = not errors
+    result["repair_attempts"] = attempts
+    if errors:
+        result["schema_errors"] = errors
+    else:
+        result.pop("schema_errors", None)
+    return result
+
+
+async def _review_provider(
+    config: ProviderConfig, prompt: str, options: ReviewOptions,
+) -> ReviewResult:
+    """Review with one provider, honouring its circuit breaker.
+
+    The request is first shaped to the model's capabilities (see preflight);
+    prompts that cannot fit are rejected without a network call. Local
+    providers then wait for a local scheduler slot (the wait is reported as
+    queued_seconds and does not count against the timeout); rate-limited
+    providers then wait for budget (see _send).
+    When a schema is set, successful reviews are validated and repaired.
+    """
+    breaker = options.get("breaker")
+    schema = options.get("schema")
+    scheduler = options.get("local_scheduler")
+
+    shaped, rejection = preflight(config, prompt)
+    if rejection is not None:
+        return ReviewResult(
+            provider=config["provider"],
+            model=config["model"],
+            success=False,
+            skipped=True,
+            error=rejection,
+        )
+    adjusted = shaped is not config
+    if adjusted:
+        print(
+            f"[star-chamber] Reduced max_tokens for {CircuitBreaker.key(config)} "
+            f"from {config.get('max_tokens', DEFAULT_MAX_TOKENS)} to {shaped['max_tokens']}",
+            file=sys.stderr,
+        )
+        config = shaped
+
+    if breaker is not None:
+        reason = breaker.acquire(config)
+        if reason is not None:
+            return ReviewResult(
+                provider=config["provider"],
+                model=config["model"],
+                success=False,
+                skipped=True,
+                error=reason,
+            )
+
+    slot: AsyncContextManager[Any] = nullcontext()
+    if scheduler is not None and config.get("local"):
+        slot = scheduler.slot(config)
+    queued_at = time.perf_counter()
+    async with slot:
+        queued = time.perf_counter() - queued_at
+        result = await _send(config, prompt, options)
+        if breaker is not None:
+            breaker.record(config, result)
+        if schema is not None and result.get("success"):
+            result = await _repair_review(config, result, schema, options)
+    if scheduler is not None and config.get("local"):
+        result["queued_seconds"] = round(queued, 3)
+    if adjusted:
+        result["max_tokens_adjusted"] = config["max_tokens"]
+    return result
+
+
+def _issue_file(location: Any, files: list[str]) -> str | None:
+    """Return which reviewed file an issue location ("file:line") refers to."""
+    if not isinstance(location, str):
+        return None
+    path = location.strip().strip("`")
+    if path in files:
+        return path
+    head, sep, _ = path.rpartition(":")
+    while sep:
+        if head in files:
+            return head
+        head, sep, _ = head.rpartition(":")
+    return None
+
+
+def plan_escalation(
+    triage_reviews: list[ReviewResult], files: list[str], cascade: CascadeConfig,
+) -> dict[str, Any]:
+    """Decide what the expensive tier must review after triage.
+
+    Everything is escalated when no triage review is usable, a triage model
+    reports confidence below min_confidence, or a flagged location cannot be
+    mapped to a reviewed file. Otherwise only files with an issue at or above
+    escalate_severity are escalated.
+    """
+    threshold = SEVERITY_LEVELS.index(cascade["escalate_severity"])
+    min_confidence = CONFIDENCE_LEVELS.index(cascade["min_confidence"])
+    usable = [
+        r for r in triage_reviews
+        if r.get("success") and isinstance(r.get("parsed_json"), dict)
+    ]
+    if not usable:
+        return {"escalated": True, "escalated_files": files, "reasons": ["no usable triage review"]}
+
+    reasons = []
+    flagged: list[str] = []
+    escalate_all = False
+    for review in usable:
+        parsed = review["parsed_json"]
+        confidence = parsed.get("confidence")
+        if confidence not in CONFIDENCE_LEVELS or CONFIDENCE_LEVELS.index(confidence) < min_confidence:
+            escalate_all = True
+            reasons.append(f"{review['provider']} reported {confidence or 'no'} confidence")
+        issues = parsed.get("issues")
+        for issue in issues if isinstance(issues, list) else []:
+            if not isinstance(issue, dict):
+                continue
+            severity = issue.get("severity")
+            if severity not in SEVERITY_LEVELS or SEVERITY_LEVELS.index(severity) < threshold:
+                continue
+            path = _issue_file(issue.get("location"), files)
+            if path is None:
+                escalate_all = True
+                reasons.append(f"{review['provider']} flagged {severity} issue at {issue.get('location')!r}")
+            elif path not in flagged:
+                flagged.append(path)
+                reasons.append(f"{review['provider']} flagged {severity} issue in {path}")
+
+    if escalate_all:
+        return {"escalated": True, "escalated_files": files, "reasons": reasons}
+    return {"escalated": bool(flagged), "escalated_files": flagged, "reasons": reasons}
+
+
+def restrict_prompt(prompt: str, files: list[str], keep: list[str]) -> str:
+    """Drop reviewed files not in keep from a PROTOCOL.md-style prompt.
+
+    Removes "### <path>" sections of files that are not kept and rewrites the
+    trailing "Files to review" list. Sections that do not name a reviewed file
+    are left untouched.
+    """
+    dropped = set(files) - set(keep)
+    if not dropped:
+        return prompt
+
+    body, marker, _ = prompt.partition("\n\nFiles to review:\n")
+    lines = body.splitlines(keepends=True)
+    kept_lines = []
+    skipping = False
+    for line in lines:
+        if line.startswith("### "):
+            skipping = line[4:].strip() in dropped
+        elif line.startswith("## ") or line.startswith("# "):
+            skipping = False
+        if not skipping:
+            kept_lines.append(line)
+    restricted = "".join(kept_lines)
+    if marker:
+        restricted = build_prompt(restricted, keep)
+    return restricted
+
+
+async def run_council(
+    prompt: str,
+    providers: list[ProviderConfig],
+    timeout: float | None = None,
+    cassette: Cassette | None = None,
+    breaker: CircuitBreaker | None = None,
+    schema: str | None = None,
+    repair_attempts: int = 0,
+    cascade: CascadeConfig | None = None,
+    files: list[str] | None = None,
+    local_scheduler: LocalScheduler | None = None,
+    rate_limiter: RateLimiter | None = None,
+    stream_guard: GuardSettings | None = None,
+    adaptive_timeouts: AdaptiveTimeouts | None = None,
+) -> dict[str, Any]:
+    """Run multi-LLM council review.
+
+    Fans out the prompt to all providers in parallel and returns their responses.
+    Debate mode (multi-round deliberation) is handled by Claude Code in SKILL.md.
+    Providers whose circuit is open are skipped without a request. With a
+    schema, invalid reviews get up to repair_attempts follow-up requests.
+
+    With cascade set, providers with tier "triage" review first and only the
+    files they flag (see plan_escalation) go to the remaining providers; both
+    stages' reviews are returned, tagged with their stage. Requests to
+    local providers are queued through local_scheduler, and providers with a
+    rate_limit wait for capacity in the shared rate_limiter. With
+    stream_guard, responses are streamed and runaway generations aborted.
+    With adaptive_timeouts, a timeout is only the ceiling of each provider's
+    latency-based timeout; without one, requests are not limited.
+    """
+    options = ReviewOptions(
+        timeout=timeout,
+        cassette=cassette,
+        breaker=breaker,
+        schema=schema,
+        repair_attempts=repair_attempts,
+        local_scheduler=local_scheduler,
+        rate_limiter=rate_limiter,
+        stream_guard=stream_guard,
+        adaptive_timeouts=adaptive_timeouts,
+    )
+
+    async def _fan_out(targets: list[ProviderConfig], stage_prompt: str) -> list[ReviewResult]:
+        tasks = [_review_provider(p, stage_prompt, options) for p in targets]
+        return list(await asyncio.gather(*tasks))
+
+    triage, escalation = split_cascade_tiers(providers) if cascade else ([], providers)
+    if not triage or not escalation:
+        return {"reviews": await _fan_out(providers, prompt)}
+
+    files = files or []
+    triage_reviews = await _fan_out(triage, prompt + TRIAGE_INSTRUCTIONS)
+    for review in triage_reviews:
+        review["stage"] = "triage"
+    plan = plan_escalation(triage_reviews, files, cascade)
+    escalation_reviews: list[ReviewResult] = []
+    if plan["escalated"]:
+        escalation_prompt = restrict_prompt(prompt, files, plan["escalated_files"])
+        escalation_reviews = await _fan_out(escalation, escalation_prompt)
+        for review in escalation_reviews:
+            review["stage"] = "escalation"
+    return {"reviews": triage_reviews + escalation_reviews, "cascade": plan}
+
+
+def split_cascade_tiers(
+    providers: list[ProviderConfig],
+) -> tuple[list[ProviderConfig], list[ProviderConfig]]:
+    """Split providers into the triage tier and the escalation tier."""
+    triage = [p for p in providers if p.get("tier") == TRIAGE_TIER]
+    escalation = [p for p in providers if p.get("tier") != TRIAGE_TIER]
+    return triage, escalation
+
+
+def cascade_from_config(config: dict[str, Any]) -> CascadeConfig | None:
+    """Return cascade settings from providers.json, or None when not enabled.
+
+    Raises ConfigError for invalid settings.
+    """
+    raw = config.get("cascade")
+    if raw is None or raw is False:
+        return None
+    if raw is True:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ConfigError("Invalid cascade in config", details="cascade must be an object or boolean")
+    cascade = CascadeConfig(
+        escalate_severity=raw.get("escalate_severity", "medium"),
+        min_confidence=raw.get("min_confidence", "medium"),
+    )
+    if cascade["escalate_severity"] not in SEVERITY_LEVELS:
+        raise ConfigError(
+            "Invalid cascade in config",
+            details=f"escalate_severity must be one of {'|'.join(SEVERITY_LEVELS)}",
+        )
+    if cascade["min_confidence"] not in CONFIDENCE_LEVELS:
+        raise ConfigError(
+            "Invalid cascade in config",
+            details=f"min_confidence must be one of {'|'.join(CONFIDENCE_LEVELS)}",
+        )
+    return cascade
+
+
+def build_prompt(prompt: str, files: list[str] | None) -> str:
+    """Append the list of files under review to the prompt."""
+    if not files:
+        return prompt
+    return prompt + "\n\nFiles to review:\n" + "\n".join(f"- {f}" for f in files)
+
+
+def build_output(
+    reviews: list[ReviewResult],
+    files: list[str],
+    providers: list[ProviderConfig],
+    cascade: dict[str, Any] | None = None,
+    compaction: CompactionReport | None = None,
+) -> dict[str, Any]:
+    """Build the council output, separating successful and failed reviews."""
+    successful = [r for r in reviews if r.get("success")]
+    failed = [r for r in reviews if not r.get("success")]
+
+    output: dict[str, Any] = {
+        "reviews": successful,
+        "files_reviewed": files,
+        "providers_used": [p["provider"] for p in providers],
+    }
+
+    if failed:
+        output["failed_reviews"] = failed
+    skipped = [
+        {"provider": r["provider"], "model": r["model"], "reason": r["error"]}
+        for r in failed
+        if r.get("skipped")
+    ]
+    if skipped:
+        output["skipped_providers"] = skipped
+    if cascade is not None:
+        output["cascade"] = cascade
+    if compaction is not None:
+        output["compaction"] = compaction
+    return output
+
+
+def get_config_path() -> str:
+    """Return the provider config path (STAR_CHAMBER_CONFIG or the default)."""
+    return os.environ.get(
+        "STAR_CHAMBER_CONFIG",
+        os.path.expanduser("~/.config/star-chamber/providers.json"),
+    )
+
+
+def load_config(config_path: str | Path) -> dict[str, Any]:
+    """Load providers.json, raising ConfigError if it is missing or malformed."""
+    if not os.path.exists(config_path):
+        raise ConfigError(
+            f"Config file not found: {config_path}",
+            hint="Run /star-chamber to set up configuration, or create manually.",
+        )
+
+    try:
+        config = codec.loads(Path(config_path).read_bytes())
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"Invalid JSON in config: {config_path}", details=str(e)) from e
+    if not isinstance(config, dict):
+        raise ConfigError("Config must be a JSON object", got=type(config).__name__)
+    return config
+
+
+def select_providers(
+    config: dict[str, Any], requested: list[str] | None,
+) -> list[ProviderConfig]:
+    """Return configured providers, filtered to requested names if given."""
+    providers = config.get("providers", [])
+    if not requested:
+        return providers
+
+    wanted = [x.lower() for x in requested]
+    providers = [p for p in providers if p["provider"].lower() in wanted]
+    if not providers:
+        raise ProviderSelectionError(
+            "No matching providers found.",
+            requested=requested,
+            available=[p["provider"] for p in config.get("providers", [])],
+        )
+    return providers
+
+
+def parse_repair_attempts(raw: Any) -> int:
+    """Validate a repair_attempts config value, raising ConfigError if invalid."""
+    if raw is None:
+        return DEFAULT_REPAIR_ATTEMPTS
+    if isinstance(raw, bool) or not isinstance(raw, int) or raw < 0:
+        raise ConfigError(
+            "Invalid repair_attempts in config",
+            value=raw,
+            hint="repair_attempts must be a non-negative integer",
+        )
+    return raw
+
+
+def parse_timeout(raw_timeout: Any) -> float | None:
+    """Validate a timeout_seconds config value, raising ConfigError if invalid."""
+    if raw_timeout is None:
+        return None
+    try:
+        timeout = float(raw_timeout)
+        if timeout <= 0:
+            raise ValueError("must be positive")
+    except (TypeError, ValueError):
+        raise ConfigError(
+            "Invalid timeout_seconds in config",
+            value=raw_timeout,
+            hint="timeout_seconds must be a positive number",
+        ) from None
+    return timeout
+
+
+class Council:
+    """Embeddable star-chamber council for use inside an asyncio application.
+
+    Built once from a providers.json dict (or path), it validates the config,
+    resolves API keys on first use and reuses them for every later review.
+    Errors are raised as StarChamberError subclasses rather than exiting.
+
+        council = Council.from_path()
+        async for review in council.stream(prompt, ["app.py"]):
+            ...
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        providers: list[str] | None = None,
+        timeout: float | None = None,
+        cassette: Cassette | None = None,
+        any_llm_key: str | None = None,
+        schema: str = SCHEMA_AUTO,
+        repair_attempts: int | None = None,
+        cascade: bool = True,
+        compaction: CompactionSettings | None = None,
+        store: ReviewStore | None = None,
+    ) -> None:
+        if schema not in (SCHEMA_AUTO, SCHEMA_NONE, *SCHEMA_TEMPLATES):
+            raise ConfigError(
+                f"Unknown review schema: {schema}",
+                choices=[SCHEMA_AUTO, SCHEMA_NONE, *SCHEMA_TEMPLATES],
+            )
+        self.config = config
+        self.platform = config.get("platform")
+        self.providers = select_providers(config, providers)
+        self.timeout = timeout if timeout is not None else parse_timeout(config.get("timeout_seconds"))
+        self.cassette = cassette
+        self.schema = schema
+        self.repair_attempts = (
+            repair_attempts if repair_attempts is not None
+            else parse_repair_attempts(config.get("repair_attempts"))
+        )
+        self.cascade = cascade_from_config(config) if cascade else None
+        self.local_scheduler = local_scheduler_from_config(config)
+        if compaction is None:
+            try:
+                compaction = compaction_from_config(config)
+            except ValueError as e:
+                raise ConfigError("Invalid compaction in config", details=str(e)) from e
+        self.compaction = compaction
+        self.store = store
+        self.capability_overrides = capability_overrides_from_config(config)
+        try:
+            self.stream_guard = guard_settings_from_config(config)
+        except ValueError as e:
+            raise ConfigError("Invalid stream_guard in config", details=str(e)) from e
+
+        # Replay never contacts the platform or touches shared breaker state.
+        self.any_llm_key = ""
+        if self.platform == "any-llm" and not self.replaying:
+            self.any_llm_key = any_llm_key if any_llm_key is not None else os.environ.get("ANY_LLM_KEY", "")
+            if not self.any_llm_key:
+                raise PlatformKeyError(
+                    "Platform mode enabled but ANY_LLM_KEY not set",
+                    setup={
+                        "step1": "Create project at https://any-llm.ai",
+                        "step2": "Add your provider API keys to the project",
+                        "step3": "Copy your project key and set: export ANY_LLM_KEY='...'",
+                    },
+                    docs="https://any-llm.ai/docs",
+                )
+        self.breaker = None if self.replaying else circuit_breaker_from_config(config)
+        self.rate_limiter = None if self.replaying else rate_limiter_from_config(config)
+        self.adaptive_timeouts = None if self.replaying else adaptive_timeouts_from_config(config)
+        self._resolved: list[ProviderConfig] | None = None
+
+    @classmethod
+    def from_path(cls, config_path: str | Path | None = None, **kwargs: Any) -> "Council":
+        """Build a council from providers.json (default: STAR_CHAMBER_CONFIG)."""
+        return cls(load_config(config_path or get_config_path()), **kwargs)
+
+    @property
+    def replaying(self) -> bool:
+        """Whether responses come from a replay cassette."""
+        return self.cassette is not None and self.cassette.replaying
+
+    async def resolved_providers(self) -> list[ProviderConfig]:
+        """Return providers with API keys resolved, fetching them only once."""
+        if self._resolved is None:
+            if self.replaying:
+                resolved = list(self.providers)
+            else:
+                resolved = await resolve_api_keys(
+                    self.providers, self.platform == "any-llm", any_llm_key=self.any_llm_key,
+                )
+            self._resolved = apply_capability_overrides(resolved, self.capability_overrides)
+        return self._resolved
+
+    def schema_for(self, prompt: str) -> str | None:
+        """Return the schema reviews of this prompt are validated against."""
+        if self.schema == SCHEMA_NONE:
+            return None
+        if self.schema == SCHEMA_AUTO:
+            return detect_schema(prompt)
+        return self.schema
+
+    def prepare_prompt(
+        self, prompt: str, files: list[str] | None,
+    ) -> tuple[str, CompactionReport | None]:
+        """Build the prompt sent to providers, compacting it if enabled."""
+        combined_prompt = build_prompt(prompt, files)
+        if self.compaction is None:
+            return combined_prompt, None
+        compacted, report = compact_prompt(combined_prompt, self.compaction)
+        print(
+            f"[star-chamber] Compacted prompt from ~{report['tokens_before']} "
+            f"to ~{report['tokens_after']} tokens",
+            file=sys.stderr,
+        )
+        return compacted, report
+
+    def options(self, schema: str | None) -> ReviewOptions:
+        """Return this council's review options for a run_council call."""
+        return ReviewOptions(
+            timeout=self.timeout,
+            cassette=self.cassette,
+            breaker=self.breaker,
+            schema=schema,
+            repair_attempts=self.repair_attempts,
+            local_scheduler=self.local_scheduler,
+            rate_limiter=self.rate_limiter,
+            stream_guard=self.stream_guard,
+            adaptive_timeouts=self.adaptive_timeouts,
+        )
+
+    async def _stream_stage(
+        self, providers: list[ProviderConfig], prompt: str, schema: str | None,
+    ) -> AsyncIterator[ReviewResult]:
+        """Yield reviews from one fan-out as they complete."""
+        options = self.options(schema)
+        tasks = [
+            asyncio.ensure_future(_review_provider(p, prompt, options))
+            for p in providers
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(
+        self, prompt: str, files: list[str] | None = None,
+    ) -> AsyncIterator[ReviewResult]:
+        """Yield each provider's review as soon as it completes.
+
+        In cascade mode triage reviews are yielded first, then escalation
+        reviews (if any). Leaving the loop early cancels reviews in flight.
+        """
+        combined_prompt, _ = self.prepare_prompt(prompt, files)
+        resolved = await self.resolved_providers()
+        schema = self.schema_for(prompt)
+        triage, escalation = split_cascade_tiers(resolved) if self.cascade else ([], resolved)
+        if not triage or not escalation:
+            async for review in self._stream_stage(resolved, combined_prompt, schema):
+                yield review
+            return
+
+        triage_reviews = []
+        async for review in self._stream_stage(triage, combined_prompt + TRIAGE_INSTRUCTIONS, schema):
+            review["stage"] = "triage"
+            triage_reviews.append(review)
+            yield review
+        plan = plan_escalation(triage_reviews, files or [], self.cascade)
+        if plan["escalated"]:
+            escalation_prompt = restrict_prompt(combined_prompt, files or [], plan["escalated_files"])
+            async for review in self._stream_stage(escalation, escalation_prompt, schema):
+                review["stage"] = "escalation"
+                yield review
+
+    async def _review_with_store(
+        self,
+        store: ReviewStore,
+        prompt: str,
+        files: list[str],
+        resolved: list[ProviderConfig],
+        schema: str | None,
+    ) -> list[ReviewResult] | None:
+        """Serve reviews precomputed by watch mode, requesting only the files missing.
+
+        Returns None when the store has nothing for these files, so the
+        caller runs the normal (possibly cascaded) review instead.
+        """
+        digests = {f: content_hash(f) for f in files}
+        stored: dict[str, list[dict[str, Any]]] = {}
+        groups: dict[tuple[str, ...], list[ProviderConfig]] = {}
+        for p in resolved:
+            entries = []
+            missing = []
+            for f in files:
+                digest = digests[f]
+                entry = store.get(p, f, digest) if digest else None
+                if entry is None:
+                    missing.append(f)
+                else:
+                    entries.append(entry)
+            stored[CircuitBreaker.key(p)] = entries
+            groups.setdefault(tuple(missing), []).append(p)
+        if not any(stored.values()):
+            return None
+
+        async def _fill(missing: tuple[str, ...], providers: list[ProviderConfig]) -> list[ReviewResult]:
+            if not missing:
+                return [merge_stored_reviews(p, None, stored[CircuitBreaker.key(p)]) for p in providers]
+            result = await run_council(
+                restrict_prompt(prompt, files, list(missing)), providers, **self.options(schema),
+            )
+            return [
+                merge_stored_reviews(p, review, stored[CircuitBreaker.key(p)])
+                for p, review in zip(providers, result["reviews"])
+            ]
+
+        filled = await asyncio.gather(*(_fill(m, ps) for m, ps in groups.items()))
+        by_key = {CircuitBreaker.key(r): r for group in filled for r in group}
+        served = sum(len(entries) for entries in stored.values())
+        print(f"[star-chamber] Reused {served} precomputed review(s) from watch mode", file=sys.stderr)
+        return [by_key[CircuitBreaker.key(p)] for p in resolved]
+
+    async def review(self, prompt: str, files: list[str] | None = None) -> dict[str, Any]:
+        """Run the whole council and return the same output as the CLI.
+
+        With a store, code reviews watch mode already made of these exact
+        file contents are reused and only the missing files are sent. Other
+        schemas (design questions) always go to the providers, since stored
+        entries are code reviews of a generic watch prompt.
+        """
+        resolved = await self.resolved_providers()
+        combined_prompt, compaction = self.prepare_prompt(prompt, files)
+        schema = self.schema_for(prompt)
+        if self.store is not None and files and schema == SCHEMA_CODE_REVIEW:
+            reviews = await self._review_with_store(self.store, combined_prompt, files, resolved, schema)
+            if reviews is not None:
+                return build_output(reviews, files, self.providers, None, compaction)
+        result = await run_council(
+            combined_prompt, resolved, cascade=self.cascade, files=files, **self.options(schema),
+        )
+        return build_output(
+            result["reviews"], files or [], self.providers, result.get("cascade"), compaction,
+        )
+
+
+def readiness_snapshot_path(config_path: str) -> Path:
+    """Return the warmup snapshot path for a config file."""
+    digest = hashlib.sha256(os.path.abspath(config_path).encode()).hexdigest()[:16]
+    return state_dir() / f"readiness-{digest}.json"
+
+
+def _readiness_key(config_path: str, providers: list[ProviderConfig]) -> dict[str, Any]:
+    """Return the fields a readiness snapshot must match to be reused."""
+    here = Path(__file__).resolve().parent
+    sdk_map_path = here / "sdk_map.json"
+    registry_path = here / "model_capabilities.json"
+    return {
+        "config_path": os.path.abspath(config_path),
+        "config_mtime_ns": os.stat(config_path).st_mtime_ns,
+        "sdk_map_mtime_ns": sdk_map_path.stat().st_mtime_ns if sdk_map_path.exists() else None,
+        "capabilities_mtime_ns": registry_path.stat().st_mtime_ns if registry_path.exists() else None,
+        "providers": sorted(CircuitBreaker.key(p) for p in providers),
+    }
+
+
+def load_readiness_snapshot(
+    config_path: str, providers: list[ProviderConfig],
+) -> dict[str, Any] | None:
+    """Return the warmup snapshot if it matches the current config, else None.
+
+    A snapshot is stale once providers.json, sdk_map.json or
+    model_capabilities.json is modified, or when a different provider
+    selection is requested.
+    """
+    try:
+        snapshot = codec.loads(readiness_snapshot_path(config_path).read_bytes())
+        key = _readiness_key(config_path, providers)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("key") != key:
+        return None
+    return snapshot
+
+
+def warmup_environment(
+    config_path: str,
+    providers: list[ProviderConfig],
+    platform: str | None,
+    capability_overrides: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Import every SDK the providers need once and write a readiness snapshot.
+
+    Run under the same `uv run --with ...` invocation as a review so uv
+    resolves and caches the environment up front; importing each SDK then
+    compiles its bytecode. Import failures are recorded, not raised. The
+    snapshot also holds the resolved capabilities, so --list-sdks can answer
+    from it alone.
+    """
+    sdks = get_required_sdks_for_config(providers, platform)
+    imports: dict[str, dict[str, Any]] = {}
+    for sdk in ["any-llm-sdk", *sdks]:
+        module = sdk_import_name(sdk)
+        started = time.perf_counter()
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            imports[sdk] = {"module": module, "ok": False, "error": sanitize_error(str(e))}
+        else:
+            imports[sdk] = {
+                "module": module,
+                "ok": True,
+                "import_seconds": round(time.perf_counter() - started, 3),
+            }
+
+    snapshot = {
+        "key": _readiness_key(config_path, providers),
+        "created_at": time.time(),
+        "ready": all(i["ok"] for i in imports.values()),
+        "required_sdks": sdks,
+        "uv_with_flags": " ".join(f"--with {sdk}" for sdk in sdks),
+        "imports": imports,
+        "providers_capabilities": {
+            CircuitBreaker.key(p): capabilities_for(p, capability_overrides) for p in providers
+        },
+    }
+    path = readiness_snapshot_path(config_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(codec.dumps(snapshot, indent=True))
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def warmup_main(argv: list[str]) -> None:
+    """Entry point for the warmup subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="llm_council.py warmup",
+        description="Import provider SDKs once and record a readiness snapshot",
+    )
+    parser.add_argument(
+        "--provider", "-p", action="append", help="LLM providers to warm up"
+    )
+    args = parser.parse_args(argv)
+
+    config_path = get_config_path()
+    config = load_config(config_path)
+    providers = select_providers(config, args.provider)
+    snapshot = warmup_environment(
+        config_path, providers, config.get("platform"), capability_overrides_from_config(config),
+    )
+
+    output = {
+        "ready": snapshot["ready"],
+        "snapshot": str(readiness_snapshot_path(config_path)),
+        "required_sdks": snapshot["required_sdks"],
+        "uv_with_flags": snapshot["uv_with_flags"],
+        "imports": snapshot["imports"],
+    }
+    print(codec.dumps(output, indent=True))
+    sys.exit(0 if snapshot["ready"] else 1)
+
+
+class TokenBudget:
+    """Rolling one-hour cap on the tokens speculative reviews may spend."""
+
+    WINDOW_SECONDS = 3600.0
+
+    def __init__(self, tokens_per_hour: int, clock: Any = time.monotonic) -> None:
+        self.tokens_per_hour = tokens_per_hour
+        self._clock = clock
+        self._spent: list[tuple[float, int]] = []
+
+    def remaining(self) -> int:
+        """Return the tokens still available in the current window."""
+        cutoff = self._clock() - self.WINDOW_SECONDS
+        self._spent = [(at, tokens) for at, tokens in self._spent if at > cutoff]
+        return self.tokens_per_hour - sum(tokens for _, tokens in self._spent)
+
+    def spend(self, tokens: int) -> None:
+        """Record tokens used now."""
+        self._spent.append((self._clock(), tokens))
+
+
+def watch_context(root: Path) -> str:
+    """Return the project context speculative reviews are given."""
+    parts = []
+    for name in WATCH_CONTEXT_FILES:
+        try:
+            parts.append((root / name).read_text())
+        except (OSError, UnicodeDecodeError):
+            continue
+    return "\n".join(parts).strip() or "(none)"
+
+
+async def speculate(
+    council: Council,
+    store: ReviewStore,
+    root: Path,
+    files: list[str],
+    budget: TokenBudget,
+    max_file_bytes: int = DEFAULT_WATCH_MAX_FILE_BYTES,
+) -> dict[str, list[str]]:
+    """Review changed files the store has no result for, one file at a time.
+
+    Each file is sent alone to the providers missing a review of its current
+    contents. Lockfiles and other low-value files, files over max_file_bytes
+    and non-UTF-8 files are skipped; files that do not fit the remaining
+    budget are deferred. Returns the files per outcome.
+    """
+    resolved = await council.resolved_providers()
+    context = watch_context(root)
+    report: dict[str, list[str]] = {"reviewed": [], "cached": [], "skipped": [], "deferred": []}
+    for path in files:
+        name = path.rsplit("/", 1)[-1]
+        if any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in DEFAULT_DROP_PATTERNS):
+            report["skipped"].append(path)
+            continue
+        try:
+            data = (root / path).read_bytes()
+            content = data.decode()
+        except (OSError, UnicodeDecodeError):
+            report["skipped"].append(path)
+            continue
+        if len(data) > max_file_bytes:
+            report["skipped"].append(path)
+            continue
+
+        digest = hashlib.sha256(data).hexdigest()
+        missing = [p for p in resolved if store.get(p, path, digest) is None]
+        if not missing:
+            report["cached"].append(path)
+            continue
+        prompt = build_prompt(WATCH_PROMPT_TEMPLATE.format(context=context, path=path, content=content), [path])
+        estimated = estimate_tokens(prompt)
+        if estimated * len(missing) > budget.remaining():
+            report["deferred"].append(path)
+            continue
+
+        result = await run_council(prompt, missing, **council.options(SCHEMA_CODE_REVIEW))
+        spent = 0
+        for p, review in zip(missing, result["reviews"]):
+            usage = review.get("usage", {})
+            if "total_tokens" in usage:
+                spent += usage["total_tokens"]
+            elif not review.get("skipped"):
+                spent += estimated
+            if review.get("success") and not validate_review(review.get("parsed_json"), SCHEMA_CODE_REVIEW):
+                store.put(p, path, digest, review)
+        budget.spend(spent)
+        report["reviewed"].append(path)
+    return report
+
+
+async def watch(
+    council: Council,
+    store: ReviewStore,
+    watcher: ChangeWatcher,
+    budget: TokenBudget,
+    once: bool = False,
+) -> None:
+    """Precompute reviews of changed files until cancelled.
+
+    Files deferred for budget are retried with the next batch of changes.
+    With once, the current changes are reviewed and the function returns.
+    """
+
+    async def _pass(files: list[str]) -> list[str]:
+        report = await speculate(council, store, watcher.root, files, budget)
+        print(
+            f"[star-chamber] watch: {len(report['reviewed'])} reviewed, {len(report['cached'])} cached, "
+            f"{len(report['deferred'])} deferred (budget), {len(report['skipped'])} skipped",
+            file=sys.stderr,
+        )
+        return report["deferred"]
+
+    deferred = await _pass(watch_changed_files(watcher.root))
+    if once:
+        return
+    async for batch in watcher.batches():
+        deferred = await _pass(sorted(set(batch) | set(deferred)))
+
+
+def watch_main(argv: list[str]) -> None:
+    """Entry point for the watch subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="llm_council.py watch",
+        description="Review changed files in the background so later reviews return instantly",
+    )
+    parser.add_argument(
+        "--provider", "-p", action="append", help="LLM providers to use"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=2.0, help="Seconds without changes before reviewing (default: 2)"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=5.0, help="Seconds between checks when polling (default: 5)"
+    )
+    parser.add_argument(
+        "--polling", action="store_true", help="Poll the work tree instead of using inotify"
+    )
+    parser.add_argument(
+        "--tokens-per-hour",
+        type=int,
+        default=DEFAULT_WATCH_TOKENS_PER_HOUR,
+        help=f"Token budget for speculative reviews per rolling hour (default: {DEFAULT_WATCH_TOKENS_PER_HOUR})",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Review the current changes once and exit"
+    )
+    args = parser.parse_args(argv)
+    if args.debounce < 0 or args.poll_interval <= 0:
+        parser.error("--debounce must not be negative and --poll-interval must be positive")
+    if args.tokens_per_hour <= 0:
+        parser.error("--tokens-per-hour must be positive")
+
+    # Speculative work must never compete with the foreground for CPU.
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+    council = Council(
+        load_config(get_config_path()),
+        providers=args.provider,
+        schema=SCHEMA_CODE_REVIEW,
+        cascade=False,
+    )
+    store = ReviewStore()
+    store.prune()
+    root = repo_root(Path.cwd())
+    watcher = ChangeWatcher(
+        root, debounce_seconds=args.debounce, poll_interval=args.poll_interval, use_inotify=not args.polling,
+    )
+    print(f"[star-chamber] Watching {watcher.root} ({watcher.mode}); Ctrl-C to stop", file=sys.stderr)
+    try:
+        codec.run(watch(council, store, watcher, TokenBudget(args.tokens_per_hour), once=args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def job_queue_from_config(config: dict[str, Any], path: str | None = None) -> JobQueue:
+    """Open the review job queue (path, then config queue.path, then the state directory).
+
+    Raises ConfigError for invalid settings.
+    """
+    try:
+        settings = queue_settings_from_config(config)
+    except ValueError as e:
+        raise ConfigError("Invalid queue in config", details=str(e)) from e
+    return JobQueue(path or settings["path"] or state_dir() / "queue.db", settings)
+
+
+def job_payload(
+    prompt: str, files: list[str] | None, providers: list[str] | None, schema: str = SCHEMA_AUTO,
+) -> dict[str, Any]:
+    """Return the queued form of a review request."""
+    return {"prompt": prompt, "files": files or [], "providers": providers, "schema": schema}
+
+
+async def run_job(queue: JobQueue, job: Job, worker: str, council: Council) -> str:
+    """Run one claimed job, renewing its lease until the review finishes.
+
+    Config errors fail the job for good; other errors, and runs in which
+    every provider failed, are retried. If the lease is lost to another
+    worker the review is cancelled. Returns the job's outcome.
+    """
+    payload = job["payload"]
+    review = asyncio.ensure_future(council.review(payload["prompt"], payload.get("files") or None))
+    renew_every = queue.settings["lease_seconds"] / 3
+    while not review.done():
+        await asyncio.wait({review}, timeout=renew_every)
+        if not review.done() and not await asyncio.to_thread(queue.renew, job, worker):
+            review.cancel()
+            return "lost"
+
+    try:
+        output = review.result()
+    except StarChamberError as e:
+        await asyncio.to_thread(queue.fail, job, worker, codec.dumps(e.to_dict()), False)
+        return "failed"
+    except Exception as e:
+        await asyncio.to_thread(queue.fail, job, worker, sanitize_error(f"{type(e).__name__}: {e}"))
+        return "retried"
+    if not output["reviews"]:
+        errors = "; ".join(f"{r['provider']}: {r.get('error', 'failed')}" for r in output.get("failed_reviews", []))
+        await asyncio.to_thread(queue.fail, job, worker, f"Every provider failed ({errors})")
+        return "retried"
+    if not await asyncio.to_thread(queue.complete, job, worker, output):
+        return "lost"
+    return "done"
+
+
+async def run_worker(
+    queue: JobQueue,
+    config: dict[str, Any],
+    worker: str,
+    concurrency: int = 4,
+    poll_interval: float = 2.0,
+    drain: bool = False,
+) -> dict[str, int]:
+    """Claim and run jobs, up to concurrency at a time, until cancelled.
+
+    One Council is kept per provider selection, so API keys are resolved
+    once per worker. With drain, returns once no job is runnable. Returns
+    the number of jobs per outcome.
+    """
+    councils: dict[tuple[Any, ...], Council] = {}
+    outcomes: dict[str, int] = {}
+
+    def _council(payload: dict[str, Any]) -> Council:
+        providers = payload.get("providers")
+        schema = payload.get("schema", SCHEMA_AUTO)
+        key = (tuple(providers) if providers else None, schema)
+        if key not in councils:
+            councils[key] = Council(config, providers=providers, schema=schema)
+        return councils[key]
+
+    async def _run(job: Job) -> None:
+        try:
+            council = _council(job["payload"])
+        except StarChamberError as e:
+            await asyncio.to_thread(queue.fail, job, worker, codec.dumps(e.to_dict()), False)
+            outcome = "failed"
+        else:
+            outcome = await run_job(queue, job, worker, council)
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        print(f"[star-chamber] job {job['id']} (attempt {job['attempts']}): {outcome}", file=sys.stderr)
+
+    running: set[asyncio.Future[None]] = set()
+    try:
+        while True:
+            while len(running) < concurrency:
+                job = await asyncio.to_thread(queue.claim, worker)
+                if job is None:
+                    break
+                running.add(asyncio.ensure_future(_run(job)))
+            if not running:
+                if drain:
+                    return outcomes
+                await asyncio.sleep(poll_interval)
+                continue
+            _, running = await asyncio.wait(running, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in running:
+            task.cancel()
+
+
+def _queue_parser(prog: str, description: str) -> argparse.ArgumentParser:
+    """Return an argument parser with the shared --queue option."""
+    parser = argparse.ArgumentParser(prog=f"llm_council.py {prog}", description=description)
+    parser.add_argument(
+        "--queue", metavar="PATH", help="Queue database (default: config queue.path or the state directory)"
+    )
+    return parser
+
+
+def submit_main(argv: list[str]) -> None:
+    """Entry point for the submit subcommand."""
+    parser = _queue_parser("submit", "Queue a review job (prompt on stdin) for queue workers")
+    parser.add_argument(
+        "--file", "-f", action="append", help="Target file(s) to review"
+    )
+    parser.add_argument(
+        "--provider", "-p", action="append", help="LLM providers to use"
+    )
+    parser.add_argument(
+        "--schema",
+        choices=[SCHEMA_AUTO, SCHEMA_CODE_REVIEW, SCHEMA_DESIGN_QUESTION, SCHEMA_NONE],
+        default=SCHEMA_AUTO,
+        help="Review schema to validate responses against (default: inferred from the prompt)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help='Queue one job per JSON line {"prompt", "files", "providers", "schema"} instead of reading stdin',
+    )
+    args = parser.parse_args(argv)
+
+    config = load_config(get_config_path())
+    if args.batch:
+        payloads = []
+        with open(args.batch) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    request = codec.loads(line)
+                    payloads.append(job_payload(
+                        request["prompt"],
+                        request.get("files"),
+                        request.get("providers"),
+                        request.get("schema", SCHEMA_AUTO),
+                    ))
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    raise ConfigError(f"Invalid job on line {number} of {args.batch}", details=str(e)) from e
+    else:
+        payloads = [job_payload(sys.stdin.read(), args.file, args.provider, args.schema)]
+    # Catch unknown provider names here rather than in every worker.
+    for payload in payloads:
+        select_providers(config, payload["providers"])
+
+    queue = job_queue_from_config(config, args.queue)
+    print(codec.dumps({"queue": str(queue.path), "job_ids": queue.submit(payloads)}, indent=True))
+
+
+def worker_main(argv: list[str]) -> None:
+    """Entry point for the worker subcommand."""
+    parser = _queue_parser("worker", "Run queued review jobs")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Jobs run at once by this worker (default: 4)"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=2.0, help="Seconds between checks for new jobs (default: 2)"
+    )
+    parser.add_argument(
+        "--drain", action="store_true", help="Exit once no job is runnable instead of waiting for more"
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.poll_interval <= 0:
+        parser.error("--poll-interval must be positive")
+
+    config = load_config(get_config_path())
+    queue = job_queue_from_config(config, args.queue)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"[star-chamber] Worker {worker} serving {queue.path}", file=sys.stderr)
+    try:
+        outcomes = codec.run(run_worker(queue, config, worker, args.concurrency, args.poll_interval, args.drain))
+    except KeyboardInterrupt:
+        # Leases of unfinished jobs expire and other workers take them over.
+        sys.exit(130)
+    print(codec.dumps({"worker": worker, "jobs": outcomes}, indent=True))
+
+
+def status_main(argv: list[str]) -> None:
+    """Entry point for the status subcommand."""
+    parser = _queue_parser("status", "Show queue counts and the state of given jobs")
+    parser.add_argument("job_ids", nargs="*", type=int, help="Jobs to report on")
+    args = parser.parse_args(argv)
+
+    queue = job_queue_from_config(load_config(get_config_path()), args.queue)
+    print(codec.dumps({"counts": queue.counts(), "jobs": queue.jobs(args.job_ids)}, indent=True))
+
+
+def collect_main(argv: list[str]) -> None:
+    """Entry point for the collect subcommand."""
+    parser = _queue_parser("collect", "Print the council output of finished jobs")
+    parser.add_argument("job_ids", nargs="+", type=int, help="Jobs to collect")
+    parser.add_argument(
+        "--wait", action="store_true", help="Wait until every job is done or failed"
+    )
+    parser.add_argument(
+        "--timeout", type=float, help="With --wait, give up after this many seconds"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=2.0, help="Seconds between checks with --wait (default: 2)"
+    )
+    args = parser.parse_args(argv)
+
+    queue = job_queue_from_config(load_config(get_config_path()), args.queue)
+    deadline = time.monotonic() + args.timeout if args.timeout is not None else None
+    while True:
+        jobs = queue.jobs(args.job_ids, include_result=True)
+        finished = all(j["state"] in (DONE, FAILED) for j in jobs)
+        if finished or not args.wait or (deadline is not None and time.monotonic() >= deadline):
+            break
+        time.sleep(args.poll_interval)
+
+    missing = sorted(set(args.job_ids) - {j["id"] for j in jobs})
+    output: dict[str, Any] = {"jobs": jobs}
+    if missing:
+        output["unknown_job_ids"] = missing
+    print(codec.dumps(output, indent=True))
+    sys.exit(0 if not missing and all(j["state"] == DONE for j in jobs) else 1)
+
+
+def symbol_index_path(root: Path) -> Path:
+    """Return the cached symbol index path for a repository."""
+    digest = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+    return state_dir() / "symbols" / f"{digest}.json"
+
+
+def slice_main(argv: list[str]) -> None:
+    """Entry point for the slice subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="llm_council.py slice",
+        description="Print the changed symbols of files plus their types, callees and callers, within a token budget",
+    )
+    parser.add_argument(
+        "--file", "-f", action="append", help="Changed file(s) to slice (default: files changed since --base)"
+    )
+    parser.add_argument(
+        "--base", default="HEAD", help="Revision the changes are measured against (default: HEAD)"
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=DEFAULT_SLICE_BUDGET_TOKENS,
+        help=f"Approximate token budget for the slice (default: {DEFAULT_SLICE_BUDGET_TOKENS})",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the slice with what was included and omitted as JSON"
+    )
+    args = parser.parse_args(argv)
+    if args.budget <= 0:
+        parser.error("--budget must be positive")
+
+    root = repo_root(Path.cwd())
+    index = SymbolIndex(root, symbol_index_path(root)).refresh()
+    if args.file:
+        files = [os.path.relpath(Path(f).resolve(), root) for f in args.file]
+    else:
+        files = changed_files(root, args.base)
+    targets = {rel: changed_lines(root, rel, args.base) for rel in files}
+    result = slice_context(index, targets, args.budget)
+    print(
+        f"[star-chamber] Sliced {len(targets)} file(s) to ~{result['tokens']} tokens "
+        f"({len(result['included'])} snippets, {len(result['omitted'])} over budget; "
+        f"index: {index.stats['parsed']} parsed, {index.stats['reused']} cached)",
+        file=sys.stderr,
+    )
+    print(codec.dumps(result, indent=True) if args.json else result["text"])
+
+
+def _key_report(providers: list[ProviderConfig], platform: str | None) -> dict[str, Any]:
+    """Report which providers have API keys set, from the environment only."""
+    # For direct mode, resolve env vars to check readiness.
+    ready = []
+    missing_key = []
+    platform_provided = []
+    local_providers = []
+    for p in providers:
+        if p.get("local"):
+            local_providers.append(p["provider"])
+        elif platform == "any-llm":
+            platform_provided.append(p["provider"])
+        else:
+            # Direct mode: resolve env var to check if key is available.
+            api_key = p.get("api_key", "")
+            if api_key.startswith("${") and api_key.endswith("}"):
+                api_key = os.environ.get(api_key[2:-1], "")
+            if api_key:
+                ready.append(p["provider"])
+            else:
+                missing_key.append(p["provider"])
+
+    report: dict[str, Any] = {
+        "providers_configured": [p["provider"] for p in providers],
+        "providers_ready": ready,
+        "providers_missing_key": missing_key,
+        "providers_local": local_providers,
+        "platform": platform,
+    }
+    if platform == "any-llm":
+        report["providers_platform_provided"] = platform_provided
+        report["platform_key_set"] = bool(os.environ.get("ANY_LLM_KEY"))
+    return report
+
+
+def _circuit_report(providers: list[ProviderConfig], breaker: CircuitBreaker | None) -> dict[str, dict[str, Any]]:
+    """Report breaker state for each configured provider/model."""
+    if breaker is None:
+        return {}
+    tracked = breaker.snapshot()
+    return {
+        CircuitBreaker.key(p): tracked.get(CircuitBreaker.key(p), {"state": "closed", "consecutive_failures": 0})
+        for p in providers
+    }
+
+
+def list_sdks(council: Council) -> dict[str, Any]:
+    """Return --list-sdks diagnostics for the council's providers."""
+    providers = council.providers
+    sdks = get_required_sdks_for_config(providers, council.platform)
+    return {
+        **_key_report(providers, council.platform),
+        "providers_circuit": _circuit_report(providers, council.breaker),
+        "providers_capabilities": {
+            CircuitBreaker.key(p): capabilities_for(p, council.capability_overrides) for p in providers
+        },
+        "providers_latency": council.adaptive_timeouts.snapshot() if council.adaptive_timeouts else {},
+        "required_sdks": sdks,
+        "uv_with_flags": " ".join(f"--with {sdk}" for sdk in sdks),
+    }
+
+
+def list_sdks_from_snapshot(
+    config: dict[str, Any], config_path: str, providers: list[ProviderConfig], snapshot: dict[str, Any],
+) -> dict[str, Any]:
+    """Return --list-sdks diagnostics from a current warmup snapshot.
+
+    SDKs and capabilities come from the snapshot; only key readiness, breaker
+    state and latency history, which change between runs, are read fresh.
+    """
+    adaptive = adaptive_timeouts_from_config(config)
+    return {
+        **_key_report(providers, config.get("platform")),
+        "providers_circuit": _circuit_report(providers, circuit_breaker_from_config(config)),
+        "providers_capabilities": snapshot["providers_capabilities"],
+        "providers_latency": adaptive.snapshot() if adaptive is not None else {},
+        "required_sdks": snapshot["required_sdks"],
+        "uv_with_flags": snapshot["uv_with_flags"],
+        "readiness_snapshot": {
+            "path": str(readiness_snapshot_path(config_path)),
+            "ready": snapshot["ready"],
+            "created_at": snapshot["created_at"],
+        },
+    }
+
+
+def review_main(argv: list[str]) -> None:
+    """Run a council review (the default command)."""
+    parser = argparse.ArgumentParser(description="Star-Chamber Multi-LLM Review")
+    parser.add_argument(
+        "--file", "-f", action="append", help="Target file(s) to review"
+    )
+    parser.add_argument(
+        "--provider", "-p", action="append", help="LLM providers to use"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Timeout in seconds for each provider request (overrides config)",
+    )
+    parser.add_argument(
+        "--list-sdks",
+        action="store_true",
+        help="Output required SDK packages for configured/specified providers and exit",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Save each provider request fingerprint and response to DIR",
+    )
+    cassette_group.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve provider responses recorded in DIR instead of calling providers",
+    )
+    parser.add_argument(
+        "--replay-latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiply recorded latencies by this factor in --replay mode (0 disables delays)",
+    )
+    parser.add_argument(
+        "--schema",
+        choices=[SCHEMA_AUTO, SCHEMA_CODE_REVIEW, SCHEMA_DESIGN_QUESTION, SCHEMA_NONE],
+        default=SCHEMA_AUTO,
+        help="Review schema to validate responses against (default: inferred from the prompt)",
+    )
+    parser.add_argument(
+        "--repair-attempts",
+        type=int,
+        help="Follow-up repair requests per provider for invalid JSON (overrides config)",
+    )
+    parser.add_argument(
+        "--no-cascade",
+        action="store_true",
+        help="Send the prompt straight to every provider even if cascade is configured",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Compact the prompt (dedupe rules, collapse license headers, drop lockfiles) before sending",
+    )
+    parser.add_argument(
+        "--strip-comments",
+        action="store_true",
+        help="With --compact, also blank out Python comments and docstrings (line numbers are kept)",
+    )
+    parser.add_argument(
+        "--from-watch",
+        action="store_true",
+        help="Reuse reviews the watch subcommand made of these exact file contents; send only the rest",
+    )
+    parser.add_argument(
+        "--render",
+        choices=["json", "markdown"],
+        default="json",
+        help="Output format: the council JSON (default) or the Step 6 markdown report",
+    )
+    args = parser.parse_args(argv)
+
+    if args.strip_comments and not args.compact:
+        parser.error("--strip-comments requires --compact")
+    if args.repair_attempts is not None and args.repair_attempts < 0:
+        parser.error("--repair-attempts must not be negative")
+    if args.replay_latency_scale < 0:
+        parser.error("--replay-latency-scale must not be negative")
+    cassette: Cassette | None = None
+    if args.record:
+        cassette = Cassette(args.record, Cassette.RECORD)
+    elif args.replay:
+        cassette = Cassette(args.replay, Cassette.REPLAY, latency_scale=args.replay_latency_scale)
+
+    # Load provider config. Timeout: CLI flag > config > None.
+    config_path = get_config_path()
+    config = load_config(config_path)
+
+    # --list-sdks answers from a current warmup snapshot without building a council.
+    if args.list_sdks:
+        providers = select_providers(config, args.provider)
+        snapshot = load_readiness_snapshot(config_path, providers)
+        if snapshot is not None:
+            print(codec.dumps(list_sdks_from_snapshot(config, config_path, providers, snapshot), indent=True))
+            sys.exit(0)
+
+    # --compact enables compaction with any drop_patterns set in config.
+    compaction: CompactionSettings | None = None
+    if args.compact:
+        raw = config.get("compaction")
+        settings = {**(raw if isinstance(raw, dict) else {}), "enabled": True}
+        if args.strip_comments:
+            settings["strip_comments"] = True
+        try:
+            compaction = compaction_from_config({"compaction": settings})
+        except ValueError as e:
+            raise ConfigError("Invalid compaction in config", details=str(e)) from e
+
+    council = Council(
+        config,
+        providers=args.provider,
+        timeout=args.timeout,
+        cassette=cassette,
+        schema=args.schema,
+        repair_attempts=args.repair_attempts,
+        cascade=not args.no_cascade,
+        compaction=compaction,
+        store=ReviewStore() if args.from_watch and not args.replay else None,
+    )
+
+    # Handle --list-sdks: output diagnostic info and exit.
+    if args.list_sdks:
+        print(codec.dumps(list_sdks(council), indent=True))
+        sys.exit(0)
+
+    # Read prompt from stdin.
+    prompt = sys.stdin.read()
+
+    # Determine files to review.
+    files_to_review = args.file if args.file else get_changed_files()
+
+    output = codec.run(council.review(prompt, files_to_review))
+    if args.render == "markdown":
+        layout = council.schema_for(prompt)
+        print(render_markdown(output, layout, question=design_question(prompt)), end="")
+    else:
+        print(codec.dumps(output, indent=True))
+
+
+SUBCOMMANDS = {
+    "warmup": warmup_main,
+    "watch": watch_main,
+    "submit": submit_main,
+    "worker": worker_main,
+    "status": status_main,
+    "collect": collect_main,
+    "slice": slice_main,
+}
+
+
+def main() -> None:
+    """Entry point for the LLM council script."""
+    argv = sys.argv[1:]
+    command = SUBCOMMANDS.get(argv[0]) if argv else None
+    try:
+        if command is not None:
+            command(argv[1:])
+        else:
+            review_main(argv)
+    except StarChamberError as e:
+        print(codec.dumps(e.to_dict(), indent=True))
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""
+Shared per-provider rate limits for star-chamber.
+
+Providers with a "rate_limit" in providers.json get token buckets for
+requests and tokens per minute. Bucket levels live in a locked state file,
+so parallel sessions and agents on the machine draw from one budget and
+wait for capacity instead of tripping the provider's 429s.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any
+
+from breaker import CircuitBreaker
+from state import locked_json_state
+
+
+# Limits a provider's "rate_limit" object may set.
+RATE_LIMIT_FIELDS = ("requests_per_minute", "tokens_per_minute")
+
+
+class RateLimiter:
+    """Token-bucket rate limiter shared by every process on the machine.
+
+    Providers with a "rate_limit" ({"requests_per_minute": N,
+    "tokens_per_minute": M}) get one request bucket and one token bucket per
+    provider/model, each holding up to a minute of budget and refilling
+    continuously. Bucket levels live in a locked state file so concurrent
+    star-chamber sessions draw from the same budget. Callers wait for
+    capacity instead of sending requests that would be rejected with 429s.
+    """
+
+    def __init__(self, path: str | Path, clock: Any = time.time) -> None:
+        self.path = Path(path)
+        self._clock = clock
+
+    def _try_take(self, config: dict[str, Any], tokens: int) -> float:
+        """Take one request and tokens if available; else return seconds to wait."""
+        limits = config.get("rate_limit") or {}
+        key = CircuitBreaker.key(config)
+        now = self._clock()
+        with locked_json_state(self.path) as state:
+            entry = state.setdefault(key, {"updated_at": now})
+            elapsed = max(0.0, now - entry.get("updated_at", now))
+            entry["updated_at"] = now
+            needs = (("requests", "requests_per_minute", 1), ("tokens", "tokens_per_minute", tokens))
+            wait = 0.0
+            for bucket, limit_name, amount in needs:
+                limit = limits.get(limit_name)
+                if not limit:
+                    continue
+                level = min(limit, entry.get(bucket, limit) + elapsed * limit / 60)
+                entry[bucket] = level
+                # Requests larger than a whole bucket wait for a full bucket.
+                wanted = min(amount, limit)
+                if level < wanted:
+                    wait = max(wait, (wanted - level) * 60 / limit)
+            if wait:
+                return wait
+            for bucket, limit_name, amount in needs:
+                if limits.get(limit_name):
+                    entry[bucket] -= amount
+            return 0.0
+
+    async def acquire(self, config: dict[str, Any], tokens: int) -> float:
+        """Wait until a request with the estimated tokens fits; return seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self._try_take(config, tokens)
+            if not wait:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def settle(self, config: dict[str, Any], estimated: int, actual: int) -> None:
+        """Charge (or refund) the difference between estimated and actual tokens."""
+        limit = (config.get("rate_limit") or {}).get("tokens_per_minute")
+        if not limit or actual == estimated:
+            return
+        key = CircuitBreaker.key(config)
+        with locked_json_state(self.path) as state:
+            entry = state.setdefault(key, {"updated_at": self._clock(), "tokens": limit})
+            entry["tokens"] = min(limit, entry.get("tokens", limit) - (actual - estimated))
+
+
+def has_rate_limits(config: dict[str, Any]) -> bool:
+    """Return whether any provider in providers.json sets rate_limit.
+
+    Raises ValueError, naming the provider, for invalid limits.
+    """
+    limited = False
+    for p in config.get("providers", []):
+        limits = p.get("rate_limit")
+        if limits is None:
+            continue
+        provider = p.get("provider")
+        if not isinstance(limits, dict) or not limits:
+            raise ValueError(
+                f"{provider}: rate_limit must be an object with requests_per_minute and/or tokens_per_minute",
+            )
+        for name, value in limits.items():
+            if name not in RATE_LIMIT_FIELDS:
+                raise ValueError(f"{provider}: unknown field {name}")
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                raise ValueError(f"{provider}: {name} must be a positive integer")
+        limited = True
+    return limited
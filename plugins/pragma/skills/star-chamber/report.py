@@ -0,0 +1,378 @@
+"""
+Markdown reports for star-chamber council output.
+
+Renders the PROTOCOL.md Step 6 layouts (the code review report and the
+design question advisory) straight from the council's parsed reviews, so
+the orchestrating model does not have to read every provider's JSON and
+write the report itself. Rendering is deterministic: the same output
+always gives the same report.
+
+Code review issues are grouped the way Step 5 describes: the same file,
+overlapping line ranges (within LINE_TOLERANCE) and the same category are
+one issue. Design approaches are grouped by name, ignoring case and
+punctuation.
+"""
+
+import re
+from typing import Any
+
+
+# Report layouts (the llm_council schema names).
+CODE_REVIEW = "code-review"
+DESIGN_QUESTION = "design-question"
+
+# Lines apart that issues can be and still count as the same issue.
+LINE_TOLERANCE = 3
+
+# Ordered severity and risk levels (lowest first).
+SEVERITIES = ("low", "medium", "high")
+RISK_LEVELS = ("low", "medium", "high")
+
+_LOCATION = re.compile(r"^(?P<file>.+?):(?P<start>\d+)(?:\s*[-–]\s*(?P<end>\d+))?(?::\d+)?$")
+_QUESTION = re.compile(r"^## Design Question[ \t]*\n(?P<question>.*?)(?=^## |\Z)", re.MULTILINE | re.DOTALL)
+
+
+def detect_layout(output: dict[str, Any]) -> str:
+    """Infer the report layout from the parsed reviews (code review by default)."""
+    for review in output.get("reviews", []):
+        parsed = review.get("parsed_json")
+        if isinstance(parsed, dict) and "approaches" in parsed:
+            return DESIGN_QUESTION
+    return CODE_REVIEW
+
+
+def design_question(prompt: str) -> str:
+    """Return the text under the prompt's "## Design Question" heading, if any."""
+    match = _QUESTION.search(prompt)
+    return _inline(match.group("question")) if match else ""
+
+
+def render_markdown(output: dict[str, Any], layout: str | None = None, question: str = "") -> str:
+    """Render council output as the Step 6 markdown report.
+
+    layout is CODE_REVIEW or DESIGN_QUESTION (default: inferred from the
+    reviews); question is shown in design question reports.
+    """
+    layout = layout or detect_layout(output)
+    labels = _provider_labels(output.get("reviews", []) + output.get("failed_reviews", []))
+    usable, malformed = [], []
+    key = "approaches" if layout == DESIGN_QUESTION else "issues"
+    for review in output.get("reviews", []):
+        parsed = review.get("parsed_json")
+        if isinstance(parsed, dict) and isinstance(parsed.get(key), list):
+            usable.append((labels[id(review)], parsed))
+        else:
+            malformed.append(review)
+
+    if layout == DESIGN_QUESTION:
+        lines = _render_design(usable, question)
+    else:
+        lines = _render_code_review(output, usable)
+    lines += _render_failures(output.get("failed_reviews", []), malformed, labels)
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _provider_labels(reviews: list[dict[str, Any]]) -> dict[int, str]:
+    """Name each review by provider, adding the model where a provider appears twice."""
+    counts: dict[str, int] = {}
+    for r in reviews:
+        counts[r.get("provider", "?")] = counts.get(r.get("provider", "?"), 0) + 1
+    return {
+        id(r): r.get("provider", "?") if counts[r.get("provider", "?")] == 1
+        else f"{r.get('provider', '?')} ({r.get('model', '?')})"
+        for r in reviews
+    }
+
+
+def _inline(text: Any) -> str:
+    """Collapse text onto one line."""
+    return " ".join(str(text).split()) if text is not None else ""
+
+
+def _cell(text: Any) -> str:
+    """Escape text for a table cell."""
+    return _inline(text).replace("|", "\\|") or "-"
+
+
+def _rank(value: Any, levels: tuple[str, ...]) -> int:
+    """Return value's position in levels (-1 if it is not one of them)."""
+    return levels.index(value) if value in levels else -1
+
+
+def _header(title: str, providers: list[str], files: list[str] | None = None) -> list[str]:
+    """Return the report title and the files and providers lines."""
+    lines = [f"## {title}", ""]
+    if files is not None:
+        lines.append(f"**Files:** {', '.join(f'`{f}`' for f in files) or 'none'}")
+    lines += [f"**Providers:** {', '.join(providers) or 'none'}", ""]
+    return lines
+
+
+def _parse_location(location: Any) -> tuple[str, int | None, int | None]:
+    """Split "file:line" or "file:start-end" into its file and line range."""
+    text = _inline(location)
+    match = _LOCATION.match(text)
+    if match is None:
+        return text, None, None
+    start = int(match.group("start"))
+    end = int(match.group("end") or start)
+    return match.group("file"), min(start, end), max(start, end)
+
+
+def group_issues(usable: list[tuple[str, dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Group every provider's issues into distinct issues, each with the providers that raised it."""
+    found = []
+    for order, (provider, parsed) in enumerate(usable):
+        for issue in parsed["issues"]:
+            if not isinstance(issue, dict):
+                continue
+            path, start, end = _parse_location(issue.get("location", ""))
+            found.append({
+                "provider": provider, "order": order, "issue": issue, "file": path,
+                "start": start, "end": end, "category": _inline(issue.get("category", "")).lower(),
+            })
+    found.sort(key=lambda f: (f["file"], f["category"], f["start"] is not None, f["start"] or 0, f["order"]))
+
+    groups: list[list[dict[str, Any]]] = []
+    group_end = 0
+    for f in found:
+        last = groups[-1][-1] if groups else None
+        same_place = last is not None and (last["file"], last["category"]) == (f["file"], f["category"])
+        if same_place and f["start"] is None and last["start"] is None:
+            groups[-1].append(f)
+        elif same_place and f["start"] is not None and last["start"] is not None and (
+            f["start"] <= group_end + LINE_TOLERANCE
+        ):
+            groups[-1].append(f)
+            group_end = max(group_end, f["end"])
+        else:
+            groups.append([f])
+            group_end = f["end"] or 0
+
+    issues = []
+    for group in groups:
+        # The most severe report speaks for the group; ties go to the earliest provider.
+        lead = max(group, key=lambda f: (_rank(_inline(f["issue"].get("severity")).lower(), SEVERITIES), -f["order"]))
+        starts = [f["start"] for f in group if f["start"] is not None]
+        location = lead["file"]
+        if starts:
+            start, end = min(starts), max(f["end"] for f in group if f["end"] is not None)
+            location += f":{start}" if start == end else f":{start}-{end}"
+        providers = []
+        for f in sorted(group, key=lambda f: f["order"]):
+            if f["provider"] not in providers:
+                providers.append(f["provider"])
+        suggestion = lead["issue"].get("suggestion") or next(
+            (f["issue"]["suggestion"] for f in group if f["issue"].get("suggestion")), "",
+        )
+        issues.append({
+            "location": location,
+            "severity": _inline(lead["issue"].get("severity", "")).lower(),
+            "category": lead["category"],
+            "description": _inline(lead["issue"].get("description", "")),
+            "suggestion": _inline(suggestion),
+            "providers": providers,
+            "file": lead["file"],
+            "start": min(starts) if starts else 0,
+        })
+    issues.sort(key=lambda i: (-_rank(i["severity"], SEVERITIES), i["file"], i["start"], i["category"]))
+    return issues
+
+
+def _issue_item(n: int, issue: dict[str, Any], with_providers: bool) -> list[str]:
+    """Return a numbered issue with its suggestion."""
+    severity = f" **[{issue['severity'].upper()}]**" if issue["severity"] else ""
+    providers = f" ({', '.join(issue['providers'])})" if with_providers else ""
+    lines = [f"{n}. `{issue['location']}`{severity}{providers} - {issue['description']}"]
+    if issue["suggestion"]:
+        lines.append(f"   - **Suggestion:** {issue['suggestion']}")
+    return lines
+
+
+def _render_code_review(output: dict[str, Any], usable: list[tuple[str, dict[str, Any]]]) -> list[str]:
+    """Return the Star-Chamber Review report lines."""
+    providers = [p for p, _ in usable]
+    total = len(providers)
+    issues = group_issues(usable)
+    consensus = [i for i in issues if total > 1 and len(i["providers"]) == total]
+    majority = [i for i in issues if 1 < len(i["providers"]) < total]
+    individual = [i for i in issues if len(i["providers"]) == 1]
+
+    lines = _header("Star-Chamber Review", providers, output.get("files_reviewed", []))
+    if consensus:
+        lines += ["### Consensus Issues (All Providers Agree)", "",
+                  "These issues were flagged by every council member. Address these first.", ""]
+        for n, issue in enumerate(consensus, 1):
+            lines += _issue_item(n, issue, with_providers=False)
+        lines.append("")
+    for count in sorted({len(i["providers"]) for i in majority}, reverse=True):
+        lines += [f"### Majority Issues ({count}/{total} Providers)", "",
+                  "These issues were flagged by most council members." if count * 2 > total
+                  else "These issues were flagged by several council members.", ""]
+        for n, issue in enumerate((i for i in majority if len(i["providers"]) == count), 1):
+            lines += _issue_item(n, issue, with_providers=True)
+        lines.append("")
+    if individual:
+        lines += ["### Individual Observations", "",
+                  "Issues raised by a single provider. May be valid specialized insights.", ""]
+        for issue in individual:
+            severity = f" **[{issue['severity'].upper()}]**" if issue["severity"] else ""
+            lines.append(f"- **{issue['providers'][0]}:** `{issue['location']}`{severity} - {issue['description']}")
+        lines.append("")
+
+    lines += ["### Summary", "", "| Provider | Quality Rating | Issues Found |",
+              "|----------|---------------|--------------|"]
+    for provider, parsed in usable:
+        count = sum(1 for i in parsed["issues"] if isinstance(i, dict))
+        lines.append(f"| {_cell(provider)} | {_cell(parsed.get('quality_rating'))} | {count} |")
+    lines += ["", f"**Overall:** {_code_review_overall(consensus, majority, individual, total)}", ""]
+    return lines
+
+
+def _code_review_overall(
+    consensus: list[dict[str, Any]], majority: list[dict[str, Any]], individual: list[dict[str, Any]], total: int,
+) -> str:
+    """Return the one-line synthesis of a code review."""
+    if not total:
+        return "No provider returned a usable review."
+    if not consensus and not majority and not individual:
+        return f"No issues found by {total} provider{'s' if total > 1 else ''}."
+    counts = [(len(consensus), "consensus"), (len(majority), "majority"), (len(individual), "individual")]
+    summary = ", ".join(f"{n} {kind}" for n, kind in counts if n)
+    high = [i for i in consensus + majority if i["severity"] == "high"]
+    if high:
+        return f"{summary} issues; fix the {len(high)} high-severity shared issue{'s' if len(high) > 1 else ''} first."
+    return f"{summary} issues."
+
+
+def _approach_key(name: Any) -> str:
+    """Normalize an approach name for grouping."""
+    return " ".join(re.sub(r"[^\w\s]", " ", str(name).casefold()).split())
+
+
+def _recommended_key(parsed: dict[str, Any]) -> str:
+    """Return the key of the approach a provider recommends.
+
+    The recommendation is free text, so it is matched to the provider's own
+    approaches: an exact name first, then the longest name it mentions.
+    """
+    recommendation = _approach_key(parsed.get("recommendation", ""))
+    names = [_approach_key(a.get("name", "")) for a in parsed["approaches"] if isinstance(a, dict)]
+    if recommendation in names:
+        return recommendation
+    mentioned = [n for n in names if n and re.search(rf"\b{re.escape(n)}\b", recommendation)]
+    return max(mentioned, key=len) if mentioned else recommendation
+
+
+def group_approaches(usable: list[tuple[str, dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Merge every provider's approaches by name, with the providers recommending each."""
+    approaches: dict[str, dict[str, Any]] = {}
+    for order, (provider, parsed) in enumerate(usable):
+        for a in parsed["approaches"]:
+            if not isinstance(a, dict):
+                continue
+            key = _approach_key(a.get("name", ""))
+            merged = approaches.setdefault(key, {
+                "key": key, "name": _inline(a.get("name", "")), "pros": [], "cons": [], "risks": set(),
+                "fit": {}, "recommended_by": [], "order": order,
+            })
+            for field in ("pros", "cons"):
+                seen = {_approach_key(x) for x in merged[field]}
+                for item in a.get(field) or []:
+                    if _approach_key(item) not in seen:
+                        merged[field].append(_inline(item))
+                        seen.add(_approach_key(item))
+            if a.get("risk_level"):
+                merged["risks"].add(_inline(a["risk_level"]).lower())
+            merged["fit"].setdefault(provider, _inline(a.get("fit_rating", "")))
+        key = _recommended_key(parsed)
+        if key in approaches:
+            approaches[key]["recommended_by"].append(provider)
+        else:
+            # Recommended something it did not list as an approach.
+            approaches[key] = {
+                "key": key, "name": _inline(parsed.get("recommendation", "")), "pros": [], "cons": [],
+                "risks": set(), "fit": {}, "recommended_by": [provider], "order": order,
+            }
+    return sorted(approaches.values(), key=lambda a: (-len(a["recommended_by"]), -len(a["fit"]), a["order"]))
+
+
+def _render_design(usable: list[tuple[str, dict[str, Any]]], question: str) -> list[str]:
+    """Return the Star-Chamber Advisory report lines."""
+    providers = [p for p, _ in usable]
+    total = len(providers)
+    approaches = group_approaches(usable)
+    top = approaches[0] if approaches and approaches[0]["recommended_by"] else None
+    recommended = {p: a for a in approaches for p in a["recommended_by"]}
+
+    lines = _header("Star-Chamber Advisory", providers)
+    if question:
+        lines.insert(2, f"**Question:** {question}")
+
+    lines += ["### Consensus Recommendation", ""]
+    if top is not None and total == 1:
+        lines.append(f"Only {providers[0]} answered; it recommends **{top['name']}**.")
+    elif top is not None and len(top["recommended_by"]) == total:
+        lines.append(f"All {total} providers recommend **{top['name']}**.")
+    else:
+        distinct = len({a["key"] for a in recommended.values()})
+        plural = "es" if distinct != 1 else ""
+        lines.append(f"No consensus: providers recommended {distinct} different approach{plural}.")
+    lines.append("")
+
+    if approaches:
+        lines += ["### Approaches Considered", ""]
+        for a in approaches:
+            lines.append(f"**{a['name']}** - Recommended by {len(a['recommended_by'])}/{total} providers")
+            if a["pros"]:
+                lines.append(f"- **Pros:** {'; '.join(a['pros'])}")
+            if a["cons"]:
+                lines.append(f"- **Cons:** {'; '.join(a['cons'])}")
+            if a["risks"]:
+                risks = sorted(a["risks"], key=lambda r: (_rank(r, RISK_LEVELS), r))
+                lines.append(f"- **Risk:** {' to '.join([risks[0], risks[-1]]) if len(risks) > 1 else risks[0]}")
+            lines.append("")
+
+    dissent = [(p, parsed) for p, parsed in usable if top is not None and recommended[p] is not top]
+    if dissent:
+        lines += ["### Dissenting Views", ""]
+        for provider, parsed in dissent:
+            reasoning = _inline(parsed.get("summary", ""))
+            lines.append(f"- **{provider}** recommends {recommended[provider]['name']}"
+                         + (f": {reasoning}" if reasoning else ""))
+        lines.append("")
+
+    lines += ["### Summary", "", "| Provider | Recommendation | Fit Rating |",
+              "|----------|---------------|------------|"]
+    for provider, parsed in usable:
+        approach = recommended[provider]
+        lines.append(
+            f"| {_cell(provider)} | {_cell(approach['name'])} | {_cell(approach['fit'].get(provider))} |"
+        )
+    if top is None:
+        overall = "No provider returned a usable recommendation."
+    else:
+        overall = f"{len(top['recommended_by'])}/{total} providers recommend {top['name']}."
+        if dissent:
+            n = len(dissent)
+            overall += f" {n} provider{'s' if n > 1 else ''} dissent{'s' if n == 1 else ''}."
+    lines += ["", f"**Overall:** {overall}", ""]
+    return lines
+
+
+def _render_failures(
+    failed: list[dict[str, Any]], malformed: list[dict[str, Any]], labels: dict[int, str],
+) -> list[str]:
+    """Return the failed providers section (empty when every provider succeeded)."""
+    if not failed and not malformed:
+        return []
+    lines = ["### Failed Providers", ""]
+    for r in failed:
+        kind = "skipped" if r.get("skipped") else "timed out" if r.get("timed_out") else "failed"
+        error = _inline(r.get("error", "unknown error"))
+        lines.append(f"- **{labels[id(r)]}** ({r.get('model', '?')}) {kind}: {error}")
+    for r in malformed:
+        errors = "; ".join(_inline(e) for e in r.get("schema_errors", [])) or "no usable JSON"
+        lines.append(f"- **{labels[id(r)]}** ({r.get('model', '?')}) returned a malformed response: {errors}")
+    lines.append("")
+    return lines
@@ -0,0 +1,107 @@
+"""
+Store of reviews precomputed by star-chamber watch mode.
+
+Watch mode reviews changed files one at a time in the background and saves
+each provider's review here, keyed by the file's path and content hash. A
+later review of the same file contents reuses the stored review instead of
+asking the provider again.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import codec
+from state import state_dir
+
+
+# How long precomputed reviews stay usable.
+DEFAULT_STORE_MAX_AGE_SECONDS = 7 * 24 * 3600.0
+
+
+def content_hash(path: str | Path) -> str | None:
+    """Return the sha256 of a file's bytes, or None if it cannot be read."""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class ReviewStore:
+    """Directory of single-file reviews precomputed by the watch subcommand.
+
+    Each entry is one provider/model's review of one file, keyed by the
+    file's path and content hash, so it stays valid exactly as long as the
+    file is unchanged. Entries older than max_age_seconds are ignored and
+    deleted by prune().
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_age_seconds: float = DEFAULT_STORE_MAX_AGE_SECONDS,
+        clock: Any = time.time,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else state_dir() / "reviews"
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+
+    def path_for(self, config: dict[str, Any], path: str, digest: str) -> Path:
+        """Return the entry file for a provider's review of one file version."""
+        payload = json.dumps(
+            {
+                "provider": config["provider"].lower(),
+                "model": config["model"],
+                "api_base": config.get("api_base", ""),
+                "path": path,
+                "content_hash": digest,
+            },
+            sort_keys=True,
+        )
+        return self.directory / f"{hashlib.sha256(payload.encode()).hexdigest()}.json"
+
+    def get(self, config: dict[str, Any], path: str, digest: str) -> dict[str, Any] | None:
+        """Return the stored review, or None if missing, unreadable or expired."""
+        try:
+            entry = codec.loads(self.path_for(config, path, digest).read_bytes())
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("parsed_json"), dict):
+            return None
+        if self._clock() - float(entry.get("created_at") or 0) > self.max_age_seconds:
+            return None
+        return entry
+
+    def put(self, config: dict[str, Any], path: str, digest: str, result: dict[str, Any]) -> None:
+        """Persist a successful review of one file version."""
+        entry = {
+            "provider": config["provider"],
+            "model": config["model"],
+            "path": path,
+            "content_hash": digest,
+            "created_at": self._clock(),
+            "parsed_json": result.get("parsed_json"),
+            "usage": result.get("usage", {}),
+            "elapsed_seconds": result.get("elapsed_seconds", 0.0),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.path_for(config, path, digest)
+        tmp_path = target.with_suffix(".tmp")
+        tmp_path.write_text(codec.dumps(entry, indent=True))
+        os.replace(tmp_path, target)
+
+    def prune(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        removed = 0
+        cutoff = self._clock() - self.max_age_seconds
+        for entry_path in self.directory.glob("*.json"):
+            try:
+                if entry_path.stat().st_mtime < cutoff:
+                    entry_path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
@@ -0,0 +1,65 @@
+"""
+Shared state files for star-chamber.
+
+State that every session on the machine shares (circuit breaker, rate
+limit buckets, latency history, precomputed reviews) lives under one
+directory. JSON state files are read and written under an exclusive lock,
+so concurrent processes serialize their read-modify-write cycles.
+"""
+
+import json
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import codec
+
+try:
+    import fcntl
+except ImportError:  # Windows: state files are used without cross-process locking.
+    fcntl = None  # type: ignore[assignment]
+
+
+def state_dir() -> Path:
+    """Return the directory for state shared across star-chamber sessions."""
+    override = os.environ.get("STAR_CHAMBER_STATE_DIR")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "star-chamber"
+
+
+@contextmanager
+def locked_json_state(path: Path) -> Iterator[dict[str, Any]]:
+    """Load a JSON state file under an exclusive lock and save it on exit if changed.
+
+    The lock is held on a sibling .lock file so concurrent processes on the
+    same machine serialize their read-modify-write cycles. A missing or
+    corrupt state file starts out empty. Changes are written to a unique
+    temporary file and renamed over the state file, so readers never see a
+    partial write.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            try:
+                state = codec.loads(path.read_bytes())
+                if not isinstance(state, dict):
+                    state = {}
+            except (FileNotFoundError, json.JSONDecodeError):
+                state = {}
+            before = codec.dumps(state)
+            yield state
+            if codec.dumps(state) != before:
+                with tempfile.NamedTemporaryFile(
+                    "w", dir=path.parent, prefix=f".{path.name}.", delete=False,
+                ) as tmp_file:
+                    tmp_file.write(codec.dumps(state, indent=True))
+                os.replace(tmp_file.name, path)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,273 @@
+"""
+Runaway-response guard for streamed star-chamber reviews.
+
+Watches a provider's streamed output and stops the generation early when it
+degenerates, instead of waiting for max_tokens or the timeout:
+- Repetition: the tail of the output is the same window repeated back to back
+- Echo: the output reproduces a long run of the prompt
+- Overrun: the reply keeps going after its top-level JSON value has closed
+
+Whatever JSON was produced before the degenerate part is salvaged by closing
+the open objects and arrays at the last complete value.
+"""
+
+import json
+import re
+from collections import deque
+from typing import Any, TypedDict
+
+
+# Repeated windows shorter than this are not checked (e.g. "\n\n").
+MIN_REPEAT_PERIOD = 8
+
+# Longest repeated window checked.
+MAX_REPEAT_PERIOD = 512
+
+# How often (in characters of new output) the repetition check runs.
+CHECK_INTERVAL_CHARS = 256
+
+# Words per shingle when matching output against the prompt.
+ECHO_SHINGLE_WORDS = 16
+
+WORD = re.compile(r"\S+")
+SPACE = re.compile(r"\s")
+
+
+class GuardSettings(TypedDict):
+    """Thresholds for aborting a streamed generation."""
+
+    # Abort when this many characters at the end of the output are one window repeated.
+    repeat_chars: int
+    # Abort when this many consecutive output words are copied from the prompt.
+    echo_words: int
+    # Abort when this many non-whitespace characters follow the closed JSON value.
+    trailing_chars: int
+
+
+DEFAULT_GUARD_SETTINGS = GuardSettings(repeat_chars=600, echo_words=200, trailing_chars=200)
+
+
+class RunawayGuard:
+    """Incremental detector for degenerate streamed output.
+
+    Feed each streamed delta to feed(); once it returns a reason the
+    generation should be aborted, and cut_at is where the degenerate
+    output starts. Each delta is checked against bounded state (the last
+    few words and the last repeat_chars of output), so feeding is linear
+    in the length of the stream.
+    """
+
+    def __init__(self, prompt: str, settings: GuardSettings = DEFAULT_GUARD_SETTINGS) -> None:
+        self.settings = settings
+        self.reason: str | None = None
+        self.cut_at = 0
+        self._chunks: list[str] = []
+        self._length = 0
+        self._prompt_shingles = self._shingles([m.group() for m in WORD.finditer(prompt)])
+        self._words: deque[tuple[str, int]] = deque(maxlen=ECHO_SHINGLE_WORDS)
+        # Output after the last complete word, and its offset in the stream.
+        self._pending: list[str] = []
+        self._pending_at = 0
+        self._echo_run = 0
+        self._echo_start = 0
+        # JSON scanner state, to notice output after the top-level value.
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._json_end: int | None = None
+        self._trailing = 0
+        # Repetition check state: the output tail as of the last check, plus deltas since.
+        self._tail = ""
+        self._recent: list[str] = []
+        self._checked_at = 0
+
+    @staticmethod
+    def _shingles(words: list[str]) -> set[int]:
+        """Hash every ECHO_SHINGLE_WORDS-word window."""
+        n = ECHO_SHINGLE_WORDS
+        return {hash(tuple(words[i:i + n])) for i in range(len(words) - n + 1)}
+
+    @property
+    def text(self) -> str:
+        """All output fed so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, delta: str) -> str | None:
+        """Add streamed text; return an abort reason once output degenerates."""
+        if self.reason is not None or not delta:
+            return self.reason
+        start = self._length
+        self._chunks.append(delta)
+        self._recent.append(delta)
+        self._length += len(delta)
+        reason = self._check_overrun(delta, start) or self._check_echo(delta) or self._check_repetition()
+        if reason is not None:
+            self.reason = reason
+        return reason
+
+    def _check_overrun(self, delta: str, start: int) -> str | None:
+        """Track JSON nesting and flag text that runs past the closed value."""
+        for i, ch in enumerate(delta):
+            if self._json_end is not None:
+                # Code fences around the reply do not count as trailing output.
+                if not ch.isspace() and ch != "`":
+                    self._trailing += 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._depth:
+                self._in_string = True
+            elif ch == "{" or (ch == "[" and self._depth):
+                # Reviews are JSON objects; ignore "[1]"-style prose before one.
+                self._depth += 1
+            elif ch in "}]" and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self._json_end = start + i + 1
+        if self._json_end is not None and self._trailing >= self.settings["trailing_chars"]:
+            self.cut_at = self._json_end
+            return "output continued past the end of the JSON response"
+        return None
+
+    def _check_echo(self, delta: str) -> str | None:
+        """Flag long runs of output words that are copied from the prompt."""
+        self._pending.append(delta)
+        # No word can have ended until whitespace arrives.
+        if not SPACE.search(delta):
+            return None
+        pending = "".join(self._pending)
+        consumed = 0
+        for match in WORD.finditer(pending):
+            # The last word may still be growing.
+            if match.end() == len(pending):
+                break
+            self._words.append((match.group(), self._pending_at + match.start()))
+            consumed = match.end()
+            if len(self._words) < ECHO_SHINGLE_WORDS:
+                continue
+            if hash(tuple(w for w, _ in self._words)) in self._prompt_shingles:
+                if not self._echo_run:
+                    self._echo_start = self._words[0][1]
+                self._echo_run += 1
+            else:
+                self._echo_run = 0
+            if self._echo_run + ECHO_SHINGLE_WORDS - 1 >= self.settings["echo_words"]:
+                self.cut_at = self._echo_start
+                return "output is echoing the prompt"
+        self._pending = [pending[consumed:]]
+        self._pending_at += consumed
+        return None
+
+    def _check_repetition(self) -> str | None:
+        """Flag output whose tail is one window repeated back to back."""
+        if self._length - self._checked_at < CHECK_INTERVAL_CHARS:
+            return None
+        self._checked_at = self._length
+        span = self.settings["repeat_chars"]
+        self._tail = (self._tail + "".join(self._recent))[-span:]
+        self._recent.clear()
+        tail = self._tail
+        if len(tail) < span or not tail.strip():
+            return None
+        for period in range(MIN_REPEAT_PERIOD, min(MAX_REPEAT_PERIOD, span // 3) + 1):
+            if tail[period:] == tail[:-period]:
+                self.cut_at = self._repeat_start(period)
+                return f"output is repeating a {period}-character window"
+        return None
+
+    def _repeat_start(self, period: int) -> int:
+        """Return the offset just after the first copy of the repeated window.
+
+        Walks back from the tail while each character matches the one a
+        period later, i.e. to where the repetition began.
+        """
+        text = self.text
+        start = len(text) - period
+        while start > 0 and text[start - 1] == text[start - 1 + period]:
+            start -= 1
+        return start + period
+
+
+def salvage_json(text: str) -> tuple[str, Any] | None:
+    """Close a truncated JSON reply at its last complete value.
+
+    Returns (json_text, parsed) or None when no JSON object was started.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    stack: list[str] = []
+    in_string = escaped = False
+    # Candidate cut points: (end offset, closers needed at that point). Inner
+    # containers are only kept once a member is complete, so a cut never
+    # leaves an empty half-written issue behind.
+    cuts: list[tuple[int, str]] = []
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            if len(stack) == 1:
+                cuts.append((i + 1, "}"))
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            cuts.append((i + 1, "".join(reversed(stack))))
+            if not stack:
+                break
+        elif ch == ",":
+            cuts.append((i, "".join(reversed(stack))))
+
+    for end, closers in reversed(cuts):
+        candidate = text[start:end] + closers
+        try:
+            return candidate, json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def guard_settings_from_config(config: dict[str, Any]) -> GuardSettings | None:
+    """Return guard settings from providers.json, or None when disabled.
+
+    "stream_guard": true enables the defaults; an object may set enabled,
+    repeat_chars, echo_words and trailing_chars. Raises ValueError for
+    invalid settings.
+    """
+    raw = config.get("stream_guard")
+    if raw is None or raw is False:
+        return None
+    if raw is True:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("stream_guard must be an object or boolean")
+    if raw.get("enabled", True) is False:
+        return None
+    settings = GuardSettings(**DEFAULT_GUARD_SETTINGS)
+    for name in settings:
+        value = raw.get(name, settings[name])
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"stream_guard.{name} must be a positive integer")
+        settings[name] = value
+    if settings["repeat_chars"] < 3 * MIN_REPEAT_PERIOD:
+        raise ValueError(f"stream_guard.repeat_chars must be at least {3 * MIN_REPEAT_PERIOD}")
+    if settings["echo_words"] < ECHO_SHINGLE_WORDS:
+        raise ValueError(f"stream_guard.echo_words must be at least {ECHO_SHINGLE_WORDS}")
+    return settings
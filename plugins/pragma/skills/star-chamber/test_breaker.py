@@ -0,0 +1,80 @@
+"""Tests for breaker.py."""
+
+import pytest
+
+from breaker import (
+    DEFAULT_BREAKER_COOLDOWN_SECONDS,
+    DEFAULT_BREAKER_FAILURE_THRESHOLD,
+    CircuitBreaker,
+    breaker_settings_from_config,
+)
+
+
+class TestCircuitBreaker:
+    """Verify the persisted per-provider circuit breaker."""
+
+    CONFIG = {"provider": "gemini", "model": "gemini-2.5-flash"}
+    FAILURE = {"success": False, "error": "Request timed out after 120.0s"}
+
+    def _breaker(self, tmp_path, clock):
+        return CircuitBreaker(tmp_path / "breaker.json", failure_threshold=2, cooldown_seconds=60, clock=clock)
+
+    def test_opens_after_consecutive_failures(self, tmp_path, fake_clock):
+        """The circuit should open once the failure threshold is reached."""
+        breaker = self._breaker(tmp_path, fake_clock)
+        breaker.record(self.CONFIG, self.FAILURE)
+        assert breaker.acquire(self.CONFIG) is None
+        breaker.record(self.CONFIG, self.FAILURE)
+        reason = breaker.acquire(self.CONFIG)
+        assert "Circuit open for gemini/gemini-2.5-flash" in reason
+        assert "timed out" in reason
+
+    def test_success_resets_failure_count(self, tmp_path, fake_clock):
+        """A success between failures should keep the circuit closed."""
+        breaker = self._breaker(tmp_path, fake_clock)
+        breaker.record(self.CONFIG, self.FAILURE)
+        breaker.record(self.CONFIG, {"success": True})
+        breaker.record(self.CONFIG, self.FAILURE)
+        assert breaker.acquire(self.CONFIG) is None
+
+    def test_half_open_allows_single_probe(self, tmp_path, fake_clock):
+        """After the cool-down exactly one probe should be let through."""
+        breaker = self._breaker(tmp_path, fake_clock)
+        breaker.record(self.CONFIG, self.FAILURE)
+        breaker.record(self.CONFIG, self.FAILURE)
+        fake_clock.now += 61
+        assert breaker.acquire(self.CONFIG) is None
+        # A second session sharing the state file must not probe concurrently.
+        other = self._breaker(tmp_path, fake_clock)
+        assert "probing" in other.acquire(self.CONFIG)
+        # A failed probe re-opens the circuit immediately.
+        breaker.record(self.CONFIG, self.FAILURE)
+        assert "Circuit open" in other.acquire(self.CONFIG)
+        assert other.snapshot()["gemini/gemini-2.5-flash"]["state"] == "open"
+
+    def test_closed_circuit_does_not_touch_state_file(self, tmp_path, fake_clock):
+        """Checking a closed circuit is read-only."""
+        breaker = self._breaker(tmp_path, fake_clock)
+        assert breaker.acquire(self.CONFIG) is None
+        assert not (tmp_path / "breaker.json").exists()
+
+
+class TestBreakerSettings:
+    """Verify circuit_breaker config parsing."""
+
+    def test_defaults_and_overrides(self):
+        """Missing fields take the defaults; false disables the breaker."""
+        assert breaker_settings_from_config({}) == {
+            "failure_threshold": DEFAULT_BREAKER_FAILURE_THRESHOLD,
+            "cooldown_seconds": DEFAULT_BREAKER_COOLDOWN_SECONDS,
+        }
+        assert breaker_settings_from_config({"circuit_breaker": {"cooldown_seconds": 10}})["cooldown_seconds"] == 10.0
+        assert breaker_settings_from_config({"circuit_breaker": False}) is None
+
+    @pytest.mark.parametrize(
+        "raw", [True, {"failure_threshold": 0}, {"cooldown_seconds": -1}, {"failure_threshold": 1.5}],
+    )
+    def test_invalid(self, raw):
+        """Invalid settings raise ValueError."""
+        with pytest.raises(ValueError):
+            breaker_settings_from_config({"circuit_breaker": raw})
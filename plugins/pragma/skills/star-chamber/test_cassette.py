@@ -0,0 +1,59 @@
+"""Tests for cassette.py."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from cassette import Cassette
+
+
+CONFIG = {"provider": "gemini", "model": "gemini-2.5-flash", "api_key": "secret-key-value"}
+
+
+class TestCassette:
+    """Verify recorded results are served back by fingerprint."""
+
+    def test_record_then_replay(self, tmp_path):
+        """A recorded result replays with its content and usage, but no key."""
+        usage = {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17}
+        Cassette(tmp_path, Cassette.RECORD).record(
+            CONFIG, "abc", {"success": True, "content": "{}", "usage": usage, "elapsed_seconds": 1.0},
+        )
+        assert "secret-key-value" not in (tmp_path / "abc.json").read_text()
+
+        replayed = asyncio.run(Cassette(tmp_path, Cassette.REPLAY, latency_scale=0).replay(CONFIG, "abc"))
+        assert replayed == {
+            "provider": "gemini",
+            "model": "gemini-2.5-flash",
+            "success": True,
+            "content": "{}",
+            "elapsed_seconds": 1.0,
+            "replayed": True,
+            "usage": usage,
+        }
+
+    def test_recorded_failure_and_missing_fingerprint(self, tmp_path):
+        """Failed recordings replay as failures; unknown fingerprints fail too."""
+        Cassette(tmp_path, Cassette.RECORD).record(CONFIG, "abc", {"success": False, "error": "429"})
+        player = Cassette(tmp_path, Cassette.REPLAY, latency_scale=0)
+        assert asyncio.run(player.replay(CONFIG, "abc"))["error"] == "429"
+        missing = asyncio.run(player.replay(CONFIG, "def"))
+        assert not missing["success"]
+        assert "No recorded response" in missing["error"]
+
+    def test_replay_scales_recorded_latency(self, tmp_path):
+        """Replay should sleep for the recorded latency times the scale."""
+        Cassette(tmp_path, Cassette.RECORD).record(
+            CONFIG, "abc", {"success": True, "content": "{}", "elapsed_seconds": 4.0},
+        )
+        player = Cassette(tmp_path, Cassette.REPLAY, latency_scale=0.5)
+        with patch("cassette.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            asyncio.run(player.replay(CONFIG, "abc"))
+        mock_sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.parametrize("mode, scale", [("rewind", 1.0), (Cassette.REPLAY, -1.0)])
+    def test_invalid_arguments(self, tmp_path, mode, scale):
+        """Unknown modes and negative latency scales are rejected."""
+        with pytest.raises(ValueError):
+            Cassette(tmp_path, mode, latency_scale=scale)
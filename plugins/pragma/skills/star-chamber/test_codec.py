@@ -0,0 +1,61 @@
+"""Tests for codec.py."""
+
+import asyncio
+import importlib
+import json
+
+import pytest
+
+import codec
+
+
+DOCUMENT = {"reviews": [{"provider": "openai", "content": "naïve ✓", "usage": {"total_tokens": 12}}], "ok": True}
+
+
+class TestJsonCodec:
+    """Verify the JSON fast path behaves like the standard library."""
+
+    def test_round_trip(self):
+        """dumps/loads round-trip, indented or not."""
+        assert codec.loads(codec.dumps(DOCUMENT)) == DOCUMENT
+        indented = codec.dumps(DOCUMENT, indent=True)
+        assert json.loads(indented) == DOCUMENT
+        assert indented.startswith('{\n  "reviews"')
+
+    def test_accepts_what_stdlib_accepts(self):
+        """Documents the fast decoders reject still parse (e.g. NaN)."""
+        assert codec.loads(b'{"x": 1}') == {"x": 1}
+        assert codec.loads('{"x": NaN}')["x"] != codec.loads('{"x": NaN}')["x"]
+
+    def test_decode_errors_are_json_errors(self):
+        """Invalid input raises json.JSONDecodeError for every backend."""
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads('{"unterminated": ')
+
+    def test_unsupported_values_fall_back(self):
+        """Values fast encoders reject are serialized by the stdlib."""
+        assert json.loads(codec.dumps({1: "a", "big": 2**70})) == {"1": "a", "big": 2**70}
+
+    def test_disabled_by_env(self, monkeypatch):
+        """STAR_CHAMBER_ACCEL=0 forces the standard library."""
+        monkeypatch.setenv(codec.ACCEL_ENV, "0")
+        try:
+            plain = importlib.reload(codec)
+            assert plain.json_backend() == "json"
+            assert plain.loop_backend() == "asyncio"
+            assert plain.loads(plain.dumps(DOCUMENT, indent=True)) == DOCUMENT
+        finally:
+            monkeypatch.delenv(codec.ACCEL_ENV)
+            importlib.reload(codec)
+
+
+class TestRun:
+    """Verify the event loop runner."""
+
+    def test_runs_coroutine(self):
+        """run() returns the coroutine's result on whichever loop is installed."""
+        async def answer():
+            await asyncio.sleep(0)
+            return 42
+
+        assert codec.run(answer()) == 42
@@ -0,0 +1,152 @@
+"""Tests for compaction.py."""
+
+import pytest
+
+from compaction import (
+    DEFAULT_DROP_PATTERNS,
+    compact_prompt,
+    compaction_from_config,
+)
+
+
+RULE = "Always use type hints for every public function and prefer dataclasses over dicts for structured data.\n"
+
+SOURCE = '''# Copyright 2024 Acme Corp.
+# Licensed under the Apache License, Version 2.0.
+# You may not use this file except in compliance with the License.
+"""Auth module.
+
+Handles login.
+"""
+import os
+
+
+def login():
+    # Read the password from the environment.
+    return os.environ["X"]
+'''
+
+PROMPT = f"""You are a reviewer.
+
+## Project Context
+# universal.md
+{RULE}
+# python.md
+{RULE}
+## Code to Review
+
+### app/auth.py
+{SOURCE}
+### uv.lock
+version = 1
+[[package]]
+name = "any-llm-sdk"
+
+## Review Focus
+1. Correctness"""
+
+
+def _settings(strip_comments=False):
+    return {"strip_comments": strip_comments, "drop_patterns": list(DEFAULT_DROP_PATTERNS)}
+
+
+def _file_body(prompt, path):
+    """Return the lines of a file section in a compacted prompt."""
+    body = prompt.split(f"### {path}\n", 1)[1]
+    return body.split("\n### ", 1)[0].split("\n## ", 1)[0].splitlines()
+
+
+class TestCompactPrompt:
+    """Verify each compaction pass and its report."""
+
+    def test_dedupes_repeated_rule_paragraphs(self):
+        """A rule repeated under another heading should appear once."""
+        compacted, report = compact_prompt(PROMPT, _settings())
+        assert compacted.count(RULE.strip()) == 1
+        assert "# python.md" in compacted
+        assert report["duplicate_paragraphs"] == 1
+
+    def test_drops_low_value_files(self):
+        """Lockfiles should be replaced by a marker under their heading."""
+        compacted, report = compact_prompt(PROMPT, _settings())
+        assert "any-llm-sdk" not in compacted
+        assert "### uv.lock\n[omitted: low-value file]" in compacted
+        assert report["dropped_files"] == ["uv.lock"]
+
+    def test_collapses_license_header_keeping_line_numbers(self):
+        """License headers collapse to one marker line; line count is unchanged."""
+        compacted, report = compact_prompt(PROMPT, _settings())
+        body = _file_body(compacted, "app/auth.py")
+        assert body[0] == "# [license header omitted]"
+        assert "Apache" not in compacted
+        assert body.index("import os") == SOURCE.splitlines().index("import os")
+        assert report["license_headers"] == 1
+
+    def test_strip_comments_keeps_line_numbers(self):
+        """Comments and docstrings are blanked only when requested."""
+        kept, _ = compact_prompt(PROMPT, _settings())
+        assert "Read the password" in kept
+        assert "Handles login." in kept
+
+        stripped, report = compact_prompt(PROMPT, _settings(strip_comments=True))
+        body = _file_body(stripped, "app/auth.py")
+        assert "Read the password" not in stripped
+        assert '"""[docstring omitted]"""' in body
+        assert body.index('    return os.environ["X"]') == SOURCE.splitlines().index('    return os.environ["X"]')
+        assert report["comment_lines"] > 0
+
+    def test_strip_comments_leaves_code_as_written(self):
+        """Only tokenizer comments are blanked; "#" lines in strings and trailing spaces are kept."""
+        source = 'QUERY = """\n# not a comment\n"""\n# a comment\nx = 1  \n'
+        script = "# keep: no tokenizer for shell\necho hi\n"
+        prompt = f"## Code to Review\n### q.py\n{source}\n### run.sh\n{script}"
+        compacted, report = compact_prompt(prompt, _settings(strip_comments=True))
+        assert _file_body(compacted, "q.py") == ['QUERY = """', "# not a comment", '"""', "", "x = 1  "]
+        assert compacted.endswith(f"### run.sh\n{script}")
+        assert report["comment_lines"] == 1
+
+    def test_reports_token_savings(self):
+        """The report should show fewer tokens after compaction."""
+        compacted, report = compact_prompt(PROMPT, _settings())
+        assert report["tokens_after"] < report["tokens_before"]
+        assert report["tokens_saved"] == report["tokens_before"] - report["tokens_after"]
+        assert compacted.endswith("1. Correctness")
+
+    def test_headings_inside_files_keep_the_file_intact(self):
+        """A "## " line inside a file does not end it, and dotless file names are files."""
+        source = f"## Helpers\n{RULE}\n\n\n\ndef a():\n    pass\n\n\n\ndef b():\n    pass\n"
+        makefile = f"all:\n\n\n\n\techo {RULE}"
+        prompt = (
+            f"## Project Context\n{RULE}\n## Code to Review\n\n### lib.py\n{source}\n"
+            f"### Makefile\n{makefile}\n## Review Focus\n1."
+        )
+        compacted, report = compact_prompt(prompt, _settings())
+        assert _file_body(compacted, "lib.py") == source.splitlines()
+        assert compacted.split("### Makefile\n", 1)[1].startswith(makefile)
+        assert report["duplicate_paragraphs"] == 0
+
+    def test_prompt_without_files_is_only_deduped(self):
+        """Prose-only prompts (design questions) pass through except duplicates."""
+        prompt = "## Design Question\nShould we use CRUD?"
+        compacted, report = compact_prompt(prompt, _settings())
+        assert compacted == prompt
+        assert report["tokens_saved"] == 0
+
+
+class TestCompactionConfig:
+    """Verify compaction settings from providers.json."""
+
+    def test_disabled_by_default(self):
+        """Compaction is opt-in."""
+        assert compaction_from_config({}) is None
+        assert compaction_from_config({"compaction": {"enabled": False}}) is None
+
+    def test_custom_patterns(self):
+        """drop_patterns replaces the default list."""
+        settings = compaction_from_config({"compaction": {"drop_patterns": ["*.snap"], "strip_comments": True}})
+        assert settings == {"strip_comments": True, "drop_patterns": ["*.snap"]}
+
+    def test_invalid_settings_raise(self):
+        """Bad settings should raise ValueError."""
+        with pytest.raises(ValueError):
+            compaction_from_config({"compaction": {"drop_patterns": "*.lock"}})
@@ -0,0 +1,197 @@
+"""Tests for context_slicer.py."""
+
+import os
+import subprocess
+import textwrap
+
+import pytest
+
+from context_slicer import SymbolIndex, changed_files, changed_lines, parse_source, slice_context
+
+
+MODELS = textwrap.dedent('''\
+    class Invoice:
+        """An invoice."""
+
+        total: int
+
+
+    class Unrelated:
+        pass
+''')
+
+BILLING = textwrap.dedent('''\
+    from models import Invoice
+
+
+    def tax(amount):
+        return amount // 10
+
+
+    def charge(invoice: Invoice) -> int:
+        amount = invoice.total
+        return amount + tax(amount)
+
+
+    def checkout(invoice):
+        return charge(invoice)
+
+
+    def unrelated():
+        return 1
+''')
+
+GO = textwrap.dedent('''\
+    package billing
+
+    // Invoice is billed. func fake() {
+    type Invoice struct {
+    \tTotal int // "}"
+    }
+
+    type ID int
+
+    func (i *Invoice) Charge() int {
+    \ts := "{"
+    \treturn tax(i.Total) + len(s)
+    }
+
+    func tax(n int) int {
+    \treturn n / 10
+    }
+''')
+
+TS = textwrap.dedent('''\
+    export interface User { id: string }
+    export type Mode = "a" | "b";
+    export class Repo {
+      async find(id: string): Promise<User> {
+        if (id) {
+          return load(id);
+        }
+        return load("x");
+      }
+    }
+    export const load = async (id: string): Promise<User> => {
+      return { id };
+    };
+''')
+
+
+def _names(symbols):
+    return [(s["name"], s["kind"], s["start"], s["end"]) for s in symbols]
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A small git repository of billing code."""
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "models.py").write_text(MODELS)
+    (root / "billing.py").write_text(BILLING)
+    env = {**os.environ, "GIT_AUTHOR_NAME": "T", "GIT_AUTHOR_EMAIL": "t@e", "GIT_COMMITTER_NAME": "T",
+           "GIT_COMMITTER_EMAIL": "t@e"}
+    for args in (["init", "-q"], ["add", "."], ["commit", "-qm", "initial"]):
+        subprocess.run(["git", *args], cwd=root, check=True, env=env, capture_output=True)
+    return root
+
+
+class TestParsers:
+    """Verify symbol extraction per language."""
+
+    def test_python(self):
+        """Functions, methods and classes with decorators and nesting."""
+        source = "class A:\n    @property\n    def b(self):\n        return helper(B())\n"
+        symbols = parse_source(source, "python")
+        assert _names(symbols) == [("A", "class", 1, 4), ("A.b", "method", 2, 4)]
+        assert symbols[1]["calls"] == ["B", "helper"]
+        assert parse_source("def broken(:\n", "python") == []
+
+    def test_go_ignores_comments_and_strings(self):
+        """Braces and declarations inside comments and strings do not confuse the parser."""
+        symbols = parse_source(GO, "go")
+        assert _names(symbols) == [
+            ("Invoice", "type", 4, 6),
+            ("ID", "type", 8, 8),
+            ("Invoice.Charge", "method", 10, 13),
+            ("tax", "function", 15, 17),
+        ]
+        assert symbols[2]["calls"] == ["tax"]
+
+    def test_typescript(self):
+        """Interfaces, aliases, classes, methods and arrow functions."""
+        symbols = parse_source(TS, "typescript")
+        assert _names(symbols) == [
+            ("User", "type", 1, 1),
+            ("Mode", "type", 2, 2),
+            ("Repo", "class", 3, 10),
+            ("Repo.find", "method", 4, 9),
+            ("load", "function", 11, 13),
+        ]
+        assert symbols[2]["calls"] == ["load"]
+        assert symbols[4]["calls"] == []
+
+
+class TestSymbolIndex:
+    """Verify the cached index updates incrementally."""
+
+    def test_reparses_only_changed_files(self, repo, tmp_path):
+        """A second refresh reuses unchanged files and notices edits and deletions."""
+        cache = tmp_path / "index.json"
+        assert SymbolIndex(repo, cache).refresh().stats == {"files": 2, "parsed": 2, "reused": 0, "removed": 0}
+        assert SymbolIndex(repo, cache).refresh().stats == {"files": 2, "parsed": 0, "reused": 2, "removed": 0}
+
+        (repo / "billing.py").write_text(BILLING + "\n\ndef refund():\n    pass\n")
+        (repo / "models.py").unlink()
+        index = SymbolIndex(repo, cache).refresh()
+        assert index.stats == {"files": 1, "parsed": 1, "reused": 0, "removed": 1}
+        assert "refund" in [s["name"] for s in index.symbols("billing.py")]
+
+
+class TestSliceContext:
+    """Verify slices hold the changed code and its context within budget."""
+
+    def test_changed_function_with_types_callees_and_callers(self, repo):
+        """Changing charge() brings in Invoice, tax() and checkout(), not unrelated code."""
+        source = (repo / "billing.py").read_text().replace("amount + tax(amount)", "amount + tax(amount) + 1")
+        (repo / "billing.py").write_text(source)
+        lines = changed_lines(repo, "billing.py")
+        assert lines == {10}
+
+        result = slice_context(SymbolIndex(repo).refresh(), {"billing.py": lines}, budget=10_000)
+        roles = {(s["role"], tuple(s["symbols"])) for s in result["included"]}
+        assert roles == {
+            ("changed", ("charge",)),
+            ("type", ("Invoice",)),
+            ("callee", ("tax",)),
+            ("caller", ("checkout",)),
+        }
+        assert "# [lines 8-10] changed: charge" in result["text"]
+        assert "### models.py\n# [lines 1-4] type: Invoice\nclass Invoice:" in result["text"]
+        assert "unrelated" not in result["text"]
+        assert "Unrelated" not in result["text"]
+
+    def test_changed_files_since_base(self, repo):
+        """Edited and untracked files count as changed; committed, unedited ones do not."""
+        assert changed_files(repo) == []
+        (repo / "billing.py").write_text(BILLING + "\n")
+        (repo / "new.py").write_text("x = 1\n")
+        assert changed_files(repo) == ["billing.py", "new.py"]
+
+    def test_budget_keeps_changed_code_first(self, repo):
+        """Context that does not fit is omitted, lowest priority first."""
+        index = SymbolIndex(repo).refresh()
+        result = slice_context(index, {"billing.py": {9}}, budget=40)
+        assert [s["role"] for s in result["included"]] == ["changed", "type"]
+        assert {s["role"] for s in result["omitted"]} == {"callee", "caller"}
+
+        starved = slice_context(index, {"billing.py": {9}}, budget=10)
+        assert starved["included"] == []
+        assert len(starved["omitted"]) == 4
+
+    def test_class_body_change_does_not_pull_in_methods(self, tmp_path):
+        """A change to a class attribute shows nearby lines, not every method."""
+        source = "class A:\n    x = 1\n\n    def f(self):\n        return 1\n\n    def g(self):\n        return 2\n"
+        (tmp_path / "a.py").write_text(source)
+        result = slice_context(SymbolIndex(tmp_path).refresh(), {"a.py": {2}}, budget=1000)
+        assert [(s["start"], s["end"]) for s in result["included"]] == [(1, 4)]
@@ -0,0 +1,154 @@
+"""Tests for evaluate.py."""
+
+import json
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from evaluate import (
+    DEFAULT_CORPUS,
+    evaluate,
+    load_corpus,
+    main,
+    match_issues,
+    pareto_front,
+    recommend,
+    simulated_results,
+)
+
+
+DEFECTS = [
+    {"id": "count-floor", "file": "samples/pagination.py", "lines": [12, 12], "severity": "medium"},
+    {"id": "mutable-default", "file": "samples/pagination.py", "lines": [15, 18], "severity": "medium"},
+]
+
+
+pytestmark = pytest.mark.usefixtures("isolated_state_dir")
+
+
+def _council(providers, recall, precision, latency, cost):
+    return {
+        "providers": providers,
+        "recall": recall,
+        "precision": precision,
+        "mean_latency_seconds": latency,
+        "cost_usd": cost,
+    }
+
+
+class TestMatchIssues:
+    """Verify reported issues are matched to labelled defects."""
+
+    def test_nearest_defect_wins(self):
+        """An issue inside one defect's range is not credited to a neighbour."""
+        found, true_positives = match_issues([{"location": "samples/pagination.py:15"}], DEFECTS)
+        assert found == ["mutable-default"]
+        assert true_positives == 1
+
+    def test_tolerance_prefixes_and_false_positives(self):
+        """Nearby lines and path prefixes match; other files and bad locations do not."""
+        issues = [
+            {"location": "`src/samples/pagination.py:10`"},
+            {"location": "samples/pagination.py:40"},
+            {"location": "samples/other.py:12"},
+            {"location": "somewhere"},
+            "not an issue",
+        ]
+        found, true_positives = match_issues(issues, DEFECTS)
+        assert found == ["count-floor"]
+        assert true_positives == 1
+
+    def test_duplicates_are_not_false_positives(self):
+        """A second report of a found defect is still a true positive."""
+        issues = [{"location": "samples/pagination.py:12"}] * 2
+        assert match_issues(issues, DEFECTS) == (["count-floor"], 2)
+
+
+class TestParetoFront:
+    """Verify council selection."""
+
+    def test_dominated_councils_dropped(self):
+        """A council worse on every axis is not on the front."""
+        cheap = _council(["flash"], 0.7, 0.9, 9.0, 0.01)
+        strong = _council(["opus"], 1.0, 0.9, 35.0, 0.17)
+        worse = _council(["gpt"], 0.9, 0.8, 45.0, 0.2)
+        assert pareto_front([cheap, strong, worse]) == [cheap, strong]
+
+    def test_recommend_cheapest_meeting_recall(self):
+        """The cheapest council over the bar wins; None when nothing qualifies."""
+        cheap = _council(["flash"], 0.7, 0.9, 9.0, 0.01)
+        pair = _council(["flash", "gpt"], 0.9, 0.85, 45.0, 0.12)
+        strong = _council(["opus"], 1.0, 0.9, 35.0, 0.17)
+        assert recommend([cheap, pair, strong], 0.85) is pair
+        assert recommend([cheap, pair, strong], 0.95) is strong
+        assert recommend([cheap], 0.95) is None
+
+
+class TestBundledCorpus:
+    """Verify the bundled corpus and simulated responses score end to end."""
+
+    def test_corpus_loads(self):
+        """Every case's files exist and defects are well formed."""
+        corpus = load_corpus(DEFAULT_CORPUS)
+        assert sum(len(c["defects"]) for c in corpus["cases"]) > 0
+
+    def test_simulated_report(self):
+        """The report scores each model and every council up to three models."""
+        corpus = load_corpus(DEFAULT_CORPUS)
+        results = {c["id"]: simulated_results(DEFAULT_CORPUS, c) for c in corpus["cases"]}
+        report = evaluate(results, corpus, min_recall=0.8)
+
+        assert len(report["models"]) == 3
+        assert len(report["councils"]) == 7
+        assert report["pareto_front"]
+        for score in report["models"].values():
+            assert 0 < score["recall"] <= 1
+            assert score["cost_usd"] > 0
+        assert report["recommendation"]["recall"] >= 0.8
+
+
+class TestLiveAndReplay:
+    """Verify --live only runs when asked and its recording replays."""
+
+    def test_record_then_replay(self, tmp_path, monkeypatch, capsys):
+        """A live run recorded to a cassette scores the same when replayed."""
+        config = tmp_path / "providers.json"
+        config.write_text(json.dumps({"providers": [{"provider": "openai", "model": "gpt-5.2", "api_key": "k"}]}))
+        monkeypatch.setenv("STAR_CHAMBER_CONFIG", str(config))
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        issue = {
+            "severity": "high",
+            "location": "samples/auth.py:13",
+            "category": "correctness",
+            "description": "SQL injection",
+            "suggestion": "Use a parameterized query",
+        }
+        response.choices[0].message.content = json.dumps(
+            {"provider": "openai", "quality_rating": "fair", "issues": [issue], "praise": [], "summary": "ok"},
+        )
+        response.usage = None
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=response)
+        cassette = tmp_path / "cassette"
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            main(["--live", "--record", str(cassette)])
+        live = json.loads(capsys.readouterr().out)
+        calls = mock_module.acompletion.call_count
+        assert live["source"] == "live"
+        assert calls == len(load_corpus(DEFAULT_CORPUS)["cases"])
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            main(["--replay", str(cassette)])
+        replayed = json.loads(capsys.readouterr().out)
+        assert mock_module.acompletion.call_count == calls
+        assert replayed["source"] == "replay"
+        assert replayed["models"] == live["models"]
+        assert replayed["models"]["openai/gpt-5.2"]["recall"] == pytest.approx(1 / 9, abs=0.001)
+
+    def test_record_requires_live(self):
+        """--record alone is rejected so nothing is sent by accident."""
+        with pytest.raises(SystemExit):
+            main(["--record", "somewhere"])
@@ -0,0 +1,112 @@
+"""Tests for job_queue.py."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from job_queue import DEFAULT_QUEUE_SETTINGS, DONE, FAILED, QUEUED, RUNNING, JobQueue, queue_settings_from_config
+
+
+class _FakeClock:
+    """Manually advanced clock for lease tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _queue(tmp_path, clock, **settings):
+    return JobQueue(tmp_path / "queue.db", {**DEFAULT_QUEUE_SETTINGS, **settings}, clock=clock)
+
+
+class TestJobQueue:
+    """Verify leasing, retries and lease takeover."""
+
+    def test_claim_complete_and_wal(self, tmp_path):
+        """Jobs are claimed oldest first, once, and their result is stored."""
+        queue = _queue(tmp_path, _FakeClock())
+        first, second = queue.submit([{"prompt": "a"}, {"prompt": "b"}])
+
+        job = queue.claim("w1")
+        assert (job["id"], job["payload"], job["attempts"]) == (first, {"prompt": "a"}, 1)
+        assert queue.claim("w2")["id"] == second
+        assert queue.claim("w3") is None
+
+        assert queue.complete(job, "w1", {"reviews": []})
+        assert queue.counts() == {QUEUED: 0, RUNNING: 1, DONE: 1, FAILED: 0}
+        assert queue.jobs([first], include_result=True)[0]["output"] == {"reviews": []}
+        mode = sqlite3.connect(tmp_path / "queue.db").execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_expired_lease_taken_over(self, tmp_path):
+        """A dead worker's job goes to another worker, whose result wins."""
+        clock = _FakeClock()
+        queue = _queue(tmp_path, clock, lease_seconds=60)
+        queue.submit([{"prompt": "a"}])
+        stale = queue.claim("dead")
+
+        clock.now += 30
+        assert queue.claim("w2") is None
+        assert queue.renew(stale, "dead")
+        clock.now += 61
+        taken = queue.claim("w2")
+        assert (taken["attempts"], queue.jobs([taken["id"]])[0]["worker"]) == (2, "w2")
+
+        assert not queue.complete(stale, "dead", {"late": True})
+        assert queue.complete(taken, "w2", {"reviews": []})
+        assert queue.jobs([taken["id"]], include_result=True)[0]["output"] == {"reviews": []}
+
+    def test_retries_with_backoff_then_fails(self, tmp_path):
+        """Failed attempts are retried after a doubling delay until max_attempts."""
+        clock = _FakeClock()
+        queue = _queue(tmp_path, clock, max_attempts=2, retry_delay_seconds=10)
+        (job_id,) = queue.submit([{"prompt": "a"}])
+
+        assert queue.fail(queue.claim("w1"), "w1", "timeout")
+        assert queue.claim("w1") is None
+        clock.now += 10
+        job = queue.claim("w1")
+        assert job["attempts"] == 2
+        assert queue.fail(job, "w1", "timeout again")
+        status = queue.jobs([job_id])[0]
+        assert (status["state"], status["attempts"], status["error"]) == (FAILED, 2, "timeout again")
+
+    def test_permanent_failure_and_lost_attempts(self, tmp_path):
+        """retry=False fails at once; a job whose leases keep expiring ends up failed."""
+        clock = _FakeClock()
+        queue = _queue(tmp_path, clock, max_attempts=1, lease_seconds=5)
+        bad, lost = queue.submit([{"prompt": "a"}, {"prompt": "b"}])
+        assert queue.fail(queue.claim("w1"), "w1", "bad config", retry=False)
+        queue.claim("w1")
+        clock.now += 6
+        assert queue.claim("w2") is None
+        states = {j["id"]: (j["state"], j["error"]) for j in queue.jobs([bad, lost])}
+        assert states == {bad: (FAILED, "bad config"), lost: (FAILED, "lease expired (worker lost)")}
+
+    def test_concurrent_claims_are_exclusive(self, tmp_path):
+        """Workers racing on the same database never get the same job."""
+        queue = _queue(tmp_path, _FakeClock())
+        queue.submit([{"n": i} for i in range(40)])
+        claimed: list[int] = []
+
+        def work(name):
+            while (job := queue.claim(name)) is not None:
+                claimed.append(job["id"])
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(claimed) == list(range(1, 41))
+
+    def test_settings_validation(self):
+        """Bad queue settings are rejected; missing ones get defaults."""
+        assert queue_settings_from_config({}) == DEFAULT_QUEUE_SETTINGS
+        assert queue_settings_from_config({"queue": {"max_attempts": 5}})["max_attempts"] == 5
+        for bad in ({"lease_seconds": 0}, {"max_attempts": True}, {"wal": "yes"}, {"path": 3}):
+            with pytest.raises(ValueError):
+                queue_settings_from_config({"queue": bad})
@@ -3,6 +3,7 @@
 import asyncio
 import json
 import os
+import subprocess
 import sys
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -10,11 +11,51 @@ import pytest
 
 from llm_council import (
     DEFAULT_MAX_TOKENS,
+    AdaptiveTimeouts,
+    Cassette,
+    CircuitBreaker,
+    SCHEMA_CODE_REVIEW,
+    SCHEMA_DESIGN_QUESTION,
+    ConfigError,
+    Council,
+    LocalScheduler,
+    PlatformKeyError,
+    ProviderSelectionError,
+    RateLimiter,
+    ReviewStore,
+    SCHEMA_TEMPLATES,
+    TokenBudget,
     _get_review_internal,
     _resolve_platform_keys,
+    adaptive_timeouts_from_config,
+    capabilities_for,
+    cascade_from_config,
+    circuit_breaker_from_config,
+    content_hash,
+    detect_schema,
+    job_payload,
+    job_queue_from_config,
+    load_readiness_snapshot,
+    load_sdk_map,
+    local_scheduler_from_config,
+    plan_escalation,
+    preflight,
+    rate_limiter_from_config,
+    request_fingerprint,
+    restrict_prompt,
     resolve_api_keys,
     run_council,
+    run_worker,
+    sdk_import_name,
+    slice_main,
+    speculate,
+    validate_review,
+    warmup_environment,
 )
+from timeouts import DEFAULT_ADAPTIVE_TIMEOUT
+
+
+pytestmark = pytest.mark.usefixtures("isolated_state_dir")
 
 
 def _mock_acompletion():
@@ -467,3 +508,996 @@ class TestListSdksLocalProviders:
         assert "llamafile" in output["providers_local"]
         assert "llamafile" not in output["providers_missing_key"]
         assert "openai" in output["providers_missing_key"]
+        assert output["providers_circuit"]["openai/gpt-5.2"]["state"] == "closed"
+
+
+class TestCassette:
+    """Verify --record/--replay cassettes round-trip provider responses."""
+
+    def test_record_then_replay_without_sdk(self, tmp_path):
+        """Recorded responses should replay without importing any_llm."""
+        mock_acompletion = _mock_acompletion()
+        mock_acompletion.return_value.usage = MagicMock(prompt_tokens=12, completion_tokens=5, total_tokens=17)
+        mock_module = MagicMock()
+        mock_module.acompletion = mock_acompletion
+
+        config = {"provider": "openai", "model": "gpt-5.2", "api_key": "secret-key-value"}
+        recorder = Cassette(tmp_path, Cassette.RECORD)
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            recorded = asyncio.run(_get_review_internal(config, "prompt", cassette=recorder))
+
+        assert recorded["usage"] == {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17}
+        cassette_text = (tmp_path / f"{request_fingerprint(config, 'prompt')}.json").read_text()
+        assert "secret-key-value" not in cassette_text
+
+        player = Cassette(tmp_path, Cassette.REPLAY, latency_scale=0)
+        with patch.dict(sys.modules, {"any_llm": None}):
+            replayed = asyncio.run(_get_review_internal(config, "prompt", cassette=player))
+
+        assert replayed["success"]
+        assert replayed["replayed"]
+        assert replayed["content"] == '{"provider": "test"}'
+        assert replayed["parsed_json"] == {"provider": "test"}
+        assert replayed["usage"] == recorded["usage"]
+
+    def test_fingerprint_ignores_api_key(self):
+        """Keys must not change (or leak into) the request fingerprint."""
+        a = {"provider": "openai", "model": "gpt-5.2", "api_key": "k1"}
+        b = {"provider": "openai", "model": "gpt-5.2", "api_key": "k2"}
+        assert request_fingerprint(a, "p") == request_fingerprint(b, "p")
+        assert request_fingerprint(a, "p") != request_fingerprint(a, "other")
+
+    def test_replay_missing_fingerprint_fails_review(self, tmp_path):
+        """A request with no recording should fail that review, not the run."""
+        player = Cassette(tmp_path, Cassette.REPLAY, latency_scale=0)
+        providers = [{"provider": "gemini", "model": "gemini-2.5-flash"}]
+        result = asyncio.run(run_council("prompt", providers, cassette=player))
+        review = result["reviews"][0]
+        assert not review["success"]
+        assert "No recorded response" in review["error"]
+
+
+
+class TestCircuitBreaker:
+    """Verify the persisted per-provider circuit breaker."""
+
+    CONFIG = {"provider": "gemini", "model": "gemini-2.5-flash"}
+    FAILURE = {"success": False, "error": "Request timed out after 120.0s"}
+
+    def _breaker(self, tmp_path, clock):
+        return CircuitBreaker(tmp_path / "breaker.json", failure_threshold=2, cooldown_seconds=60, clock=clock)
+
+    def test_run_council_reports_skipped_provider(self, tmp_path, fake_clock):
+        """Open-circuit providers should be skipped without calling the SDK."""
+        breaker = self._breaker(tmp_path, fake_clock)
+        breaker.record(self.CONFIG, self.FAILURE)
+        breaker.record(self.CONFIG, self.FAILURE)
+
+        mock_acompletion = _mock_acompletion()
+        mock_module = MagicMock()
+        mock_module.acompletion = mock_acompletion
+        providers = [self.CONFIG, {"provider": "openai", "model": "gpt-5.2", "api_key": "k"}]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council("prompt", providers, breaker=breaker))
+
+        by_provider = {r["provider"]: r for r in result["reviews"]}
+        assert by_provider["gemini"]["skipped"]
+        assert not by_provider["gemini"]["success"]
+        assert by_provider["openai"]["success"]
+        assert [c.kwargs["provider"] for c in mock_acompletion.call_args_list] == ["openai"]
+
+    def test_config_can_disable_or_tune_breaker(self):
+        """providers.json should be able to disable or tune the breaker."""
+        assert circuit_breaker_from_config({"circuit_breaker": False}) is None
+        breaker = circuit_breaker_from_config({"circuit_breaker": {"failure_threshold": 5}})
+        assert breaker.failure_threshold == 5
+        with pytest.raises(ConfigError):
+            circuit_breaker_from_config({"circuit_breaker": {"failure_threshold": 0}})
+
+
+class TestWarmup:
+    """Verify the warmup subcommand's SDK imports and readiness snapshot."""
+
+    SDK_MAP = {"anthropic": "anthropic", "gemini": "google-genai", "platform": "any-llm-platform-client"}
+
+    def _config(self, tmp_path):
+        config_file = tmp_path / "providers.json"
+        config_file.write_text(json.dumps({
+            "providers": [
+                {"provider": "anthropic", "model": "claude-opus-4-6"},
+                {"provider": "gemini", "model": "gemini-2.5-flash"},
+            ],
+        }))
+        return config_file
+
+    def test_sdk_import_names(self):
+        """Package names from sdk_map.json should map to importable modules."""
+        assert sdk_import_name("google-genai") == "google.genai"
+        assert sdk_import_name("anthropic[vertex]") == "anthropic"
+        assert sdk_import_name("any-llm-platform-client") == "any_llm_platform_client"
+
+    def test_records_import_results_and_snapshot(self, tmp_path):
+        """Each SDK should be imported once and failures recorded, not raised."""
+        config_file = self._config(tmp_path)
+        providers = json.loads(config_file.read_text())["providers"]
+
+        def fake_import(name):
+            if name == "google.genai":
+                raise ImportError("No module named 'google.genai'")
+            return MagicMock()
+
+        with (
+            patch("llm_council.load_sdk_map", return_value=dict(self.SDK_MAP)),
+            patch("llm_council.importlib.import_module", side_effect=fake_import) as mock_import,
+        ):
+            snapshot = warmup_environment(str(config_file), providers, None)
+
+        assert [c.args[0] for c in mock_import.call_args_list] == ["any_llm", "anthropic", "google.genai"]
+        assert snapshot["imports"]["anthropic"]["ok"]
+        assert "import_seconds" in snapshot["imports"]["anthropic"]
+        assert not snapshot["imports"]["google-genai"]["ok"]
+        assert not snapshot["ready"]
+        assert load_readiness_snapshot(str(config_file), providers) == snapshot
+
+    def test_snapshot_invalidated_by_config_change(self, tmp_path):
+        """Touching providers.json should make the snapshot stale."""
+        config_file = self._config(tmp_path)
+        providers = json.loads(config_file.read_text())["providers"]
+        with (
+            patch("llm_council.load_sdk_map", return_value=dict(self.SDK_MAP)),
+            patch("llm_council.importlib.import_module"),
+        ):
+            warmup_environment(str(config_file), providers, None)
+
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert load_readiness_snapshot(str(config_file), providers) is None
+
+    def test_list_sdks_uses_current_snapshot(self, tmp_path):
+        """--list-sdks should answer from a current snapshot without building a council or reading sdk_map."""
+        from llm_council import main
+        import io
+
+        config_file = self._config(tmp_path)
+        providers = json.loads(config_file.read_text())["providers"]
+        with (
+            patch("llm_council.load_sdk_map", return_value=dict(self.SDK_MAP)),
+            patch("llm_council.importlib.import_module"),
+        ):
+            warmup_environment(str(config_file), providers, None)
+
+        with (
+            patch("llm_council.load_sdk_map", side_effect=AssertionError("sdk_map probed")),
+            patch("llm_council.load_capability_registry", side_effect=AssertionError("registry probed")),
+            patch("llm_council.Council", side_effect=AssertionError("council built")),
+            patch("sys.argv", ["llm_council.py", "--list-sdks"]),
+            pytest.raises(SystemExit),
+            patch("sys.stdout", new_callable=io.StringIO) as mock_stdout,
+            patch.dict(os.environ, {"STAR_CHAMBER_CONFIG": str(config_file)}),
+        ):
+            main()
+
+        output = json.loads(mock_stdout.getvalue())
+        assert output["required_sdks"] == ["anthropic", "google-genai"]
+        assert output["readiness_snapshot"]["ready"]
+        assert set(output["providers_capabilities"]) == {f"{p['provider']}/{p['model']}" for p in providers}
+
+
+class TestCouncil:
+    """Verify the embeddable Council API."""
+
+    CONFIG = {
+        "providers": [
+            {"provider": "openai", "model": "gpt-5.2", "api_key": "${OPENAI_API_KEY}"},
+            {"provider": "gemini", "model": "gemini-2.5-flash", "api_key": "${GEMINI_API_KEY}"},
+        ],
+        "timeout_seconds": 30,
+    }
+
+    def test_stream_yields_each_review_and_reuses_keys(self):
+        """stream() should yield every review and resolve keys only once."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        council = Council(self.CONFIG)
+        assert council.timeout == 30.0
+
+        async def collect():
+            first = [r async for r in council.stream("prompt", ["a.py"])]
+            second = [r async for r in council.stream("prompt")]
+            return first, second
+
+        with (
+            patch.dict(sys.modules, {"any_llm": mock_module}),
+            patch.dict(os.environ, {"OPENAI_API_KEY": "k1", "GEMINI_API_KEY": "k2"}),
+            patch("llm_council.resolve_api_keys", wraps=resolve_api_keys) as mock_resolve,
+        ):
+            first, second = asyncio.run(collect())
+
+        assert sorted(r["provider"] for r in first) == ["gemini", "openai"]
+        assert len(second) == 2
+        assert mock_resolve.await_count == 1
+        prompts = [c.kwargs["messages"][0]["content"] for c in mock_module.acompletion.call_args_list]
+        assert "Files to review:\n- a.py" in prompts[0]
+
+    def test_review_matches_cli_output_shape(self):
+        """review() should return reviews, files and providers like the CLI."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        council = Council(self.CONFIG, providers=["gemini"])
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            output = asyncio.run(council.review("prompt", ["a.py"]))
+        assert output["providers_used"] == ["gemini"]
+        assert output["files_reviewed"] == ["a.py"]
+        assert output["reviews"][0]["success"]
+
+    def test_review_reports_compaction(self):
+        """With compaction enabled the compacted prompt is sent and reported."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        council = Council({**self.CONFIG, "compaction": True}, providers=["gemini"])
+        prompt = "## Code to Review\n\n### uv.lock\nversion = 1\n"
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            output = asyncio.run(council.review(prompt, ["uv.lock"]))
+        assert output["compaction"]["dropped_files"] == ["uv.lock"]
+        sent = mock_module.acompletion.call_args.kwargs["messages"][0]["content"]
+        assert "version = 1" not in sent
+
+    def test_errors_are_raised_not_exited(self, tmp_path):
+        """Config problems should raise typed exceptions instead of sys.exit."""
+        with pytest.raises(ConfigError):
+            Council.from_path(tmp_path / "missing.json")
+        with pytest.raises(ProviderSelectionError):
+            Council(self.CONFIG, providers=["cohere"])
+        with pytest.raises(ConfigError):
+            Council({**self.CONFIG, "timeout_seconds": -1})
+        with patch.dict(os.environ, {"ANY_LLM_KEY": ""}):
+            with pytest.raises(PlatformKeyError):
+                Council({**self.CONFIG, "platform": "any-llm"})
+
+    def test_invalid_sdk_map_raises_config_error(self, tmp_path):
+        """load_sdk_map should raise ConfigError rather than exiting."""
+        with patch("llm_council.Path.exists", return_value=False):
+            with pytest.raises(ConfigError) as exc_info:
+                load_sdk_map()
+        assert "hint" in exc_info.value.to_dict()
+
+    def test_cli_prints_error_json_and_exits(self, tmp_path):
+        """The CLI should still report errors as JSON with exit code 1."""
+        from llm_council import main
+        import io
+
+        with (
+            patch("sys.argv", ["llm_council.py", "--list-sdks"]),
+            pytest.raises(SystemExit) as exc_info,
+            patch("sys.stdout", new_callable=io.StringIO) as mock_stdout,
+            patch.dict(os.environ, {"STAR_CHAMBER_CONFIG": str(tmp_path / "missing.json")}),
+        ):
+            main()
+
+        assert exc_info.value.code == 1
+        assert json.loads(mock_stdout.getvalue())["error"].startswith("Config file not found")
+
+
+def _response(content):
+    """Build a mock acompletion response with the given content."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+
+VALID_CODE_REVIEW = {
+    "provider": "openai",
+    "quality_rating": "good",
+    "issues": [
+        {
+            "severity": "high",
+            "location": "app.py:10",
+            "category": "correctness",
+            "description": "Off by one",
+            "suggestion": "Use <=",
+        },
+    ],
+    "praise": ["Clear names"],
+    "summary": "Mostly fine.",
+}
+
+
+class TestSchemaValidation:
+    """Verify review schema validation and targeted repair re-asks."""
+
+    def test_valid_reviews_pass(self):
+        """Reviews matching the PROTOCOL.md schemas should have no errors."""
+        assert validate_review(VALID_CODE_REVIEW, SCHEMA_CODE_REVIEW) == []
+        design = {
+            "provider": "gemini",
+            "recommendation": "CRUD",
+            "approaches": [
+                {"name": "CRUD", "pros": ["simple"], "cons": [], "risk_level": "low", "fit_rating": "good"},
+            ],
+            "summary": "Keep it simple.",
+        }
+        assert validate_review(design, SCHEMA_DESIGN_QUESTION) == []
+
+    def test_reports_each_problem(self):
+        """Invalid fields should each be reported with their location."""
+        review = {**VALID_CODE_REVIEW, "quality_rating": "great", "issues": [{"severity": "urgent"}]}
+        errors = validate_review(review, SCHEMA_CODE_REVIEW)
+        assert any(e.startswith("quality_rating") for e in errors)
+        assert any(e.startswith("issues[0].severity") for e in errors)
+        assert any(e.startswith("issues[0].location") for e in errors)
+        assert validate_review(None, SCHEMA_CODE_REVIEW) == ["response is not parseable JSON"]
+
+    def test_detect_schema_from_prompt(self):
+        """The schema should be inferred from the prompt's output format."""
+        assert detect_schema('{"quality_rating": "...", "issues": []}') == SCHEMA_CODE_REVIEW
+        assert detect_schema('{"recommendation": "...", "approaches": []}') == SCHEMA_DESIGN_QUESTION
+        assert detect_schema("free text") is None
+
+    def test_only_failing_provider_is_repaired(self):
+        """Only the provider with invalid JSON should get a repair request."""
+        good = json.dumps(VALID_CODE_REVIEW)
+        responses = {
+            "gemini": [_response("Sorry, here are my thoughts: it looks fine"), _response(good)],
+            "openai": [_response(good)],
+        }
+
+        async def fake_acompletion(**kwargs):
+            return responses[kwargs["provider"]].pop(0)
+
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(side_effect=fake_acompletion)
+        providers = [
+            {"provider": "openai", "model": "gpt-5.2", "api_key": "k"},
+            {"provider": "gemini", "model": "gemini-2.5-flash", "api_key": "k"},
+        ]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council(
+                "Review app.py please", providers, schema=SCHEMA_CODE_REVIEW, repair_attempts=2,
+            ))
+
+        by_provider = {r["provider"]: r for r in result["reviews"]}
+        assert by_provider["openai"]["repair_attempts"] == 0
+        assert by_provider["gemini"]["repair_attempts"] == 1
+        assert by_provider["gemini"]["schema_valid"]
+        assert by_provider["gemini"]["parsed_json"] == VALID_CODE_REVIEW
+        repair_call = mock_module.acompletion.call_args_list[-1].kwargs
+        repair_prompt = repair_call["messages"][0]["content"]
+        assert repair_call["provider"] == "gemini"
+        assert "it looks fine" in repair_prompt
+        # Repairs are cheap: the original prompt is not resent.
+        assert "Review app.py please" not in repair_prompt
+
+    def test_repair_budget_is_respected(self):
+        """Providers that never return valid JSON stop after the budget."""
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=_response("not json"))
+        config = {"provider": "gemini", "model": "gemini-2.5-flash", "api_key": "k"}
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council("p", [config], schema=SCHEMA_CODE_REVIEW, repair_attempts=2))
+
+        review = result["reviews"][0]
+        assert review["success"]
+        assert not review["schema_valid"]
+        assert review["repair_attempts"] == 2
+        assert review["schema_errors"] == ["response is not parseable JSON"]
+        assert mock_module.acompletion.await_count == 3
+
+
+CASCADE = {"escalate_severity": "medium", "min_confidence": "medium"}
+
+CASCADE_PROMPT = """Review this.
+
+## Code to Review
+
+### app/auth.py
+def login(): ...
+
+### app/util.py
+def helper(): ...
+
+## Review Focus
+1. Correctness
+
+Files to review:
+- app/auth.py
+- app/util.py"""
+
+
+def _triage(issues, confidence="high"):
+    """Build a successful triage review with the given issues."""
+    parsed = {"provider": "gemini", "quality_rating": "good", "issues": issues, "confidence": confidence}
+    return {"provider": "gemini", "success": True, "parsed_json": parsed}
+
+
+class TestCascade:
+    """Verify two-stage cascade review."""
+
+    FILES = ["app/auth.py", "app/util.py"]
+
+    def test_confident_clean_triage_does_not_escalate(self):
+        """Only low-severity findings with high confidence stay in triage."""
+        low = {"severity": "low", "location": "app/util.py:3", "category": "style", "description": "x"}
+        plan = plan_escalation([_triage([low])], self.FILES, CASCADE)
+        assert not plan["escalated"]
+        assert plan["escalated_files"] == []
+
+    def test_escalates_only_flagged_files(self):
+        """Files with issues at or above the threshold should be escalated."""
+        high = {"severity": "high", "location": "app/auth.py:12-14", "category": "correctness", "description": "x"}
+        plan = plan_escalation([_triage([high])], self.FILES, CASCADE)
+        assert plan["escalated"]
+        assert plan["escalated_files"] == ["app/auth.py"]
+
+    def test_low_confidence_or_failed_triage_escalates_everything(self):
+        """Uncertain or failed triage must not lose coverage."""
+        assert plan_escalation([_triage([], "low")], self.FILES, CASCADE)["escalated_files"] == self.FILES
+        failed = {"provider": "gemini", "success": False, "error": "timeout"}
+        assert plan_escalation([failed], self.FILES, CASCADE)["escalated_files"] == self.FILES
+
+    def test_restrict_prompt_drops_unflagged_sections(self):
+        """The escalation prompt should carry only the flagged files."""
+        restricted = restrict_prompt(CASCADE_PROMPT, self.FILES, ["app/auth.py"])
+        assert "def login()" in restricted
+        assert "def helper()" not in restricted
+        assert "## Review Focus" in restricted
+        assert restricted.endswith("Files to review:\n- app/auth.py")
+
+    def test_run_council_merges_both_stages(self):
+        """Triage runs first and only flagged files reach the expensive tier."""
+        high = {"severity": "high", "location": "app/auth.py:1", "category": "correctness", "description": "x"}
+        triage_content = json.dumps(_triage([high])["parsed_json"])
+
+        async def fake_acompletion(**kwargs):
+            if kwargs["provider"] == "gemini":
+                return _response(triage_content)
+            return _response(json.dumps(VALID_CODE_REVIEW))
+
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(side_effect=fake_acompletion)
+        providers = [
+            {"provider": "gemini", "model": "gemini-2.5-flash", "api_key": "k", "tier": "triage"},
+            {"provider": "openai", "model": "gpt-5.2", "api_key": "k"},
+        ]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council(CASCADE_PROMPT, providers, cascade=CASCADE, files=self.FILES))
+
+        assert [(r["provider"], r["stage"]) for r in result["reviews"]] == [("gemini", "triage"), ("openai", "escalation")]
+        assert result["cascade"]["escalated_files"] == ["app/auth.py"]
+        prompts = {c.kwargs["provider"]: c.kwargs["messages"][0]["content"] for c in mock_module.acompletion.call_args_list}
+        assert '"confidence"' in prompts["gemini"]
+        assert "def helper()" not in prompts["openai"]
+
+    def test_run_council_skips_escalation_when_clean(self):
+        """A clean, confident triage should not call the expensive tier at all."""
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=_response(json.dumps(_triage([])["parsed_json"])))
+        providers = [
+            {"provider": "gemini", "model": "gemini-2.5-flash", "api_key": "k", "tier": "triage"},
+            {"provider": "openai", "model": "gpt-5.2", "api_key": "k"},
+        ]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council(CASCADE_PROMPT, providers, cascade=CASCADE, files=self.FILES))
+
+        assert mock_module.acompletion.await_count == 1
+        assert not result["cascade"]["escalated"]
+
+    def test_cascade_config_validation(self):
+        """Cascade settings should default sensibly and reject bad levels."""
+        assert cascade_from_config({}) is None
+        assert cascade_from_config({"cascade": True}) == CASCADE
+        with pytest.raises(ConfigError):
+            cascade_from_config({"cascade": {"escalate_severity": "critical"}})
+
+
+class TestLocalScheduler:
+    """Verify local providers are queued by the CPU-aware scheduler."""
+
+    def test_auto_limit_uses_cores_and_memory(self):
+        """Without max_concurrency the limit comes from host resources."""
+        with (
+            patch("llm_council._host_cores", return_value=16),
+            patch("llm_council._host_memory_gb", return_value=16.0),
+        ):
+            assert LocalScheduler().max_concurrency == 2
+            assert LocalScheduler(cores_per_request=8, memory_per_request_gb=4).max_concurrency == 2
+        with (
+            patch("llm_council._host_cores", return_value=2),
+            patch("llm_council._host_memory_gb", return_value=None),
+        ):
+            assert LocalScheduler().max_concurrency == 1
+
+    def test_only_created_for_local_providers(self):
+        """Configs without local providers need no scheduler."""
+        assert local_scheduler_from_config({"providers": [{"provider": "openai", "model": "m"}]}) is None
+        config = {
+            "providers": [{"provider": "ollama", "model": "llama3", "local": True}],
+            "local_scheduler": {"max_concurrency": 3},
+        }
+        assert local_scheduler_from_config(config).max_concurrency == 3
+        with pytest.raises(ConfigError):
+            local_scheduler_from_config({**config, "local_scheduler": {"max_concurrency": 0}})
+
+    def test_local_requests_are_queued_remote_are_not(self):
+        """Local calls should never exceed the cap; remote calls run freely."""
+        in_flight = {"local": 0, "remote": 0}
+        peak = {"local": 0, "remote": 0}
+
+        async def slow_acompletion(**kwargs):
+            kind = "local" if kwargs.get("api_base") else "remote"
+            in_flight[kind] += 1
+            peak[kind] = max(peak[kind], in_flight[kind])
+            await asyncio.sleep(0.01)
+            in_flight[kind] -= 1
+            return _response('{"provider": "x"}')
+
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(side_effect=slow_acompletion)
+        local = [
+            {"provider": "ollama", "model": f"m{i}", "api_base": "http://localhost:11434", "local": True}
+            for i in range(4)
+        ]
+        remote = [{"provider": "openai", "model": f"m{i}", "api_key": "k"} for i in range(3)]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council(
+                "prompt", local + remote, local_scheduler=LocalScheduler(max_concurrency=1),
+            ))
+
+        assert peak == {"local": 1, "remote": 3}
+        assert all(r["success"] for r in result["reviews"])
+        queued = sorted(r["queued_seconds"] for r in result["reviews"] if r["provider"] == "ollama")
+        assert queued[0] < 0.01 < queued[-1]
+        assert all("queued_seconds" not in r for r in result["reviews"] if r["provider"] == "openai")
+
+
+class TestRateLimiter:
+    """Verify the cross-process token-bucket rate limiter."""
+
+    CONFIG = {
+        "provider": "openai",
+        "model": "gpt-5.2",
+        "api_key": "k",
+        "rate_limit": {"requests_per_minute": 2, "tokens_per_minute": 1000},
+    }
+
+    def test_config_validation(self):
+        """Only providers with valid rate_limit settings create a limiter."""
+        assert rate_limiter_from_config({"providers": [{"provider": "openai", "model": "m"}]}) is None
+        assert rate_limiter_from_config({"providers": [self.CONFIG]}) is not None
+        for bad in ({}, {"requests_per_minute": 0}, {"rpm": 5}, {"tokens_per_minute": "10"}):
+            with pytest.raises(ConfigError):
+                rate_limiter_from_config({"providers": [{**self.CONFIG, "rate_limit": bad}]})
+
+    def test_wait_reported_on_review(self, tmp_path):
+        """Rate-limited reviews report their wait; unlimited ones do not."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        limiter = RateLimiter(tmp_path / "rate_limits.json")
+        providers = [self.CONFIG, {"provider": "anthropic", "model": "m", "api_key": "k"}]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council("prompt", providers, rate_limiter=limiter))
+
+        limited, unlimited = result["reviews"]
+        assert limited["rate_limit_wait_seconds"] == 0.0
+        assert "rate_limit_wait_seconds" not in unlimited
+
+
+class TestAdaptiveTimeouts:
+    """Verify per-provider timeouts adapt to recorded latency."""
+
+    CONFIG = {"provider": "openai", "model": "gpt-5.2", "api_key": "k", "max_tokens": 1000}
+    SETTINGS = {"percentile": 0.95, "multiplier": 2.0, "min_seconds": 1.0, "min_samples": 3, "window": 5}
+
+    def _record(self, timeouts, elapsed, completion_tokens=100, prompt_tokens=0):
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+        result = {"provider": "openai", "success": True, "elapsed_seconds": elapsed, "usage": usage}
+        timeouts.record(self.CONFIG, "", result)
+
+    def test_config_validation(self):
+        """Adaptive timeouts are opt-in and can be tuned."""
+        assert adaptive_timeouts_from_config({}) is None
+        assert adaptive_timeouts_from_config({"adaptive_timeout": False}) is None
+        assert adaptive_timeouts_from_config({"adaptive_timeout": True}).settings == DEFAULT_ADAPTIVE_TIMEOUT
+        tuned = adaptive_timeouts_from_config({"adaptive_timeout": {"min_samples": 10}})
+        assert tuned.settings["min_samples"] == 10
+        for bad in ("yes", {"percentile": 2}, {"min_samples": 1.5}, {"multiplier": 0}, {"window": True}):
+            with pytest.raises(ConfigError):
+                adaptive_timeouts_from_config({"adaptive_timeout": bad})
+
+    def test_effective_timeout_reported_per_review(self, tmp_path):
+        """Each review reports the timeout it ran under; a slow call times out early."""
+        timeouts = AdaptiveTimeouts(tmp_path / "latency.json", {**self.SETTINGS, "min_seconds": 0.1})
+        for _ in range(3):
+            self._record(timeouts, 0.01)
+
+        async def slow(**kwargs):
+            await asyncio.sleep(5)
+
+        mock_module = MagicMock()
+        mock_module.acompletion = slow
+        fresh = {"provider": "anthropic", "model": "m", "api_key": "k"}
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(
+                run_council("prompt", [self.CONFIG, fresh], timeout=0.3, adaptive_timeouts=timeouts),
+            )
+
+        adapted, ceiling = result["reviews"]
+        assert (adapted["timeout_seconds"], adapted["timed_out"]) == (0.1, True)
+        assert (ceiling["timeout_seconds"], ceiling["timed_out"]) == (0.3, True)
+        assert timeouts.snapshot()["openai/gpt-5.2"]["timeouts_in_row"] == 1
+
+
+class _Stream:
+    """Async iterator of streamed chunks that records whether it was closed."""
+
+    def __init__(self, text, chunk=40):
+        self.parts = [text[i:i + chunk] for i in range(0, len(text), chunk)]
+        self.closed = False
+        self.sent = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent >= len(self.parts):
+            raise StopAsyncIteration
+        chunk = MagicMock(usage=None)
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = self.parts[self.sent]
+        self.sent += 1
+        return chunk
+
+    async def aclose(self):
+        self.closed = True
+
+
+class TestStreamGuard:
+    """Verify runaway streamed responses are aborted and salvaged."""
+
+    CONFIG = {"providers": [{"provider": "openai", "model": "gpt-5.2", "api_key": "k"}], "stream_guard": True}
+
+    def _review(self, stream):
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=stream)
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            output = asyncio.run(Council(self.CONFIG, schema="none").review("prompt", []))
+        assert mock_module.acompletion.call_args.kwargs["stream"] is True
+        return output
+
+    def test_complete_stream_is_not_truncated(self):
+        """A well-formed streamed reply is returned as-is."""
+        output = self._review(_Stream('{"issues": [], "summary": "fine"}'))
+        review = output["reviews"][0]
+        assert review["parsed_json"] == {"issues": [], "summary": "fine"}
+        assert "truncated" not in review
+
+    def test_repetition_aborts_and_salvages(self):
+        """A looping reply is cut off early and keeps its complete issues."""
+        issue = {"severity": "low", "location": "a.py:1", "description": "x"}
+        text = '{"issues": [' + json.dumps(issue) + ', {"description": "' + "again and again " * 2000
+        stream = _Stream(text)
+        output = self._review(stream)
+
+        review = output["reviews"][0]
+        assert review["success"] is True
+        assert review["truncated"] is True
+        assert "repeating" in review["truncation_reason"]
+        assert review["parsed_json"] == {"issues": [issue]}
+        assert stream.closed
+        assert stream.sent < len(stream.parts) / 10
+
+    def test_nothing_salvageable_fails(self):
+        """A reply that loops before any JSON is a failed review."""
+        output = self._review(_Stream("I think " * 500))
+        failed = output["failed_reviews"][0]
+        assert failed["truncated"] is True
+        assert "no salvageable JSON" in failed["error"]
+
+    def test_invalid_config(self):
+        """Bad guard settings surface as ConfigError."""
+        with pytest.raises(ConfigError):
+            Council({**self.CONFIG, "stream_guard": {"echo_words": -1}})
+
+
+class TestModelCapabilities:
+    """Verify the capability registry shapes and rejects requests before sending."""
+
+    def test_registry_lookup_layers(self):
+        """Provider defaults, glob and exact model entries combine."""
+        caps = capabilities_for({"provider": "openai", "model": "gpt-5.2"})
+        assert caps["max_tokens_param"] == "max_completion_tokens"
+        assert caps["context_window"] == 400000
+        assert caps["temperature"] is True
+        assert capabilities_for({"provider": "openai", "model": "gpt-5"})["temperature"] is False
+        unknown = capabilities_for({"provider": "ollama", "model": "llama3"})
+        assert unknown["context_window"] is None
+        assert unknown["max_tokens_param"] == "max_tokens"
+
+    def test_temperature_omitted_when_unsupported(self):
+        """Models that reject temperature are not sent one."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            asyncio.run(_get_review_internal({"provider": "openai", "model": "o3", "api_key": "k"}, "p"))
+        kwargs = mock_module.acompletion.call_args.kwargs
+        assert "temperature" not in kwargs
+        assert kwargs["max_completion_tokens"] == DEFAULT_MAX_TOKENS
+
+    def test_max_tokens_clamped_to_model_limits(self):
+        """max_tokens is capped at max output and remaining context."""
+        opus = {"provider": "anthropic", "model": "claude-opus-4-6", "max_tokens": 100000}
+        assert preflight(opus, "p")[0]["max_tokens"] == 32000
+        gpt4o = {"provider": "openai", "model": "gpt-4o", "max_tokens": 16000}
+        shaped, rejection = preflight(gpt4o, "x" * 4 * 100000)
+        assert rejection is None
+        assert shaped["max_tokens"] == 128000 - int(100000 * 1.15)
+        unchanged = {"provider": "gemini", "model": "gemini-2.5-flash", "max_tokens": 8192}
+        assert preflight(unchanged, "p")[0] is unchanged
+
+    def test_oversized_prompt_rejected_without_request(self):
+        """A prompt that cannot fit is skipped before any network call."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        providers = [{"provider": "openai", "model": "gpt-4o", "api_key": "k"}]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council("x" * 4 * 130000, providers))
+        review = result["reviews"][0]
+        assert review["skipped"] is True
+        assert "context window" in review["error"]
+        mock_module.acompletion.assert_not_called()
+
+    def test_adjustment_reported(self):
+        """A reduced max_tokens is reported on the review."""
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        providers = [{"provider": "anthropic", "model": "claude-opus-4-6", "api_key": "k", "max_tokens": 64000}]
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            result = asyncio.run(run_council("p", providers))
+        assert result["reviews"][0]["max_tokens_adjusted"] == 32000
+        assert mock_module.acompletion.call_args.kwargs["max_tokens"] == 32000
+
+    def test_overrides_from_providers_json(self):
+        """Top-level model_capabilities and per-provider capabilities override the registry."""
+        config = {
+            "providers": [
+                {"provider": "ollama", "model": "qwen3-coder", "api_base": "http://localhost:11434", "local": True},
+                {"provider": "openai", "model": "gpt-5.2", "api_key": "k", "capabilities": {"temperature": False}},
+            ],
+            "model_capabilities": {"ollama": {"models": {"qwen3*": {"context_window": 32768}}}},
+        }
+        council = Council(config)
+        ollama, openai = asyncio.run(council.resolved_providers())
+        assert capabilities_for(ollama)["context_window"] == 32768
+        assert capabilities_for(openai)["temperature"] is False
+        assert capabilities_for(openai)["context_window"] == 400000
+
+    @pytest.mark.parametrize("bad", [
+        {"model_capabilities": {"openai": {"models": {"gpt-5.2": {"context_window": "big"}}}}},
+        {"model_capabilities": {"openai": {"defaults": {"streams": True}}}},
+        {"providers": [{"provider": "openai", "model": "m", "capabilities": {"temperature": "no"}}]},
+    ])
+    def test_invalid_overrides(self, bad):
+        """Invalid overrides raise ConfigError."""
+        config = {"providers": [{"provider": "openai", "model": "m", "api_key": "k"}], **bad}
+        with pytest.raises(ConfigError):
+            Council(config)
+
+
+class TestWatchMode:
+    """Verify precomputed reviews are stored by content hash and reused."""
+
+    CONFIG = {"providers": [{"provider": "openai", "model": "gpt-5.2", "api_key": "k"}]}
+    PROVIDER = CONFIG["providers"][0]
+
+    def _review(self, location):
+        return {**VALID_CODE_REVIEW, "issues": [{**VALID_CODE_REVIEW["issues"][0], "location": location}]}
+
+    def _prompt(self, files):
+        sections = "".join(f"\n### {f}\n{open(f).read()}" for f in files)
+        return f"## Code to Review\n{sections}\n## Output Format\n" + SCHEMA_TEMPLATES[SCHEMA_CODE_REVIEW]
+
+    def test_speculate_stores_and_skips_cached(self, tmp_path):
+        """Changed files are reviewed once; lockfiles skipped; over-budget files deferred."""
+        (tmp_path / "app.py").write_text("x = 1\n")
+        (tmp_path / "uv.lock").write_text("version = 1\n")
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=_response(json.dumps(self._review("app.py:1"))))
+        council = Council(self.CONFIG, schema=SCHEMA_CODE_REVIEW, cascade=False)
+        store = ReviewStore(tmp_path / "store")
+        files = ["app.py", "uv.lock"]
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            first = asyncio.run(speculate(council, store, tmp_path, files, TokenBudget(100_000)))
+            second = asyncio.run(speculate(council, store, tmp_path, files, TokenBudget(100_000)))
+            (tmp_path / "app.py").write_text("x = 2\n")
+            starved = asyncio.run(speculate(council, store, tmp_path, files, TokenBudget(10)))
+
+        assert first["reviewed"] == ["app.py"]
+        assert first["skipped"] == ["uv.lock"]
+        assert second["cached"] == ["app.py"]
+        assert starved["deferred"] == ["app.py"]
+        assert mock_module.acompletion.await_count == 1
+        sent = mock_module.acompletion.call_args.kwargs["messages"][0]["content"]
+        assert "### app.py\nx = 1" in sent
+        assert detect_schema(sent) == SCHEMA_CODE_REVIEW
+
+    def test_review_fills_only_missing_files(self, tmp_path, monkeypatch):
+        """An explicit review reuses stored files and sends only the rest."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "a.py").write_text("a = 1\n")
+        (tmp_path / "b.py").write_text("b = 1\n")
+        store = ReviewStore(tmp_path / "store")
+        stored = {"success": True, "parsed_json": {**self._review("a.py:1"), "quality_rating": "fair"}}
+        store.put(self.PROVIDER, "a.py", content_hash("a.py"), stored)
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=_response(json.dumps(self._review("b.py:1"))))
+        council = Council(self.CONFIG, store=store)
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            output = asyncio.run(council.review(self._prompt(["a.py", "b.py"]), ["a.py", "b.py"]))
+
+        sent = mock_module.acompletion.call_args.kwargs["messages"][0]["content"]
+        assert "### b.py" in sent
+        assert "### a.py" not in sent
+        review = output["reviews"][0]
+        assert review["from_watch"] == ["a.py"]
+        assert [i["location"] for i in review["parsed_json"]["issues"]] == ["b.py:1", "a.py:1"]
+        assert review["parsed_json"]["quality_rating"] == "fair"
+
+    def test_review_fully_stored_sends_nothing(self, tmp_path, monkeypatch):
+        """When every file is stored the review returns without a request."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "a.py").write_text("a = 1\n")
+        store = ReviewStore(tmp_path / "store")
+        store.put(self.PROVIDER, "a.py", content_hash("a.py"), {"success": True, "parsed_json": VALID_CODE_REVIEW})
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock()
+        council = Council(self.CONFIG, store=store)
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            output = asyncio.run(council.review(self._prompt(["a.py"]), ["a.py"]))
+
+        mock_module.acompletion.assert_not_awaited()
+        assert output["reviews"][0]["parsed_json"]["issues"] == VALID_CODE_REVIEW["issues"]
+
+    def test_design_question_ignores_store(self, tmp_path, monkeypatch):
+        """Only code reviews are served from the store; a design question goes to the providers."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "a.py").write_text("a = 1\n")
+        store = ReviewStore(tmp_path / "store")
+        store.put(self.PROVIDER, "a.py", content_hash("a.py"), {"success": True, "parsed_json": VALID_CODE_REVIEW})
+        design = {
+            "provider": "openai",
+            "recommendation": "CRUD",
+            "approaches": [{"name": "CRUD", "pros": [], "cons": [], "risk_level": "low", "fit_rating": "good"}],
+            "summary": "Keep it simple.",
+        }
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(return_value=_response(json.dumps(design)))
+        council = Council(self.CONFIG, schema=SCHEMA_DESIGN_QUESTION, store=store)
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            output = asyncio.run(council.review("## Design Question\nCRUD?", ["a.py"]))
+
+        mock_module.acompletion.assert_awaited_once()
+        review = output["reviews"][0]
+        assert review["parsed_json"] == design
+        assert "from_watch" not in review
+
+
+class TestQueueWorker:
+    """Verify queue workers run jobs and decide what to retry."""
+
+    CONFIG = {
+        "providers": [{"provider": "openai", "model": "gpt-5.2", "api_key": "k"}],
+        "queue": {"retry_delay_seconds": 60},
+    }
+
+    def test_worker_drains_jobs(self, tmp_path):
+        """A draining worker runs every job and stores the council output."""
+        queue = job_queue_from_config(self.CONFIG, str(tmp_path / "queue.db"))
+        ids = queue.submit([job_payload(f"prompt {i}", ["a.py"], None) for i in range(3)])
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            outcomes = asyncio.run(run_worker(queue, self.CONFIG, "w1", concurrency=2, drain=True))
+
+        assert outcomes == {"done": 3}
+        jobs = queue.jobs(ids, include_result=True)
+        assert [j["state"] for j in jobs] == ["done"] * 3
+        assert jobs[0]["output"]["files_reviewed"] == ["a.py"]
+
+    def test_failures_retried_unless_permanent(self, tmp_path):
+        """All-provider failures are retried; unknown providers fail for good."""
+        queue = job_queue_from_config(self.CONFIG, str(tmp_path / "queue.db"))
+        flaky, bad = queue.submit([job_payload("p", [], None), job_payload("p", [], ["cohere"])])
+        mock_module = MagicMock()
+        mock_module.acompletion = AsyncMock(side_effect=RuntimeError("503 overloaded"))
+
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            outcomes = asyncio.run(run_worker(queue, self.CONFIG, "w1", drain=True))
+
+        assert outcomes == {"retried": 1, "failed": 1}
+        states = {j["id"]: j for j in queue.jobs([flaky, bad])}
+        assert states[flaky]["state"] == "queued"
+        assert "Every provider failed" in states[flaky]["error"]
+        assert states[bad]["state"] == "failed"
+        assert "cohere" in states[bad]["error"]
+
+    def test_submit_and_collect_cli(self, tmp_path, monkeypatch, capsys):
+        """submit queues stdin; collect reports the finished output and exit code."""
+        from llm_council import main
+        import io
+
+        config = tmp_path / "providers.json"
+        config.write_text(json.dumps(self.CONFIG))
+        monkeypatch.setenv("STAR_CHAMBER_CONFIG", str(config))
+        db = str(tmp_path / "queue.db")
+
+        with patch("sys.argv", ["llm_council.py", "submit", "--queue", db, "-f", "a.py"]), \
+                patch("sys.stdin", io.StringIO("review this")):
+            main()
+        job_id = json.loads(capsys.readouterr().out)["job_ids"][0]
+
+        with patch("sys.argv", ["llm_council.py", "collect", "--queue", db, str(job_id)]):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+        assert exc_info.value.code == 1
+        assert json.loads(capsys.readouterr().out)["jobs"][0]["state"] == "queued"
+
+        mock_module = MagicMock()
+        mock_module.acompletion = _mock_acompletion()
+        queue = job_queue_from_config(self.CONFIG, db)
+        with patch.dict(sys.modules, {"any_llm": mock_module}):
+            asyncio.run(run_worker(queue, self.CONFIG, "w1", drain=True))
+        sent = mock_module.acompletion.call_args.kwargs["messages"][0]["content"]
+        assert sent.startswith("review this")
+
+        with patch("sys.argv", ["llm_council.py", "collect", "--queue", db, str(job_id)]):
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+        assert exc_info.value.code == 0
+        assert json.loads(capsys.readouterr().out)["jobs"][0]["output"]["reviews"][0]["success"]
+
+
+class TestSliceCommand:
+    """Verify the slice subcommand's default change set."""
+
+    def test_default_files_from_subdirectory_use_base(self, tmp_path, monkeypatch, capsys):
+        """Run from a subdirectory, the default files are root-relative changes since --base."""
+        root = tmp_path / "repo"
+        (root / "pkg").mkdir(parents=True)
+        (root / "pkg" / "m.py").write_text("def a():\n    return 1\n\n\ndef b():\n    return 2\n")
+        (root / "pkg" / "n.py").write_text("def c():\n    return 3\n")
+        env = {**os.environ, "GIT_AUTHOR_NAME": "T", "GIT_AUTHOR_EMAIL": "t@e", "GIT_COMMITTER_NAME": "T",
+               "GIT_COMMITTER_EMAIL": "t@e"}
+        for args in (["init", "-q"], ["add", "."], ["commit", "-qm", "initial"]):
+            subprocess.run(["git", *args], cwd=root, check=True, env=env, capture_output=True)
+        (root / "pkg" / "m.py").write_text("def a():\n    return 1\n\n\ndef b():\n    return 20\n")
+        monkeypatch.chdir(root / "pkg")
+
+        slice_main(["--json"])
+        result = json.loads(capsys.readouterr().out)
+        assert [(s["path"], s["role"], s["symbols"]) for s in result["included"]] == [("pkg/m.py", "changed", ["b"])]
+
+    def test_base_is_a_plain_diff_against_the_working_tree(self, tmp_path, monkeypatch, capsys):
+        """--base X slices files that differ from X now, not every file touched since X."""
+        root = tmp_path / "repo"
+        root.mkdir()
+        (root / "m.py").write_text("def a():\n    return 1\n")
+        (root / "n.py").write_text("def c():\n    return 3\n")
+        env = {**os.environ, "GIT_AUTHOR_NAME": "T", "GIT_AUTHOR_EMAIL": "t@e", "GIT_COMMITTER_NAME": "T",
+               "GIT_COMMITTER_EMAIL": "t@e"}
+        for args in (["init", "-q"], ["add", "."], ["commit", "-qm", "initial"]):
+            subprocess.run(["git", *args], cwd=root, check=True, env=env, capture_output=True)
+        (root / "m.py").write_text("def a():\n    return 10\n")
+        (root / "n.py").write_text("def c():\n    return 30\n")
+        subprocess.run(["git", "commit", "-qam", "edit"], cwd=root, check=True, env=env, capture_output=True)
+        # n.py is back to its HEAD~1 contents, so it has no changes against that base.
+        (root / "n.py").write_text("def c():\n    return 3\n")
+        monkeypatch.chdir(root)
+
+        slice_main(["--json", "--base", "HEAD~1"])
+        result = json.loads(capsys.readouterr().out)
+        assert [(s["path"], s["symbols"]) for s in result["included"]] == [("m.py", ["a"])]
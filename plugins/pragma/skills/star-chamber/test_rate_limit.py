@@ -0,0 +1,65 @@
+"""Tests for rate_limit.py."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from rate_limit import RateLimiter, has_rate_limits
+
+
+class TestRateLimiter:
+    """Verify the cross-process token-bucket rate limiter."""
+
+    CONFIG = {
+        "provider": "openai",
+        "model": "gpt-5.2",
+        "api_key": "k",
+        "rate_limit": {"requests_per_minute": 2, "tokens_per_minute": 1000},
+    }
+
+    def test_waits_for_request_capacity(self, tmp_path, fake_clock):
+        """The third request in a minute waits for the bucket to refill."""
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+            fake_clock.now += seconds
+
+        limiter = RateLimiter(tmp_path / "rate_limits.json", clock=fake_clock)
+        with patch("rate_limit.asyncio.sleep", fake_sleep):
+            waits = [asyncio.run(limiter.acquire(self.CONFIG, 10)) for _ in range(3)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2] == pytest.approx(30.0)
+        assert sleeps == [pytest.approx(30.0)]
+
+    def test_budget_is_shared_through_state_file(self, tmp_path, fake_clock):
+        """A second limiter (another process) sees tokens the first one spent."""
+        path = tmp_path / "rate_limits.json"
+        first = RateLimiter(path, clock=fake_clock)
+        second = RateLimiter(path, clock=fake_clock)
+        asyncio.run(first.acquire(self.CONFIG, 600))
+        assert second._try_take(self.CONFIG, 600) == pytest.approx(12.0)
+
+    def test_settle_charges_actual_usage(self, tmp_path, fake_clock):
+        """Usage beyond the estimate is debited from the token bucket."""
+        limiter = RateLimiter(tmp_path / "rate_limits.json", clock=fake_clock)
+        asyncio.run(limiter.acquire(self.CONFIG, 100))
+        limiter.settle(self.CONFIG, 100, 900)
+        assert limiter._try_take(self.CONFIG, 150) == pytest.approx(3.0)
+
+
+class TestRateLimitConfig:
+    """Verify rate_limit config validation."""
+
+    def test_only_providers_with_limits_count(self):
+        """Providers without rate_limit do not need a limiter."""
+        assert not has_rate_limits({"providers": [{"provider": "openai", "model": "m"}]})
+        assert has_rate_limits({"providers": [TestRateLimiter.CONFIG]})
+
+    @pytest.mark.parametrize("bad", [{}, {"requests_per_minute": 0}, {"rpm": 5}, {"tokens_per_minute": "10"}])
+    def test_invalid_names_provider(self, bad):
+        """Invalid limits raise ValueError naming the provider."""
+        with pytest.raises(ValueError, match="^openai: "):
+            has_rate_limits({"providers": [{**TestRateLimiter.CONFIG, "rate_limit": bad}]})
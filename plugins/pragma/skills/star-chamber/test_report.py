@@ -0,0 +1,142 @@
+"""Tests for report.py."""
+
+import time
+
+from report import CODE_REVIEW, DESIGN_QUESTION, design_question, detect_layout, group_issues, render_markdown
+
+
+def _issue(location, severity, description, category="correctness", suggestion=""):
+    return {
+        "location": location, "severity": severity, "category": category,
+        "description": description, "suggestion": suggestion,
+    }
+
+
+def _code_review(provider, rating, issues, model="m"):
+    parsed = {"provider": provider, "quality_rating": rating, "issues": issues, "praise": [], "summary": "ok"}
+    return {"provider": provider, "model": model, "success": True, "parsed_json": parsed}
+
+
+def _design(provider, recommendation, approaches, summary):
+    parsed = {"provider": provider, "recommendation": recommendation, "approaches": approaches, "summary": summary}
+    return {"provider": provider, "model": "m", "success": True, "parsed_json": parsed}
+
+
+def _approach(name, pros, cons, risk, fit):
+    return {"name": name, "pros": pros, "cons": cons, "risk_level": risk, "fit_rating": fit}
+
+
+CODE_OUTPUT = {
+    "reviews": [
+        _code_review("openai", "good", [
+            _issue("app.py:10", "high", "Off by one", suggestion="Use <"),
+            _issue("util.py:3", "low", "Name | unclear", category="craftsmanship"),
+        ]),
+        _code_review("anthropic", "fair", [
+            _issue("app.py:12", "medium", "Loop bound wrong"),
+            _issue("util.py:5", "low", "Rename", category="craftsmanship"),
+        ]),
+        _code_review("gemini", "good", [
+            _issue("app.py:11-13", "high", "Boundary error"),
+            _issue("app.py:40", "medium", "Layering", category="architecture"),
+        ]),
+        {"provider": "xai", "model": "grok", "success": True, "parsed_json": None,
+         "schema_errors": ["response is not parseable JSON"]},
+    ],
+    "files_reviewed": ["app.py", "util.py"],
+    "failed_reviews": [
+        {"provider": "mistral", "model": "large", "success": False, "error": "Request timed out after 30s",
+         "timed_out": True},
+    ],
+}
+
+
+class TestCodeReviewReport:
+    """Verify the Step 6 code review layout."""
+
+    def test_groups_by_agreement(self):
+        """Nearby issues of one category merge and are bucketed by how many providers raised them."""
+        text = render_markdown(CODE_OUTPUT)
+        assert "**Files:** `app.py`, `util.py`\n**Providers:** openai, anthropic, gemini\n" in text
+        consensus = text.index("### Consensus Issues (All Providers Agree)")
+        majority = text.index("### Majority Issues (2/3 Providers)")
+        individual = text.index("### Individual Observations")
+        assert consensus < majority < individual
+        assert "1. `app.py:10-13` **[HIGH]** - Off by one\n   - **Suggestion:** Use <\n" in text
+        assert "1. `util.py:3-5` **[LOW]** (openai, anthropic) - Name | unclear\n" in text
+        assert "- **gemini:** `app.py:40` **[MEDIUM]** - Layering\n" in text
+
+    def test_summary_table_and_failures(self):
+        """Every usable provider gets a summary row; failed and malformed ones are listed."""
+        text = render_markdown(CODE_OUTPUT)
+        assert "| anthropic | fair | 2 |\n" in text
+        assert "- **mistral** (large) timed out: Request timed out after 30s\n" in text
+        assert "- **xai** (grok) returned a malformed response: response is not parseable JSON\n" in text
+        assert text.endswith("\n") and not text.endswith("\n\n")
+
+    def test_single_provider_and_duplicate_names(self):
+        """One provider's issues are individual; a provider listed twice is told apart by model."""
+        reviews = [
+            _code_review("openai", "good", [_issue("a.py:1", "low", "x")], model="gpt-5.2"),
+            _code_review("openai", "fair", [], model="gpt-5.2-mini"),
+        ]
+        text = render_markdown({"reviews": reviews[:1], "files_reviewed": ["a.py"]})
+        assert "Consensus" not in text and "### Individual Observations" in text
+        text = render_markdown({"reviews": reviews, "files_reviewed": ["a.py"]})
+        assert "| openai (gpt-5.2-mini) | fair | 0 |" in text
+
+    def test_deterministic_and_fast(self):
+        """Input order within a provider does not matter, and large councils render quickly."""
+        reviews = [
+            _code_review(f"p{n}", "good", [_issue(f"f{i % 50}.py:{i}", "medium", f"issue {i}") for i in range(2000)])
+            for n in range(8)
+        ]
+        start = time.perf_counter()
+        text = render_markdown({"reviews": reviews, "files_reviewed": []})
+        assert time.perf_counter() - start < 2.0
+        for review in reviews:
+            review["parsed_json"]["issues"].reverse()
+        assert render_markdown({"reviews": reviews, "files_reviewed": []}) == text
+        issues = group_issues([(r["provider"], r["parsed_json"]) for r in reviews])
+        assert len(issues) == 2000 and all(len(i["providers"]) == 8 for i in issues)
+
+
+class TestDesignReport:
+    """Verify the design question advisory layout."""
+
+    OUTPUT = {
+        "reviews": [
+            _design("openai", "Event sourcing", [
+                _approach("Event sourcing", ["Audit trail"], ["Complex"], "medium", "good"),
+                _approach("CRUD", ["Simple"], [], "low", "fair"),
+            ], "Audit needs history."),
+            _design("anthropic", "Use event-sourcing with snapshots", [
+                _approach("Event-Sourcing", ["audit trail", "Replay"], ["Complex"], "high", "excellent"),
+            ], "Replay matters."),
+            _design("gemini", "CRUD", [_approach("crud", ["Simple"], ["No history"], "low", "excellent")],
+                    "Keep it simple."),
+        ],
+    }
+
+    def test_approaches_dissent_and_summary(self):
+        """Approaches merge by name, recommendations match free text, and dissent is shown."""
+        assert detect_layout(self.OUTPUT) == DESIGN_QUESTION
+        text = render_markdown(self.OUTPUT, question="Event sourcing or CRUD?")
+        assert text.startswith("## Star-Chamber Advisory\n\n**Question:** Event sourcing or CRUD?\n")
+        assert "No consensus: providers recommended 2 different approaches." in text
+        assert (
+            "**Event sourcing** - Recommended by 2/3 providers\n"
+            "- **Pros:** Audit trail; Replay\n- **Cons:** Complex\n- **Risk:** medium to high\n"
+        ) in text
+        assert "- **gemini** recommends CRUD: Keep it simple.\n" in text
+        assert "| anthropic | Event sourcing | excellent |\n" in text
+        assert "**Overall:** 2/3 providers recommend Event sourcing. 1 provider dissents.\n" in text
+
+    def test_consensus_and_question_from_prompt(self):
+        """Unanimous recommendations are stated; the question comes from the prompt."""
+        output = {"reviews": self.OUTPUT["reviews"][:2]}
+        assert "All 2 providers recommend **Event sourcing**." in render_markdown(output, DESIGN_QUESTION)
+        assert "### Dissenting Views" not in render_markdown(output, DESIGN_QUESTION)
+        prompt = "## Project Context\nrules\n\n## Design Question\nShould we\nuse CRUD?\n\n## Advisory Focus\n1."
+        assert design_question(prompt) == "Should we use CRUD?"
+        assert detect_layout({"reviews": []}) == CODE_REVIEW
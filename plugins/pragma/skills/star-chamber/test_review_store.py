@@ -0,0 +1,34 @@
+"""Tests for review_store.py."""
+
+from review_store import ReviewStore, content_hash
+
+
+PROVIDER = {"provider": "openai", "model": "gpt-5.2", "api_key": "k"}
+PARSED = {"provider": "openai", "quality_rating": "good", "issues": [], "praise": [], "summary": "ok"}
+
+
+class TestReviewStore:
+    """Verify stored reviews are keyed by file contents and expire."""
+
+    def test_keyed_by_content_and_expires(self, tmp_path, fake_clock):
+        """A stored review is found only for the same file contents and until it expires."""
+        store = ReviewStore(tmp_path, max_age_seconds=60, clock=fake_clock)
+        store.put(PROVIDER, "app.py", "hash-1", {"success": True, "parsed_json": PARSED})
+
+        assert store.get(PROVIDER, "app.py", "hash-1")["parsed_json"] == PARSED
+        assert store.get(PROVIDER, "app.py", "hash-2") is None
+        assert store.get({**PROVIDER, "model": "gpt-5-mini"}, "app.py", "hash-1") is None
+        fake_clock.now += 61
+        assert store.get(PROVIDER, "app.py", "hash-1") is None
+
+    def test_defaults_to_state_dir(self, tmp_path, monkeypatch):
+        """Without a directory, reviews live under the shared state directory."""
+        monkeypatch.setenv("STAR_CHAMBER_STATE_DIR", str(tmp_path))
+        assert ReviewStore().directory == tmp_path / "reviews"
+
+    def test_content_hash(self, tmp_path):
+        """Files hash by their bytes; unreadable files hash to None."""
+        (tmp_path / "a.py").write_text("x = 1\n")
+        (tmp_path / "b.py").write_text("x = 1\n")
+        assert content_hash(tmp_path / "a.py") == content_hash(tmp_path / "b.py")
+        assert content_hash(tmp_path / "missing.py") is None
@@ -0,0 +1,37 @@
+"""Tests for state.py."""
+
+from state import locked_json_state, state_dir
+
+
+class TestLockedJsonState:
+    """Verify locked read-modify-write of shared state files."""
+
+    def test_saves_only_changes(self, tmp_path):
+        """Reads leave the file alone; writes leave no temporary files behind."""
+        path = tmp_path / "state.json"
+        with locked_json_state(path) as state:
+            assert state == {}
+        assert not path.exists()
+
+        with locked_json_state(path) as state:
+            state["a"] = {"count": 1}
+        saved = path.stat().st_mtime_ns
+        with locked_json_state(path) as state:
+            assert state == {"a": {"count": 1}}
+        assert path.stat().st_mtime_ns == saved
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["state.json", "state.lock"]
+
+    def test_corrupt_file_starts_empty(self, tmp_path):
+        """A state file that is not a JSON object is replaced on the next write."""
+        path = tmp_path / "state.json"
+        path.write_text("[1, 2")
+        with locked_json_state(path) as state:
+            assert state == {}
+            state["a"] = 1
+        with locked_json_state(path) as state:
+            assert state == {"a": 1}
+
+    def test_state_dir_override(self, tmp_path, monkeypatch):
+        """STAR_CHAMBER_STATE_DIR moves the shared state directory."""
+        monkeypatch.setenv("STAR_CHAMBER_STATE_DIR", str(tmp_path))
+        assert state_dir() == tmp_path
@@ -0,0 +1,125 @@
+"""Tests for stream_guard.py."""
+
+import json
+import time
+
+import pytest
+
+from stream_guard import (
+    DEFAULT_GUARD_SETTINGS,
+    RunawayGuard,
+    guard_settings_from_config,
+    salvage_json,
+)
+
+
+ISSUE = {"severity": "high", "location": "app.py:3", "category": "correctness", "description": "Off by one."}
+
+PROMPT = " ".join(f"line{i} of the reviewed source file with some words" for i in range(60))
+
+
+def _feed(guard, text, chunk=50):
+    """Feed text in fixed-size chunks, returning the first abort reason."""
+    for i in range(0, len(text), chunk):
+        reason = guard.feed(text[i:i + chunk])
+        if reason is not None:
+            return reason
+    return None
+
+
+class TestRunawayGuard:
+    """Verify degenerate output is detected and well-formed output is not."""
+
+    def test_normal_review_passes(self):
+        """A complete review with a short trailing fence is left alone."""
+        issues = [{**ISSUE, "location": f"app.py:{i}"} for i in range(20)]
+        review = json.dumps({"issues": issues, "summary": "ok"}, indent=2)
+        guard = RunawayGuard(PROMPT)
+        assert _feed(guard, f"```json\n{review}\n```\n") is None
+
+    def test_repetition_loop(self):
+        """The same window repeated back to back aborts the stream."""
+        prefix = '{"issues": [' + json.dumps(ISSUE) + ', {"description": "'
+        guard = RunawayGuard(PROMPT)
+        reason = _feed(guard, prefix + "the value is null and " * 100)
+        assert "repeating" in reason
+        assert guard.cut_at > len(prefix)
+        assert guard.cut_at < len(prefix) + 2 * len("the value is null and ")
+
+    def test_prompt_echo(self):
+        """Copying a long run of the prompt aborts near the start of the copy."""
+        prefix = '{"issues": [], "summary": "'
+        guard = RunawayGuard(PROMPT)
+        assert "echoing" in _feed(guard, prefix + PROMPT)
+        # The first copied word is glued to the opening quote.
+        assert len(prefix) <= guard.cut_at <= len(prefix) + len("line0 ")
+
+    def test_short_quotes_of_the_prompt_are_fine(self):
+        """Quoting a few lines of code in a suggestion is not an echo."""
+        quote = " ".join(PROMPT.split()[:40])
+        guard = RunawayGuard(PROMPT)
+        assert _feed(guard, '{"summary": "' + quote + '"}') is None
+
+    def test_overrun_past_json(self):
+        """Prose after the closed JSON object aborts at the object's end."""
+        review = json.dumps({"issues": [], "summary": "ok"})
+        guard = RunawayGuard(PROMPT)
+        reason = _feed(guard, "[1] notes: " + review + "\n\nAlso, " + "some more thoughts. " * 20)
+        assert "past the end" in reason
+        assert guard.text[:guard.cut_at].endswith(review)
+
+    def test_small_deltas_scale_linearly(self):
+        """A long stream of tiny deltas is checked quickly and kept intact."""
+        issues = [{**ISSUE, "location": f"app.py:{i}", "description": f"Issue number {i}."} for i in range(8000)]
+        review = json.dumps({"issues": issues, "summary": "ok"})
+        guard = RunawayGuard(PROMPT)
+        start = time.perf_counter()
+        assert _feed(guard, review, chunk=4) is None
+        assert time.perf_counter() - start < 5.0
+        assert guard.text == review
+
+
+class TestSalvageJson:
+    """Verify truncated JSON is closed at the last complete value."""
+
+    def test_closes_open_containers(self):
+        """A cut inside the second issue keeps only the first."""
+        text = '```json\n{"issues": [' + json.dumps(ISSUE) + ', {"severity": "lo'
+        content, parsed = salvage_json(text)
+        assert parsed == {"issues": [ISSUE]}
+        assert json.loads(content) == parsed
+
+    def test_cut_inside_string(self):
+        """Braces inside strings do not confuse the salvage."""
+        text = '{"summary": "use {x}", "issues": [{"description": "a ] b'
+        assert salvage_json(text)[1] == {"summary": "use {x}"}
+
+    def test_empty_object_when_nothing_completed(self):
+        """A cut before any complete member still yields the outer object."""
+        assert salvage_json('{"issues": [{"sev') == ('{}', {})
+
+    def test_nothing_to_salvage(self):
+        """Text without a JSON object yields None."""
+        assert salvage_json("I cannot review this") is None
+
+
+class TestGuardConfig:
+    """Verify stream_guard config parsing."""
+
+    def test_disabled_by_default(self):
+        """The guard is opt-in."""
+        assert guard_settings_from_config({}) is None
+        assert guard_settings_from_config({"stream_guard": {"enabled": False}}) is None
+
+    def test_overrides(self):
+        """Thresholds can be overridden individually."""
+        assert guard_settings_from_config({"stream_guard": True}) == DEFAULT_GUARD_SETTINGS
+        settings = guard_settings_from_config({"stream_guard": {"echo_words": 400}})
+        assert settings["echo_words"] == 400
+        assert settings["repeat_chars"] == DEFAULT_GUARD_SETTINGS["repeat_chars"]
+
+    @pytest.mark.parametrize("raw", ["yes", {"echo_words": 0}, {"repeat_chars": 10}, {"trailing_chars": True}])
+    def test_invalid(self, raw):
+        """Invalid settings raise ValueError."""
+        with pytest.raises(ValueError):
+            guard_settings_from_config({"stream_guard": raw})
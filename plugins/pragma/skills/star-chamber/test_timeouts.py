@@ -0,0 +1,78 @@
+"""Tests for timeouts.py."""
+
+import pytest
+
+from timeouts import DEFAULT_ADAPTIVE_TIMEOUT, AdaptiveTimeouts, adaptive_timeout_settings_from_config
+
+
+class TestAdaptiveTimeouts:
+    """Verify per-provider timeouts adapt to recorded latency."""
+
+    CONFIG = {"provider": "openai", "model": "gpt-5.2", "api_key": "k", "max_tokens": 1000}
+    SETTINGS = {"percentile": 0.95, "multiplier": 2.0, "min_seconds": 1.0, "min_samples": 3, "window": 5}
+
+    def _record(self, timeouts, elapsed, completion_tokens=100, prompt_tokens=0):
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+        result = {"provider": "openai", "success": True, "elapsed_seconds": elapsed, "usage": usage}
+        timeouts.record(self.CONFIG, "", result)
+
+    def test_adapts_after_min_samples_within_ceiling(self, tmp_path):
+        """The ceiling applies until enough samples; then latency and prompt size tighten it."""
+        timeouts = AdaptiveTimeouts(tmp_path / "latency.json", self.SETTINGS)
+        self._record(timeouts, 2.0)
+        self._record(timeouts, 2.0)
+        assert timeouts.timeout_for(self.CONFIG, "", 60.0) == 60.0
+        self._record(timeouts, 4.0)
+
+        # 0.04s per token at p95, 100 expected output tokens, doubled.
+        assert timeouts.timeout_for(self.CONFIG, "", 60.0) == pytest.approx(8.0)
+        assert timeouts.timeout_for(self.CONFIG, "x" * 40_000, 60.0) > 8.0
+        assert timeouts.timeout_for(self.CONFIG, "", 5.0) == 5.0
+        # Without a configured timeout, calls stay unlimited.
+        assert timeouts.timeout_for(self.CONFIG, "", None) is None
+        other = {**self.CONFIG, "model": "gpt-5.2-mini"}
+        assert timeouts.timeout_for(other, "", 60.0) == 60.0
+
+    def test_expected_output_capped_at_max_tokens(self, tmp_path):
+        """A lower max_tokens than the recorded outputs shortens the timeout."""
+        timeouts = AdaptiveTimeouts(tmp_path / "latency.json", self.SETTINGS)
+        for _ in range(3):
+            self._record(timeouts, 4.0)
+        assert timeouts.timeout_for(self.CONFIG, "", 60.0) == pytest.approx(8.0)
+        assert timeouts.timeout_for({**self.CONFIG, "max_tokens": 50}, "", 60.0) == pytest.approx(4.0)
+
+    def test_timeouts_in_row_double_until_success(self, tmp_path):
+        """Each timeout doubles the next one; a success resets it."""
+        timeouts = AdaptiveTimeouts(tmp_path / "latency.json", self.SETTINGS)
+        for _ in range(3):
+            self._record(timeouts, 1.0)
+        timed_out = {"provider": "openai", "success": False, "timed_out": True}
+        timeouts.record(self.CONFIG, "", timed_out)
+        timeouts.record(self.CONFIG, "", timed_out)
+        assert timeouts.timeout_for(self.CONFIG, "", 60.0) == pytest.approx(8.0)
+        # Other failures say nothing about latency.
+        timeouts.record(self.CONFIG, "", {"provider": "openai", "success": False, "error": "401"})
+        assert timeouts.timeout_for(self.CONFIG, "", 60.0) == pytest.approx(8.0)
+        self._record(timeouts, 1.0)
+        assert timeouts.timeout_for(self.CONFIG, "", 60.0) == pytest.approx(2.0)
+        assert timeouts.snapshot()["openai/gpt-5.2"]["samples"] == 4
+
+
+class TestAdaptiveTimeoutSettings:
+    """Verify adaptive_timeout config parsing."""
+
+    def test_opt_in_and_overrides(self):
+        """Adaptive timeouts are off unless configured; fields override the defaults."""
+        assert adaptive_timeout_settings_from_config({}) is None
+        assert adaptive_timeout_settings_from_config({"adaptive_timeout": {"enabled": False}}) is None
+        assert adaptive_timeout_settings_from_config({"adaptive_timeout": True}) == DEFAULT_ADAPTIVE_TIMEOUT
+        tuned = adaptive_timeout_settings_from_config({"adaptive_timeout": {"min_samples": 10}})
+        assert tuned == {**DEFAULT_ADAPTIVE_TIMEOUT, "min_samples": 10}
+
+    @pytest.mark.parametrize(
+        "raw", ["yes", {"percentile": 2}, {"min_samples": 1.5}, {"multiplier": 0}, {"window": True}],
+    )
+    def test_invalid(self, raw):
+        """Invalid settings raise ValueError."""
+        with pytest.raises(ValueError):
+            adaptive_timeout_settings_from_config({"adaptive_timeout": raw})
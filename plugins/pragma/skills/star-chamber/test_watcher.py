@@ -0,0 +1,103 @@
+"""Tests for watcher.py."""
+
+import asyncio
+import subprocess
+import threading
+
+import pytest
+
+from watcher import ChangeWatcher, changed_files, head_commit, repo_root
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A git work tree with one committed file."""
+    for var in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(var, "Test")
+    for var in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(var, "test@example.com")
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("x = 1\n")
+    _git(root, "init", "-q")
+    _git(root, "add", ".")
+    _git(root, "commit", "-qm", "initial")
+    return root
+
+
+def _git(root, *args):
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+async def _next_batch(watcher, change):
+    """Start watching, apply change, and return the first batch."""
+    batches = watcher.batches()
+    pending = asyncio.ensure_future(batches.__anext__())
+    await asyncio.sleep(0.05)
+    change()
+    try:
+        return await asyncio.wait_for(pending, timeout=5)
+    finally:
+        await batches.aclose()
+
+
+class TestChangedFiles:
+    """Verify which files count as changed."""
+
+    def test_modified_untracked_and_committed(self, repo):
+        """Edits, new files and files in commits since a given HEAD are reported."""
+        assert changed_files(repo) == []
+        before = head_commit(repo)
+        (repo / "src" / "app.py").write_text("x = 2\n")
+        (repo / "new.py").write_text("y = 1\n")
+        assert changed_files(repo) == ["new.py", "src/app.py"]
+
+        _git(repo, "commit", "-qam", "edit")
+        assert changed_files(repo) == ["new.py"]
+        assert changed_files(repo, since=before) == ["new.py", "src/app.py"]
+        assert repo_root(repo / "src") == repo.resolve()
+
+
+class TestChangeWatcher:
+    """Verify saves are noticed and debounced."""
+
+    def test_polling_reports_save(self, repo):
+        """The polling fallback reports a saved file once changes settle."""
+        watcher = ChangeWatcher(repo, debounce_seconds=0.1, poll_interval=0.05, use_inotify=False)
+        assert watcher.mode == "polling"
+        files = asyncio.run(_next_batch(watcher, lambda: (repo / "src" / "app.py").write_text("x = 3\n")))
+        assert files == ["src/app.py"]
+
+    def test_polling_debounces_across_a_poll_interval(self, repo):
+        """An edit after the first one but before the next poll lands in the same batch."""
+        watcher = ChangeWatcher(repo, debounce_seconds=0.1, poll_interval=0.5, use_inotify=False)
+
+        def change():
+            (repo / "src" / "app.py").write_text("x = 3\n")
+            threading.Timer(0.7, (repo / "src" / "b.py").write_text, ["y = 1\n"]).start()
+
+        files = asyncio.run(_next_batch(watcher, change))
+        assert files == ["src/app.py", "src/b.py"]
+
+    def test_inotify_reports_save_in_new_directory(self, repo):
+        """inotify picks up files created in directories made after watching began."""
+        watcher = ChangeWatcher(repo, debounce_seconds=0.1)
+        if watcher.mode != "inotify":
+            pytest.skip("inotify not available")
+
+        def change():
+            (repo / "pkg").mkdir()
+            (repo / "pkg" / "mod.py").write_text("z = 1\n")
+
+        try:
+            files = asyncio.run(_next_batch(watcher, change))
+        finally:
+            watcher.close()
+        assert files == ["pkg/mod.py"]
+
+    def test_commit_reports_committed_files(self, repo):
+        """A commit is a change: its files are reported even though the tree is clean."""
+        (repo / "src" / "app.py").write_text("x = 4\n")
+        watcher = ChangeWatcher(repo, debounce_seconds=0.1, poll_interval=0.05, use_inotify=False)
+        files = asyncio.run(_next_batch(watcher, lambda: _git(repo, "commit", "-qam", "edit")))
+        assert files == ["src/app.py"]
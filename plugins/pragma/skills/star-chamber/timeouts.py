@@ -0,0 +1,161 @@
+"""
+Adaptive per-provider timeouts for star-chamber.
+
+Records the latency and token counts of every successful call in a shared
+state file and derives each provider/model's next timeout from that
+history, so a fast model is no longer given a slow model's timeout and a
+hung call frees its slot sooner. A configured timeout stays the ceiling.
+"""
+
+from pathlib import Path
+from typing import Any, TypedDict
+
+from breaker import CircuitBreaker
+from compaction import estimate_tokens
+from state import locked_json_state
+
+
+# Weight of a prompt token relative to a generated token (prefill is far
+# cheaper than decoding), and the most a timeout is doubled after timeouts
+# in a row.
+PREFILL_TOKEN_WEIGHT = 0.1
+MAX_TIMEOUT_DOUBLINGS = 3
+
+
+class AdaptiveTimeoutSettings(TypedDict):
+    """How per-call timeouts are derived from observed latency."""
+
+    # Latency percentile the timeout is based on.
+    percentile: float
+    # Headroom multiplied onto the percentile estimate.
+    multiplier: float
+    # Shortest timeout ever applied.
+    min_seconds: float
+    # Successful calls recorded before timeouts adapt (the ceiling applies until then).
+    min_samples: int
+    # Most recent calls kept per provider/model.
+    window: int
+
+
+DEFAULT_ADAPTIVE_TIMEOUT = AdaptiveTimeoutSettings(
+    percentile=0.95, multiplier=2.0, min_seconds=15.0, min_samples=5, window=50,
+)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of values (not empty)."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(fraction * len(ordered) + 0.5) - 1))]
+
+
+def _work(prompt_tokens: float, completion_tokens: float) -> float:
+    """Return the generation work of a call in completion-token equivalents."""
+    return max(1.0, prompt_tokens * PREFILL_TOKEN_WEIGHT + completion_tokens)
+
+
+class AdaptiveTimeouts:
+    """Per-provider timeouts derived from latency recorded across sessions.
+
+    Each successful call stores its latency with its prompt and completion
+    token counts. The time per unit of work (completion tokens plus prompt
+    tokens weighted by PREFILL_TOKEN_WEIGHT) at the configured percentile,
+    times the work the next call is expected to need, times the multiplier,
+    gives that call's timeout. Adaptive timeouts only tighten a configured
+    timeout, which stays the ceiling; with no timeout configured calls stay
+    unlimited. Each timeout in a row doubles the next one, so a model that
+    has become slower is not cut off indefinitely.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        settings: AdaptiveTimeoutSettings = DEFAULT_ADAPTIVE_TIMEOUT,
+    ) -> None:
+        self.path = Path(path)
+        self.settings = settings
+
+    def timeout_for(self, config: dict[str, Any], prompt: str, ceiling: float | None) -> float | None:
+        """Return the timeout for a request, never above ceiling (None: no limit)."""
+        if ceiling is None:
+            return None
+        with locked_json_state(self.path) as state:
+            entry = state.get(CircuitBreaker.key(config), {})
+        samples = entry.get("samples", [])
+        if len(samples) < self.settings["min_samples"]:
+            return ceiling
+
+        pct = self.settings["percentile"]
+        per_work = _percentile([elapsed / _work(p, c) for elapsed, p, c in samples], pct)
+        expected_output = _percentile([c for _, _, c in samples], pct)
+        if config.get("max_tokens"):
+            expected_output = min(expected_output, config["max_tokens"])
+        expected = per_work * _work(estimate_tokens(prompt), expected_output) * self.settings["multiplier"]
+        timeout = max(self.settings["min_seconds"], expected) * 2 ** entry.get("timeouts_in_row", 0)
+        return round(min(timeout, ceiling), 2)
+
+    def record(self, config: dict[str, Any], prompt: str, result: dict[str, Any]) -> None:
+        """Record a call's latency, or that it timed out."""
+        if result.get("replayed") or result.get("skipped"):
+            return
+        timed_out = bool(result.get("timed_out"))
+        # Failures other than timeouts, and aborted generations, say nothing about latency.
+        if not timed_out and (not result.get("success") or result.get("truncated")):
+            return
+        with locked_json_state(self.path) as state:
+            entry = state.setdefault(CircuitBreaker.key(config), {"samples": []})
+            if timed_out:
+                entry["timeouts_in_row"] = min(MAX_TIMEOUT_DOUBLINGS, entry.get("timeouts_in_row", 0) + 1)
+                return
+            usage = result.get("usage", {})
+            prompt_tokens = usage.get("prompt_tokens") or estimate_tokens(prompt)
+            completion_tokens = usage.get("completion_tokens") or estimate_tokens(result.get("content") or "")
+            entry["samples"] = [
+                *entry.get("samples", []),
+                [result.get("elapsed_seconds", 0.0), prompt_tokens, completion_tokens],
+            ][-self.settings["window"]:]
+            entry["timeouts_in_row"] = 0
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return latency percentiles per provider/model, for diagnostics."""
+        with locked_json_state(self.path) as state:
+            entries = dict(state)
+        summary = {}
+        for key, entry in entries.items():
+            samples = entry.get("samples", [])
+            if not samples:
+                continue
+            latencies = [elapsed for elapsed, _, _ in samples]
+            summary[key] = {
+                "samples": len(samples),
+                "p50_seconds": _percentile(latencies, 0.5),
+                "p95_seconds": _percentile(latencies, 0.95),
+                "timeouts_in_row": entry.get("timeouts_in_row", 0),
+            }
+        return summary
+
+
+def adaptive_timeout_settings_from_config(config: dict[str, Any]) -> AdaptiveTimeoutSettings | None:
+    """Return settings from the "adaptive_timeout" config (None when disabled).
+
+    Raises ValueError for invalid settings.
+    """
+    raw = config.get("adaptive_timeout")
+    if raw is None or raw is False:
+        return None
+    if raw is True:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("adaptive_timeout must be an object or boolean")
+    if raw.get("enabled", True) is False:
+        return None
+    settings = AdaptiveTimeoutSettings(**DEFAULT_ADAPTIVE_TIMEOUT)
+    for name, default in DEFAULT_ADAPTIVE_TIMEOUT.items():
+        value = raw.get(name, default)
+        integer = isinstance(default, int)
+        if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)) or value <= 0:
+            kind = "a positive integer" if integer else "a positive number"
+            raise ValueError(f"{name} must be {kind}")
+        settings[name] = value  # type: ignore[literal-required]
+    if settings["percentile"] > 1:
+        raise ValueError("percentile must be at most 1")
+    return settings
@@ -0,0 +1,257 @@
+"""
+File change detection for star-chamber watch mode.
+
+Notices saves and commits in a git work tree and reports the files that
+differ from HEAD (plus files touched by new commits) once changes have
+settled for a debounce period. Uses Linux inotify through ctypes when
+available and falls back to polling `git status` otherwise.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+
+# Directories never watched (dependency trees, caches, build output).
+IGNORED_DIRS = {
+    "node_modules",
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    "dist",
+    "build",
+    "target",
+}
+
+# inotify event masks (see inotify(7)).
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+GIT_MASK = WATCH_MASK | IN_MODIFY
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _git(root: Path, *args: str) -> str:
+    """Run a git command in root, returning its output ("" on failure)."""
+    try:
+        return subprocess.check_output(["git", *args], cwd=root, text=True, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def repo_root(path: Path) -> Path:
+    """Return the top of the work tree containing path (path itself outside one)."""
+    top = _git(path, "rev-parse", "--show-toplevel").strip()
+    return Path(top) if top else path
+
+
+def head_commit(root: Path) -> str:
+    """Return the HEAD commit id, or "" outside a repository or before the first commit."""
+    return _git(root, "rev-parse", "--verify", "--quiet", "HEAD").strip()
+
+
+def changed_files(root: Path, since: str = "") -> list[str]:
+    """Return files that differ from HEAD, untracked files, and files changed since commit `since`."""
+    names = set(_git(root, "diff", "--name-only", "--diff-filter=ACMRT", "HEAD").split("\n"))
+    names |= set(_git(root, "ls-files", "--others", "--exclude-standard").split("\n"))
+    head = head_commit(root)
+    if since and head and since != head:
+        names |= set(_git(root, "diff", "--name-only", "--diff-filter=ACMRT", since, head).split("\n"))
+    return sorted(n for n in names if n and (root / n).is_file())
+
+
+class _Inotify:
+    """Minimal recursive inotify watcher using libc through ctypes."""
+
+    def __init__(self, root: Path) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or libc_name is None:
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+        try:
+            self._add_tree(root)
+            git_dir = root / ".git"
+            if git_dir.is_dir():
+                # HEAD, index and branch refs move on commit, checkout and add.
+                self._add(git_dir, GIT_MASK)
+                for refs in (git_dir / "refs" / "heads").rglob("*"):
+                    if refs.is_dir():
+                        self._add(refs, GIT_MASK)
+                self._add(git_dir / "refs" / "heads", GIT_MASK)
+        except OSError:
+            self.close()
+            raise
+
+    def _add(self, path: Path, mask: int = WATCH_MASK) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            # ENOSPC means the per-user watch limit is exhausted.
+            raise OSError(err, f"inotify_add_watch failed for {path}: {os.strerror(err)}")
+        self._dirs[wd] = path
+
+    def _add_tree(self, top: Path) -> None:
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS and d != ".git"]
+            self._add(Path(dirpath))
+
+    def read(self) -> bool:
+        """Drain pending events; return whether any is relevant."""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+                parent = self._dirs.get(wd)
+                if parent is None:
+                    continue
+                decoded = os.fsdecode(name)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and decoded not in IGNORED_DIRS:
+                    if ".git" not in parent.parts:
+                        self._add_tree(parent / decoded)
+                # Lock and temp files churn on every git command; only the final renames matter.
+                if not decoded.endswith(".lock"):
+                    relevant = True
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ChangeWatcher:
+    """Report changed files in a work tree after changes settle.
+
+    batches() yields the current list of changed files once no further
+    change has been seen for debounce_seconds. With use_inotify (the
+    default on Linux) saves are noticed immediately; otherwise, or when
+    inotify cannot be set up (e.g. the watch limit is reached), the work
+    tree is polled every poll_interval seconds and a batch settles only
+    after a poll sees no change.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        debounce_seconds: float = 2.0,
+        poll_interval: float = 5.0,
+        use_inotify: bool = True,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self._inotify: _Inotify | None = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify(self.root)
+            except OSError as e:
+                print(f"[star-chamber] inotify unavailable ({e}); polling every {poll_interval}s", file=sys.stderr)
+        self._head = head_commit(self.root)
+
+    @property
+    def mode(self) -> str:
+        """"inotify" or "polling"."""
+        return "inotify" if self._inotify is not None else "polling"
+
+    def _signature(self) -> tuple[str, tuple[tuple[str, int, int], ...]]:
+        """Cheap fingerprint of the work tree state for polling."""
+        entries = []
+        for name in changed_files(self.root, self._head):
+            try:
+                st = (self.root / name).stat()
+            except OSError:
+                continue
+            entries.append((name, st.st_mtime_ns, st.st_size))
+        return head_commit(self.root), tuple(entries)
+
+    async def _wait_for_change(self) -> None:
+        """Return once something in the work tree may have changed."""
+        if self._inotify is not None:
+            loop = asyncio.get_running_loop()
+            event = asyncio.Event()
+            loop.add_reader(self._inotify.fd, event.set)
+            try:
+                while True:
+                    await event.wait()
+                    event.clear()
+                    if self._inotify.read():
+                        return
+            finally:
+                loop.remove_reader(self._inotify.fd)
+        signature = self._signature()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if self._signature() != signature:
+                return
+
+    async def _settle(self) -> None:
+        """Wait until no change has been seen for debounce_seconds.
+
+        When polling, at least one more poll is made, so a debounce shorter
+        than poll_interval still notices edits that follow the first one.
+        """
+        if self._inotify is None:
+            signature = self._signature()
+            quiet_since = time.monotonic()
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                current = self._signature()
+                if current != signature:
+                    signature, quiet_since = current, time.monotonic()
+                elif time.monotonic() - quiet_since >= self.debounce_seconds:
+                    return
+        while True:
+            try:
+                await asyncio.wait_for(self._wait_for_change(), timeout=self.debounce_seconds)
+            except asyncio.TimeoutError:
+                return
+
+    async def batches(self) -> AsyncIterator[list[str]]:
+        """Yield the changed files after each settled burst of changes."""
+        while True:
+            await self._wait_for_change()
+            started = time.monotonic()
+            await self._settle()
+            files = changed_files(self.root, self._head)
+            self._head = head_commit(self.root)
+            print(
+                f"[star-chamber] {len(files)} changed file(s) after "
+                f"{time.monotonic() - started:.1f}s of activity",
+                file=sys.stderr,
+            )
+            yield files
+
+    def close(self) -> None:
+        """Release the inotify descriptor, if any."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
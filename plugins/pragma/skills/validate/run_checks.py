@@ -0,0 +1,679 @@
+"""
+Parallel, cached deterministic checks for the validate skill.
+
+Computes the change set once, runs every applicable deterministic checker
+(ruff, ty, biome, tsc, go-structural) concurrently in a process pool, and
+prints one merged result in the validators' HARD/SHOULD/WARN JSON schema.
+
+Results are cached by file content hash plus a fingerprint of the tool
+binary and its config files, so a fix-and-revalidate loop re-checks only
+the files that changed. ruff, biome and go-structural check each file on
+its own and are cached per file. ty and tsc type-check whole projects, so
+their results are cached per project against the working tree state: any
+edit re-runs them, an unchanged tree does not.
+
+Usage:
+    run_checks.py [--file PATH ...] [--base REF] [--jobs N] [--tool NAME ...] [--no-cache]
+
+Exit codes: 0 = pass, 1 = HARD violations or tool errors, 2 = usage error.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, TypedDict
+
+
+# Severity levels of the validators' schema.
+HARD = "hard"
+SHOULD = "should"
+WARN = "warn"
+
+# Where cached results live unless PRAGMA_VALIDATE_CACHE is set.
+DEFAULT_CACHE_DIR = Path("~/.cache/pragma/validate")
+CACHE_ENV = "PRAGMA_VALIDATE_CACHE"
+CACHE_MAX_AGE_SECONDS = 14 * 24 * 3600
+
+# Fewest files per batch handed to one worker for per-file tools.
+MIN_BATCH_FILES = 8
+
+PLUGIN_ROOT = Path(__file__).resolve().parents[2]
+
+
+class Tool(TypedDict):
+    """A deterministic checker and the files it applies to."""
+
+    name: str
+    extensions: tuple[str, ...]
+    # Config files whose contents (in the file's directory or any parent) affect results.
+    config_files: tuple[str, ...]
+    # "file": checks each file on its own; "project": type-checks the project holding the file.
+    scope: str
+    # For project tools, the file that marks a project directory.
+    project_marker: str
+    # Directories (relative to the repository or a parent) searched for the executable before PATH.
+    local_bins: tuple[str, ...]
+
+
+TOOLS: dict[str, Tool] = {
+    "ruff": Tool(
+        name="ruff", extensions=(".py", ".pyi"), config_files=("pyproject.toml", "ruff.toml", ".ruff.toml"),
+        scope="file", project_marker="", local_bins=(".venv/bin",),
+    ),
+    "ty": Tool(
+        name="ty", extensions=(".py", ".pyi"), config_files=("pyproject.toml", "ty.toml"),
+        scope="project", project_marker="pyproject.toml", local_bins=(".venv/bin",),
+    ),
+    "biome": Tool(
+        name="biome", extensions=(".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs"),
+        config_files=("biome.json", "biome.jsonc"), scope="file", project_marker="",
+        local_bins=("node_modules/.bin",),
+    ),
+    "tsc": Tool(
+        name="tsc", extensions=(".ts", ".tsx", ".mts", ".cts"), config_files=("tsconfig.json", "package.json"),
+        scope="project", project_marker="tsconfig.json", local_bins=("node_modules/.bin",),
+    ),
+    "go-structural": Tool(
+        name="go-structural", extensions=(".go",), config_files=(), scope="file", project_marker="",
+        local_bins=(),
+    ),
+}
+
+
+class ToolError(Exception):
+    """A tool reported a failure that is not tied to a file, so nothing was checked."""
+
+
+class Finding(TypedDict, total=False):
+    """One problem reported by a tool."""
+
+    tool: str
+    rule: str
+    # Path relative to the repository root.
+    file: str
+    line: int
+    severity: str
+    message: str
+    suggestion: str
+
+
+class Task(TypedDict):
+    """One tool invocation, run in a worker process."""
+
+    tool: str
+    executable: str
+    cwd: str
+    root: str
+    # Paths relative to cwd; empty for project tools.
+    files: list[str]
+
+
+class TaskResult(TypedDict):
+    """A task's findings, or the error that stopped it."""
+
+    task: Task
+    findings: list[Finding]
+    error: str
+    seconds: float
+
+
+def _git(root: Path, *args: str) -> str | None:
+    """Run git in root; return its output, or None if it failed."""
+    proc = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True)
+    return proc.stdout if proc.returncode == 0 else None
+
+
+def changed_files(root: Path, base: str | None = None) -> list[str]:
+    """Return the files changed since base, as the validate skill selects them.
+
+    Without base, compares with HEAD~1, falling back to staged and then
+    unstaged changes when that fails or finds nothing (e.g. on a first
+    commit). Deleted files are left out.
+    """
+    diffs = [[base]] if base else [["HEAD~1"], ["--cached"], []]
+    for args in diffs:
+        out = _git(root, "diff", *args, "--name-only", "--diff-filter=ACMRT")
+        files = sorted({f for f in (out or "").splitlines() if f and (root / f).is_file()})
+        if files:
+            return files
+    return []
+
+
+def tree_state(root: Path) -> str | None:
+    """Fingerprint the working tree: HEAD plus the contents of every modified or untracked file.
+
+    Returns None outside a git repository.
+    """
+    head = _git(root, "rev-parse", "HEAD")
+    modified = _git(root, "diff", "HEAD", "--name-only")
+    untracked = _git(root, "ls-files", "--others", "--exclude-standard")
+    if head is None or modified is None or untracked is None:
+        return None
+    files = sorted(set(modified.splitlines()) | set(untracked.splitlines()))
+    return _digest([head.strip(), [(f, content_hash(root / f)) for f in files if f]])
+
+
+def content_hash(path: Path) -> str:
+    """Return the sha256 of a file's contents ("" if it is missing)."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _digest(value: Any) -> str:
+    """Hash a JSON-serializable value."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def applies_to(tool: Tool, path: str) -> bool:
+    """Whether tool checks the file at path."""
+    if tool["name"] == "go-structural" and path.endswith("_test.go"):
+        # go-structural rejects test files.
+        return False
+    return path.endswith(tool["extensions"])
+
+
+def find_executable(tool: Tool, start: Path, root: Path) -> str | None:
+    """Find tool's executable in local bin directories from start up to root, then on PATH."""
+    directory = start
+    while True:
+        for local in tool["local_bins"]:
+            candidate = directory / local / tool["name"]
+            if os.access(candidate, os.X_OK):
+                return str(candidate)
+        if directory == root or directory.parent == directory:
+            break
+        directory = directory.parent
+    found = shutil.which(tool["name"])
+    if found is None and tool["name"] == "go-structural":
+        # Built in place by the setup-project skill.
+        built = PLUGIN_ROOT / "tools" / "go-structural" / "go-structural"
+        found = str(built) if os.access(built, os.X_OK) else None
+    return found
+
+
+def project_dir(tool: Tool, path: Path, root: Path) -> Path:
+    """Return the nearest directory holding tool's project marker (root if none does)."""
+    directory = path.parent
+    while directory != root and directory.parent != directory:
+        if (directory / tool["project_marker"]).is_file():
+            return directory
+        directory = directory.parent
+    return root
+
+
+class Fingerprints:
+    """Memoized tool and config fingerprints for cache keys."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._configs: dict[tuple[str, Path], str] = {}
+        self._executables: dict[str, str] = {}
+
+    def executable(self, path: str) -> str:
+        """Fingerprint the binary (upgrading a tool invalidates its results)."""
+        if path not in self._executables:
+            real = os.path.realpath(path)
+            try:
+                st = os.stat(real)
+                self._executables[path] = f"{real}:{st.st_size}:{st.st_mtime_ns}"
+            except OSError:
+                self._executables[path] = real
+        return self._executables[path]
+
+    def config(self, tool: Tool, directory: Path) -> str:
+        """Hash tool's config files in directory and each parent up to the root."""
+        key = (tool["name"], directory)
+        if key not in self._configs:
+            found = [
+                (str(d.relative_to(self.root) / name), content_hash(d / name))
+                for d in [directory, *directory.parents]
+                if d == self.root or self.root in d.parents
+                for name in tool["config_files"]
+                if (d / name).is_file()
+            ]
+            self._configs[key] = _digest(found)
+        return self._configs[key]
+
+
+class ResultCache:
+    """Tool findings keyed by content and config hashes, one JSON file per repository."""
+
+    def __init__(self, root: Path, directory: Path | None = None, clock: Any = time.time) -> None:
+        directory = directory or Path(os.environ.get(CACHE_ENV) or DEFAULT_CACHE_DIR).expanduser()
+        self.path = directory / f"{hashlib.sha256(str(root).encode()).hexdigest()[:16]}.json"
+        self._clock = clock
+        try:
+            self._entries: dict[str, Any] = json.loads(self.path.read_text()).get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            self._entries = {}
+        self._dirty = False
+
+    def get(self, key: str) -> list[Finding] | None:
+        """Return cached findings for key, or None."""
+        entry = self._entries.get(key)
+        return entry["findings"] if entry is not None else None
+
+    def put(self, key: str, findings: list[Finding]) -> None:
+        """Cache findings under key."""
+        self._entries[key] = {"findings": findings, "at": self._clock()}
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache back, dropping stale entries (atomic; the last concurrent run wins)."""
+        if not self._dirty:
+            return
+        cutoff = self._clock() - CACHE_MAX_AGE_SECONDS
+        entries = {k: v for k, v in self._entries.items() if v.get("at", 0) >= cutoff}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp, self.path)
+
+
+def _relative(root: str, cwd: str, path: str) -> str:
+    """Return a tool-reported path relative to the repository root."""
+    return os.path.relpath(os.path.join(cwd, path), root)
+
+
+def parse_ruff(task: Task, stdout: str) -> list[Finding]:
+    """Parse `ruff check --output-format=json` output; every finding is HARD."""
+    findings = []
+    for item in json.loads(stdout or "[]"):
+        finding = Finding(
+            tool="ruff",
+            rule=item.get("code") or "syntax-error",
+            file=_relative(task["root"], task["cwd"], item["filename"]),
+            line=(item.get("location") or {}).get("row", 0),
+            severity=HARD,
+            message=item.get("message", ""),
+        )
+        if (item.get("fix") or {}).get("message"):
+            finding["suggestion"] = item["fix"]["message"]
+        findings.append(finding)
+    return findings
+
+
+_TY_LINE = re.compile(
+    r"^(?P<file>[^\s:][^:]*):(?P<line>\d+):\d+: (?P<level>error|warning|info)\[(?P<rule>[\w-]+)\] (?P<message>.*)$"
+)
+_TY_LEVELS = {"error": HARD, "warning": SHOULD, "info": WARN}
+
+
+def parse_ty(task: Task, stdout: str) -> list[Finding]:
+    """Parse `ty check --output-format concise` output."""
+    findings = []
+    for line in stdout.splitlines():
+        match = _TY_LINE.match(line)
+        if match:
+            findings.append(Finding(
+                tool="ty",
+                rule=match["rule"],
+                file=_relative(task["root"], task["cwd"], match["file"]),
+                line=int(match["line"]),
+                severity=_TY_LEVELS[match["level"]],
+                message=match["message"],
+            ))
+    return findings
+
+
+_GITHUB_LINE = re.compile(r"^::(?P<level>error|warning|notice) (?P<props>[^:]*)::(?P<message>.*)$")
+_GITHUB_LEVELS = {"error": HARD, "warning": SHOULD, "notice": WARN}
+
+
+def parse_biome(task: Task, stdout: str) -> list[Finding]:
+    """Parse `biome check --reporter=github` output."""
+    findings = []
+    for line in stdout.splitlines():
+        match = _GITHUB_LINE.match(line)
+        if not match:
+            continue
+        props = dict(p.split("=", 1) for p in match["props"].split(",") if "=" in p)
+        if "file" not in props:
+            continue
+        findings.append(Finding(
+            tool="biome",
+            rule=props.get("title", "biome"),
+            file=_relative(task["root"], task["cwd"], props["file"]),
+            line=int(props.get("line", 0)),
+            severity=_GITHUB_LEVELS[match["level"]],
+            message=match["message"],
+        ))
+    return findings
+
+
+_TSC_LINE = re.compile(
+    r"^(?P<file>.+?)\((?P<line>\d+),\d+\): (?P<level>error|warning) (?P<rule>TS\d+): (?P<message>.*)$"
+)
+
+_TSC_GLOBAL_ERROR = re.compile(r"^error TS\d+: ")
+
+def parse_tsc(task: Task, stdout: str) -> list[Finding]:
+    """Parse `tsc --pretty false` output, joining continuation lines onto their message.
+
+    Errors without a file location (a missing tsconfig.json, a bad compiler
+    option, no inputs) mean the project was not checked; they raise ToolError.
+    """
+    findings: list[Finding] = []
+    unlocated: list[str] = []
+    for line in stdout.splitlines():
+        match = _TSC_LINE.match(line)
+        if _TSC_GLOBAL_ERROR.match(line):
+            unlocated.append(line.strip())
+        elif match:
+            findings.append(Finding(
+                tool="tsc",
+                rule=match["rule"],
+                file=_relative(task["root"], task["cwd"], match["file"]),
+                line=int(match["line"]),
+                severity=HARD if match["level"] == "error" else SHOULD,
+                message=match["message"],
+            ))
+        elif findings and line.startswith(" "):
+            findings[-1]["message"] += " " + line.strip()
+    if unlocated:
+        raise ToolError("\n".join(unlocated))
+    return findings
+
+
+def parse_go_structural(task: Task, stdout: str) -> list[Finding]:
+    """Parse go-structural JSON output; errors are HARD and warnings SHOULD."""
+    findings = []
+    for v in json.loads(stdout).get("violations") or []:
+        finding = Finding(
+            tool="go-structural",
+            rule=v.get("rule", ""),
+            file=_relative(task["root"], task["cwd"], v["file"]),
+            line=v.get("line", 0),
+            severity=HARD if v.get("severity") == "error" else SHOULD,
+            message=v.get("message", ""),
+        )
+        if v.get("suggestion"):
+            finding["suggestion"] = v["suggestion"]
+        findings.append(finding)
+    return findings
+
+
+PARSERS = {
+    "ruff": parse_ruff,
+    "ty": parse_ty,
+    "biome": parse_biome,
+    "tsc": parse_tsc,
+    "go-structural": parse_go_structural,
+}
+
+
+def command(task: Task) -> list[str]:
+    """Return the command line for a task."""
+    exe, files = task["executable"], task["files"]
+    return {
+        "ruff": [exe, "check", "--output-format=json", "--no-fix", "--force-exclude", *files],
+        "ty": [exe, "check", "--output-format", "concise"],
+        "biome": [exe, "check", "--reporter=github", "--colors=off", "--no-errors-on-unmatched", *files],
+        "tsc": [exe, "--noEmit", "--pretty", "false", "-p", "."],
+        "go-structural": [exe, *files],
+    }[task["tool"]]
+
+
+def _failure(proc: subprocess.CompletedProcess[str]) -> str:
+    """Describe a failed tool run from the end of its output."""
+    return (proc.stderr or proc.stdout).strip()[-2000:] or f"exited with status {proc.returncode}"
+
+
+def run_task(task: Task) -> TaskResult:
+    """Run one tool invocation and parse its findings (runs in a worker process).
+
+    The tools exit non-zero when they find problems. A non-zero exit with no
+    findings, output that cannot be parsed, or a failure the tool reports
+    without a location is returned as the task's error.
+    """
+    start = time.monotonic()
+    error = ""
+    findings: list[Finding] = []
+    try:
+        proc = subprocess.run(command(task), cwd=task["cwd"], capture_output=True, text=True)
+    except OSError as e:
+        error = str(e)
+    else:
+        try:
+            findings = PARSERS[task["tool"]](task, proc.stdout)
+        except ToolError as e:
+            error = str(e)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            error = _failure(proc) if proc.returncode else f"unreadable output: {e}"
+        if proc.returncode != 0 and not findings and not error:
+            error = _failure(proc)
+    return TaskResult(task=task, findings=findings, error=error, seconds=round(time.monotonic() - start, 3))
+
+
+def _batches(files: list[str], jobs: int) -> list[list[str]]:
+    """Split files into about jobs batches of at least MIN_BATCH_FILES."""
+    size = max(MIN_BATCH_FILES, -(-len(files) // max(jobs, 1)))
+    return [files[i:i + size] for i in range(0, len(files), size)]
+
+
+class _Planned(TypedDict):
+    """A task and the cache keys its results are stored under."""
+
+    task: Task
+    # Per-file tools: cache key of each file; project tools: the project's key.
+    keys: dict[str, str]
+    # Changed files the task covers.
+    count: int
+
+
+def plan(
+    root: Path,
+    files: list[str],
+    tools: list[str],
+    cache: ResultCache | None,
+    jobs: int,
+) -> tuple[list[_Planned], list[Finding], dict[str, dict[str, Any]], list[dict[str, str]]]:
+    """Work out what must run, serving everything else from the cache.
+
+    Returns the tasks to run, cached findings, per-tool counts and the tools
+    skipped because they are not installed.
+    """
+    fingerprints = Fingerprints(root)
+    state: str | None = None
+    planned: list[_Planned] = []
+    cached: list[Finding] = []
+    stats: dict[str, dict[str, Any]] = {}
+    skipped: list[dict[str, str]] = []
+
+    for name in tools:
+        tool = TOOLS[name]
+        targets = [f for f in files if applies_to(tool, f)]
+        if not targets:
+            continue
+        stats[name] = {"name": name, "files": len(targets), "cached": 0, "ran": 0, "seconds": 0.0}
+
+        if tool["scope"] == "file":
+            exe = find_executable(tool, root, root)
+            if exe is None:
+                skipped.append({"tool": name, "reason": f"{name} not found (local bin directories or PATH)"})
+                del stats[name]
+                continue
+            pending: dict[str, str] = {}
+            for f in targets:
+                key = _digest([
+                    name, fingerprints.executable(exe), fingerprints.config(tool, (root / f).parent), f,
+                    content_hash(root / f),
+                ])
+                hit = cache.get(key) if cache else None
+                if hit is None:
+                    pending[f] = key
+                else:
+                    cached.extend(hit)
+                    stats[name]["cached"] += 1
+            for batch in _batches(sorted(pending), jobs):
+                task = Task(tool=name, executable=exe, cwd=str(root), root=str(root), files=batch)
+                planned.append(_Planned(task=task, keys={f: pending[f] for f in batch}, count=len(batch)))
+            continue
+
+        projects: dict[Path, list[str]] = {}
+        for f in targets:
+            projects.setdefault(project_dir(tool, root / f, root), []).append(f)
+        for directory, members in sorted(projects.items()):
+            exe = find_executable(tool, directory, root)
+            if exe is None:
+                skipped.append({
+                    "tool": name, "project": str(directory.relative_to(root)),
+                    "reason": f"{name} not found (local bin directories or PATH)",
+                })
+                stats[name]["files"] -= len(members)
+                continue
+            if cache is not None and state is None:
+                state = tree_state(root)
+            key = ""
+            if state is not None:
+                key = _digest([
+                    name, fingerprints.executable(exe), fingerprints.config(tool, directory),
+                    str(directory.relative_to(root)), state,
+                ])
+            hit = cache.get(key) if cache and key else None
+            if hit is None:
+                task = Task(tool=name, executable=exe, cwd=str(directory), root=str(root), files=[])
+                planned.append(_Planned(task=task, keys={"": key} if key else {}, count=len(members)))
+            else:
+                cached.extend(hit)
+                stats[name]["cached"] += len(members)
+        if not stats[name]["files"]:
+            del stats[name]
+    return planned, cached, stats, skipped
+
+
+def run_checks(
+    root: Path,
+    files: list[str],
+    tools: list[str] | None = None,
+    jobs: int | None = None,
+    cache: ResultCache | None = None,
+) -> dict[str, Any]:
+    """Run the applicable tools over files (relative to root) and merge their findings.
+
+    Only findings in files are reported; project tools' findings elsewhere
+    are counted per tool as outside_change_set.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    planned, findings, stats, skipped = plan(root, files, tools or list(TOOLS), cache, jobs)
+    errors: list[dict[str, str]] = []
+
+    results: list[tuple[_Planned, TaskResult]] = []
+    if len(planned) == 1 or jobs == 1:
+        results = [(p, run_task(p["task"])) for p in planned]
+    elif planned:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(planned))) as pool:
+            futures = {pool.submit(run_task, p["task"]): p for p in planned}
+            results = [(futures[f], f.result()) for f in as_completed(futures)]
+
+    for p, result in results:
+        name = p["task"]["tool"]
+        stats[name]["seconds"] = round(stats[name]["seconds"] + result["seconds"], 3)
+        if result["error"]:
+            errors.append({"tool": name, "cwd": os.path.relpath(p["task"]["cwd"], root), "error": result["error"]})
+            continue
+        findings.extend(result["findings"])
+        stats[name]["ran"] += p["count"]
+        if cache is None:
+            continue
+        if TOOLS[name]["scope"] == "file":
+            by_file: dict[str, list[Finding]] = {f: [] for f in p["keys"]}
+            for finding in result["findings"]:
+                by_file.setdefault(finding["file"], []).append(finding)
+            for f, key in p["keys"].items():
+                cache.put(key, by_file[f])
+        elif p["keys"]:
+            cache.put(p["keys"][""], result["findings"])
+    if cache is not None:
+        cache.save()
+    return merge(files, findings, stats, skipped, errors)
+
+
+def merge(
+    files: list[str],
+    findings: list[Finding],
+    stats: dict[str, dict[str, Any]],
+    skipped: list[dict[str, str]],
+    errors: list[dict[str, str]],
+) -> dict[str, Any]:
+    """Build the merged HARD/SHOULD/WARN output."""
+    in_scope = set(files)
+    buckets: dict[str, list[dict[str, Any]]] = {HARD: [], SHOULD: [], WARN: []}
+    for s in stats.values():
+        s.update(hard_count=0, should_count=0, warning_count=0, outside_change_set=0)
+    for f in sorted(findings, key=lambda f: (f["file"], f.get("line", 0), f["tool"], f["rule"], f["message"])):
+        tool_stats = stats[f["tool"]]
+        if f["file"] not in in_scope:
+            tool_stats["outside_change_set"] += 1
+            continue
+        violation = {
+            "tool": f["tool"],
+            "rule": f["rule"],
+            "location": f"{f['file']}:{f['line']}" if f.get("line") else f["file"],
+            "explanation": f["message"],
+        }
+        if f.get("suggestion"):
+            violation["suggestion"] = f["suggestion"]
+        buckets[f["severity"]].append(violation)
+        tool_stats[{HARD: "hard_count", SHOULD: "should_count", WARN: "warning_count"}[f["severity"]]] += 1
+
+    for s in stats.values():
+        s["pass"] = s["hard_count"] == 0 and not any(e["tool"] == s["name"] for e in errors)
+    return {
+        "validator": "deterministic",
+        "files_checked": files,
+        "pass": not buckets[HARD] and not errors,
+        "hard_violations": buckets[HARD],
+        "should_violations": buckets[SHOULD],
+        "warnings": buckets[WARN],
+        "tools": list(stats.values()),
+        "skipped": skipped,
+        "errors": errors,
+        "summary": {
+            "hard_count": len(buckets[HARD]),
+            "should_count": len(buckets[SHOULD]),
+            "warning_count": len(buckets[WARN]),
+        },
+    }
+
+
+def main() -> None:
+    """Entry point: check the change set and print the merged result."""
+    parser = argparse.ArgumentParser(description="Run deterministic checks on changed files in parallel.")
+    parser.add_argument("--file", "-f", action="append", help="Check these files instead of the change set.")
+    parser.add_argument("--base", help="Compare with this ref instead of HEAD~1.")
+    parser.add_argument("--tool", action="append", choices=list(TOOLS), help="Run only these tools.")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: CPU count).")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update cached results.")
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    top = _git(Path.cwd(), "rev-parse", "--show-toplevel")
+    root = Path(top.strip()) if top else Path.cwd()
+    root = root.resolve()
+    if args.file:
+        files = sorted({os.path.relpath(Path(f).resolve(), root) for f in args.file if Path(f).is_file()})
+    else:
+        files = changed_files(root, args.base)
+
+    cache = None if args.no_cache else ResultCache(root)
+    output = run_checks(root, files, args.tool, args.jobs, cache)
+    print(json.dumps(output, indent=2))
+    sys.exit(0 if output["pass"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Tests for run_checks.py."""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from run_checks import (
+    HARD,
+    SHOULD,
+    WARN,
+    ResultCache,
+    Task,
+    changed_files,
+    parse_biome,
+    parse_tsc,
+    parse_ty,
+    run_checks,
+)
+
+
+# Stand-in for ruff: flags files containing "import os" and logs the files it was given.
+FAKE_RUFF = '''
+import json, os, sys
+files = [a for a in sys.argv[1:] if not a.startswith("-") and a != "check"]
+with open(os.environ["FAKE_TOOL_LOG"], "a") as log:
+    log.write("ruff " + " ".join(files) + "\\n")
+out = []
+for f in files:
+    for n, line in enumerate(open(f), 1):
+        if line.startswith("import os"):
+            out.append({"code": "F401", "filename": os.path.abspath(f), "location": {"row": n},
+                        "message": "`os` imported but unused", "fix": {"message": "Remove unused import"}})
+print(json.dumps(out))
+sys.exit(1 if out else 0)
+'''
+
+# Stand-in for tsc: reports an error in every .ts file under the project containing "any".
+FAKE_TSC = '''
+import os, sys
+with open(os.environ["FAKE_TOOL_LOG"], "a") as log:
+    log.write("tsc " + os.getcwd() + "\\n")
+found = False
+for dirpath, _, names in os.walk("."):
+    for name in sorted(names):
+        if name.endswith(".ts"):
+            path = os.path.relpath(os.path.join(dirpath, name))
+            if "any" in open(path).read():
+                print(f"{path}(1,5): error TS7006: Parameter implicitly has an 'any' type.")
+                print("  Consider adding a type.")
+                found = True
+sys.exit(2 if found else 0)
+'''
+
+# Stand-in for tsc whose tsconfig.json is unusable.
+CONFIG_ERROR_TSC = '''
+import sys
+print("error TS5023: Unknown compiler option 'strictest'.")
+print("error TS18003: No inputs were found in config file 'tsconfig.json'.")
+sys.exit(1)
+'''
+
+# Stand-in for ruff that fails without saying why.
+SILENT_RUFF = '''
+import sys
+sys.exit(1)
+'''
+
+# Stand-in for biome that crashes.
+BROKEN_BIOME = '''
+import sys
+print("biome: internal error", file=sys.stderr)
+sys.exit(3)
+'''
+
+
+def _tool(directory, name, source):
+    path = directory / name
+    path.write_text(f"#!{sys.executable}\n{textwrap.dedent(source)}")
+    path.chmod(0o755)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A git repository with Python and TypeScript changes and fake tools on PATH."""
+    root = tmp_path / "repo"
+    (root / "web").mkdir(parents=True)
+    (root / "web" / "tsconfig.json").write_text("{}")
+    (root / "a.py").write_text("x = 1\n")
+    (root / "b.py").write_text("y = 2\n")
+    (root / "web" / "ok.ts").write_text("export const ok = 1;\n")
+    env = {**os.environ, "GIT_AUTHOR_NAME": "T", "GIT_AUTHOR_EMAIL": "t@e", "GIT_COMMITTER_NAME": "T",
+           "GIT_COMMITTER_EMAIL": "t@e"}
+    for args in (["init", "-q"], ["add", "."], ["commit", "-qm", "initial"]):
+        subprocess.run(["git", *args], cwd=root, check=True, env=env, capture_output=True)
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    _tool(bin_dir, "ruff", FAKE_RUFF)
+    _tool(bin_dir, "tsc", FAKE_TSC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}/usr/bin{os.pathsep}/bin")
+    monkeypatch.setenv("FAKE_TOOL_LOG", str(tmp_path / "calls.log"))
+    return root
+
+
+def _calls(tmp_path):
+    log = tmp_path / "calls.log"
+    calls = log.read_text().splitlines() if log.exists() else []
+    log.unlink(missing_ok=True)
+    return calls
+
+
+class TestRunChecks:
+    """Verify merged output, caching and failure handling."""
+
+    def test_merges_tools_and_only_rechecks_changed_files(self, repo, tmp_path):
+        """Findings merge by severity; a second run re-checks only the edited file."""
+        (repo / "a.py").write_text("import os\nx = 1\n")
+        (repo / "b.py").write_text("y = 3\n")
+        (repo / "web" / "bad.ts").write_text("export function f(x: any) {}\n")
+        files = ["a.py", "b.py", "web/bad.ts"]
+        cache = ResultCache(repo, tmp_path / "cache")
+
+        first = run_checks(repo, files, ["ruff", "tsc", "ty"], jobs=2, cache=cache)
+        assert not first["pass"]
+        assert first["hard_violations"] == [
+            {"tool": "ruff", "rule": "F401", "location": "a.py:1", "explanation": "`os` imported but unused",
+             "suggestion": "Remove unused import"},
+            {"tool": "tsc", "rule": "TS7006", "location": "web/bad.ts:1",
+             "explanation": "Parameter implicitly has an 'any' type. Consider adding a type."},
+        ]
+        reason = "ty not found (local bin directories or PATH)"
+        assert first["skipped"] == [{"tool": "ty", "project": ".", "reason": reason}]
+        assert sorted(_calls(tmp_path)) == ["ruff a.py b.py", f"tsc {repo / 'web'}"]
+
+        (repo / "a.py").write_text("x = 1\n")
+        second = run_checks(repo, files, ["ruff", "tsc"], jobs=2, cache=ResultCache(repo, tmp_path / "cache"))
+        assert [v["tool"] for v in second["hard_violations"]] == ["tsc"]
+        assert sorted(_calls(tmp_path)) == ["ruff a.py", f"tsc {repo / 'web'}"]
+        ruff = next(t for t in second["tools"] if t["name"] == "ruff")
+        assert (ruff["cached"], ruff["ran"]) == (1, 1)
+
+        third = run_checks(repo, files, ["ruff", "tsc"], cache=ResultCache(repo, tmp_path / "cache"))
+        assert third == second | {"tools": third["tools"]}
+        assert _calls(tmp_path) == []
+
+    def test_project_findings_outside_change_set_are_counted(self, repo, tmp_path):
+        """tsc errors in unchanged files are not reported, only counted."""
+        (repo / "web" / "old.ts").write_text("let a: any;\n")
+        (repo / "web" / "new.ts").write_text("export const b = 1;\n")
+        result = run_checks(repo, ["web/new.ts"], ["tsc"])
+        assert result["pass"]
+        assert result["tools"][0]["outside_change_set"] == 1
+
+    def test_tool_errors_fail_and_are_not_cached(self, repo, tmp_path):
+        """A crashed tool is reported as an error and runs again next time."""
+        _tool(tmp_path / "bin", "biome", BROKEN_BIOME)
+        (repo / "web" / "ok.ts").write_text("export const ok = 2;\n")
+        for _ in range(2):
+            result = run_checks(repo, ["web/ok.ts"], ["biome"], cache=ResultCache(repo, tmp_path / "cache"))
+            assert not result["pass"]
+            assert result["errors"] == [{"tool": "biome", "cwd": ".", "error": "biome: internal error"}]
+            assert result["tools"][0]["cached"] == 0
+
+    def test_unlocated_and_silent_failures_are_errors(self, repo, tmp_path):
+        """tsc config errors and a bare exit 1 fail the run instead of passing it."""
+        _tool(tmp_path / "bin", "tsc", CONFIG_ERROR_TSC)
+        _tool(tmp_path / "bin", "ruff", SILENT_RUFF)
+        cache = ResultCache(repo, tmp_path / "cache")
+        result = run_checks(repo, ["a.py", "web/ok.ts"], ["ruff", "tsc"], cache=cache)
+        assert not result["pass"]
+        assert result["errors"] == [
+            {"tool": "ruff", "cwd": ".", "error": "exited with status 1"},
+            {"tool": "tsc", "cwd": "web", "error": "error TS5023: Unknown compiler option 'strictest'.\n"
+                                                   "error TS18003: No inputs were found in config file 'tsconfig.json'."},
+        ]
+
+    def test_changed_files_like_the_skill(self, repo):
+        """The change set is the diff against HEAD~1 (or the working tree on a first commit)."""
+        (repo / "a.py").write_text("x = 5\n")
+        (repo / "new.py").write_text("z = 1\n")
+        assert changed_files(repo) == ["a.py"]
+
+
+class TestParsers:
+    """Verify tool output parsing."""
+
+    TASK = Task(tool="", executable="", cwd="/r/web", root="/r", files=[])
+
+    def test_ty_biome_tsc(self):
+        """Each tool's levels map onto HARD, SHOULD and WARN with root-relative paths."""
+        ty = parse_ty(self.TASK, "src/a.py:3:1: error[unresolved-import] Cannot resolve `x`\n"
+                                 "src/a.py:9:2: warning[possibly-unbound] `y` may be unbound\nFound 2 diagnostics\n")
+        assert [(f["file"], f["line"], f["rule"], f["severity"]) for f in ty] == [
+            ("web/src/a.py", 3, "unresolved-import", HARD), ("web/src/a.py", 9, "possibly-unbound", SHOULD),
+        ]
+        biome = parse_biome(self.TASK, (
+            "::notice title=lint/style/useConst,file=a.ts,line=2,endLine=2,col=1::Use const\n"
+            "::error title=format,file=b.ts,line=1,endLine=4,col=1::File not formatted\n"
+        ))
+        assert [(f["file"], f["rule"], f["severity"]) for f in biome] == [
+            ("web/a.ts", "lint/style/useConst", WARN), ("web/b.ts", "format", HARD),
+        ]
+        tsc = parse_tsc(self.TASK, "src/x.ts(4,1): error TS2322: Type 'string' is not assignable.\n  Details.\n")
+        assert tsc[0]["message"] == "Type 'string' is not assignable. Details."
+        assert json.loads(json.dumps(tsc)) == tsc